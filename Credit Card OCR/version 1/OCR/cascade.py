@@ -0,0 +1,110 @@
+import re
+import time
+import cv2
+
+from OCR.pre_proc import ImageProcessor, CardDetectionStrategy, EnhanceImageStrategy, MakeNumbersBolderStrategy, load_image
+
+
+IBAN_PATTERN = re.compile(r'^[A-Z]{2}\d{2}[A-Z0-9]{11,30}$')
+IBAN_LENGTHS = {'IR': 26}
+
+
+# Checksums
+def luhn_valid(number):
+    # Luhn check digit of a card number (ISO/IEC 7812)
+    if not number or not number.isdigit():
+        return False
+    total = 0
+    for i, char in enumerate(reversed(number)):
+        digit = ord(char) - 48
+        if i % 2:
+            digit = digit * 2 - 9 if digit > 4 else digit * 2
+        total += digit
+    return total % 10 == 0
+
+
+def iban_valid(iban):
+    # ISO 13616 mod-97 check: the country code and check digits move to the end, letters become 10..35
+    iban = iban.replace(' ', '').upper()
+    if not IBAN_PATTERN.match(iban) or len(iban) != IBAN_LENGTHS.get(iban[:2], len(iban)):
+        return False
+    rearranged = iban[4:] + iban[:4]
+    return int(''.join(str(int(char, 36)) for char in rearranged)) % 97 == 1
+
+
+def check_card_info(extracted_info):
+    # Returns {'card_number': bool, 'iban': bool}. A card without any IBAN (e.g. the back side) passes the IBAN check.
+    return {
+        'card_number': luhn_valid(extracted_info.get('card_number') or ''),
+        'iban': not extracted_info.get('iban') or iban_valid(extracted_info['iban']),
+    }
+
+
+class UpscaleStrategy:
+    def __init__(self, scale=2.0):
+        # Higher-resolution reading: easyocr's recognizer works on taller text crops
+        self.scale = scale
+
+    def apply(self, image):
+        return cv2.resize(image, None, fx=self.scale, fy=self.scale, interpolation=cv2.INTER_CUBIC)
+
+
+# Default cascade, cheapest stage first
+DEFAULT_STAGES = (
+    ('bold', (MakeNumbersBolderStrategy(),)),
+    ('enhance', (EnhanceImageStrategy(),)),
+    ('enhance_upscaled', (UpscaleStrategy(2.0), EnhanceImageStrategy())),
+)
+
+
+class StrategyCascade:
+    def __init__(self, read_card, stages=DEFAULT_STAGES, detect_card=True):
+        # read_card: Callable taking an RGB card image and returning the extract_card_info dict.
+        # stages: (name, strategies) pairs tried in order until the card number passes Luhn and the IBAN passes mod-97.
+        # detect_card: Crop the card with CardDetectionStrategy once, before every stage.
+        self.read_card = read_card
+        self.stages = [(name, ImageProcessor(*strategies)) for name, strategies in stages]
+        self.card_detection = ImageProcessor(CardDetectionStrategy()) if detect_card else None
+        self.accepted = {name: 0 for name, _ in self.stages}
+        self.accepted[None] = 0
+        self.cards = 0
+
+    def merge(self, best, extracted_info, checks):
+        # Fields that passed their checksum are kept from the earliest stage, the other fields follow the stage with
+        # a valid card number, or the first stage when none has one
+        if best is None:
+            return dict(extracted_info)
+        merged = dict(best)
+        if checks['card_number'] and not luhn_valid(best.get('card_number') or ''):
+            merged.update({key: value for key, value in extracted_info.items() if key != 'iban'})
+        if extracted_info.get('iban') and checks['iban'] and not (best.get('iban') and iban_valid(best['iban'])):
+            merged['iban'] = extracted_info['iban']
+        return merged
+
+    def run(self, image):
+        # image: File path, encoded bytes or BGR array, decoded (and cropped) only once for all stages.
+        # Returns (extracted_info, report) where report lists the stages tried with their checks and times, and the
+        # stage that produced a fully valid card (None when every stage failed).
+        self.cards += 1
+        image = load_image(image)
+        if self.card_detection is not None:
+            image = self.card_detection.process(image)
+
+        best, report = None, {'stages': [], 'accepted': None}
+        for name, processor in self.stages:
+            start_time = time.perf_counter()
+            extracted_info = self.read_card(cv2.cvtColor(processor.process(image), cv2.COLOR_BGR2RGB))
+            checks = check_card_info(extracted_info)
+            best = self.merge(best, extracted_info, checks)
+            report['stages'].append({'stage': name, 'checks': checks, 'seconds': time.perf_counter() - start_time})
+
+            if all(check_card_info(best).values()):
+                report['accepted'] = name
+                break
+
+        self.accepted[report['accepted']] += 1
+        return best, report
+
+    def stats(self):
+        # Share of the cards accepted at every stage, None counts the cards that failed every stage
+        return {name: count / max(self.cards, 1) for name, count in self.accepted.items()}
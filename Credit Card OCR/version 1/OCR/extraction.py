@@ -0,0 +1,212 @@
+import re
+import csv
+import os
+
+
+# Default BIN table, one 'prefix,bank' row per issuer
+DEFAULT_BIN_TABLE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'bin_table.csv')
+
+# Precompiled patterns of the field extraction
+DIGITS = re.compile(r'\d+')
+DIGIT = re.compile(r'\d')
+WHITESPACE = re.compile(r'\s+')
+THREE_DIGITS = re.compile(r'^\D*(\d\D*){3}$')
+EXPIRY = re.compile(r'^(\d{4}/\d{2}|\d{2}/\d{2})$')
+NO_DIGITS = re.compile(r'^[\D]+$')
+
+# Single translation pass that drops spaces and masks Persian digits, see tokenize
+TOKEN_TABLE = str.maketrans({' ': None, **{chr(c): 'v' for c in range(ord('٠'), ord('٩') + 1)}})
+IBAN_TABLE = str.maketrans({'&': '8', '{': '0', '"': '0', '|': None})
+
+
+# CVV2 Keyword Automaton
+class KeywordAutomaton:
+    def __init__(self, keywords):
+        # Aho-Corasick automaton over the keywords, finding all of them in one pass over a text.
+        # find returns the keyword with the lowest index in the list that occurs in the text, which is what
+        # next(k for k in keywords if k in text) returns, without scanning the text once per keyword.
+        self.keywords = list(keywords)
+        self.goto = [{}]
+        self.first = [len(self.keywords)]
+
+        for index, keyword in enumerate(self.keywords):
+            state = 0
+            for char in keyword:
+                if char not in self.goto[state]:
+                    self.goto.append({})
+                    self.first.append(len(self.keywords))
+                    self.goto[state][char] = len(self.goto) - 1
+                state = self.goto[state][char]
+            self.first[state] = min(self.first[state], index)
+
+        # Breadth first: failure links, and the lowest keyword index ending at every state or its suffixes
+        self.fail = [0] * len(self.goto)
+        queue = list(self.goto[0].values())
+        for state in queue:
+            for char, child in self.goto[state].items():
+                fallback = self.fail[state]
+                while fallback and char not in self.goto[fallback]:
+                    fallback = self.fail[fallback]
+                self.fail[child] = self.goto[fallback].get(char, 0)
+                self.first[child] = min(self.first[child], self.first[self.fail[child]])
+                queue.append(child)
+
+    def find(self, text):
+        goto, fail, first = self.goto, self.fail, self.first
+        best, state = len(self.keywords), 0
+        for char in text:
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            if first[state] < best:
+                best = first[state]
+                if best == 0:
+                    break
+        return self.keywords[best] if best < len(self.keywords) else None
+
+
+# BIN Prefix Trie
+class BinTrie:
+    def __init__(self, prefixes=None):
+        # Prefix trie from card number prefixes (BINs) of any length to issuer names
+        self.root = {}
+        self.size = 0
+        for prefix, bank in (prefixes or {}).items():
+            self.add(prefix, bank)
+
+    @classmethod
+    def from_file(cls, path=DEFAULT_BIN_TABLE):
+        # Loads a 'prefix,bank' csv, a header row and lines starting with '#' are skipped
+        trie = cls()
+        with open(path, newline='', encoding='utf-8') as file:
+            for row in csv.reader(file):
+                if len(row) < 2 or row[0].startswith('#') or not row[0].strip().isdigit():
+                    continue
+                trie.add(row[0].strip(), row[1].strip())
+        return trie
+
+    def add(self, prefix, bank):
+        node = self.root
+        for char in prefix:
+            node = node.setdefault(char, {})
+        if None not in node:
+            self.size += 1
+        node[None] = bank
+
+    def lookup(self, number, default=''):
+        # Bank of the longest prefix of number in the table
+        node, bank = self.root, default
+        for char in number:
+            node = node.get(char)
+            if node is None:
+                break
+            bank = node.get(None, bank)
+        return bank
+
+    def starts_with_any(self, text):
+        node = self.root
+        for char in text:
+            node = node.get(char)
+            if node is None:
+                return False
+            if None in node:
+                return True
+        return False
+
+    def items(self):
+        stack = [('', self.root)]
+        while stack:
+            prefix, node = stack.pop()
+            for char, child in node.items():
+                if char is None:
+                    yield prefix, child
+                else:
+                    stack.append((prefix + char, child))
+
+    def __len__(self):
+        return self.size
+
+
+# Line Clustering
+def cluster_lines(ocr_data, y_threshold=60):
+    # Sort-based version of the greedy grouping: boxes are sorted by the y of their first corner and a new line
+    # starts whenever a box is more than y_threshold below the first box of the current line. On top to bottom
+    # input this gives the same groups as comparing every box with every existing group key, in O(n log n).
+    grouped_data = {}
+    key = None
+    for item in sorted(ocr_data, key=lambda item: item[0][0][1]):
+        y_coord = item[0][0][1]
+        if key is None or y_coord - key > y_threshold:
+            key = y_coord
+            grouped_data[key] = []
+        grouped_data[key].append(item)
+
+    for key in grouped_data:
+        grouped_data[key].sort(key=lambda x: x[0][0][0])
+    return grouped_data
+
+
+# Field Extraction
+def tokenize(grouped_ocr_results):
+    # Single pass over the grouped OCR data yielding (line_index, token) with spaces removed and Persian digits masked
+    for line_index, group in enumerate(grouped_ocr_results.values()):
+        for _, text, _ in group:
+            yield line_index, text.translate(TOKEN_TABLE)
+
+
+class FieldExtractor:
+    def __init__(self, bins, cvv2_keywords):
+        self.bins = bins
+        self.cvv2 = KeywordAutomaton(cvv2_keywords)
+
+    def extract(self, grouped_ocr_results):
+        extracted_info = {
+            'card_number': [],
+            'iban': '',
+            'cvv2': '',
+            'expiry_date': '',
+            'owner_name': '',
+            'bank_name': ''
+        }
+
+        temp_num = [''] * len(grouped_ocr_results)
+        for line_index, text in tokenize(grouped_ocr_results):
+            length = len(text)
+            is_digit = text.isdigit()
+
+            if 'R' in text and DIGITS.search(text):
+                iban = WHITESPACE.sub('', text)[:26]  # IBAN length is 26 characters
+                extracted_info['iban'] = iban.replace('1R', 'IR').translate(IBAN_TABLE)
+
+            if (length == 4 or length == 8 or length == 12 or length >= 16) and ':' not in text:
+                if is_digit: temp_num[line_index] += text
+
+            elif is_digit and THREE_DIGITS.match(text):
+                extracted_info['cvv2'] = text
+
+            elif (keyword := self.cvv2.find(text)) is not None:
+                cvv2 = text.replace(keyword, '').replace(':', '')
+                if cvv2.isdigit(): extracted_info['cvv2'] = cvv2
+
+            elif EXPIRY.match(text):
+                extracted_info['expiry_date'] = text
+
+            elif NO_DIGITS.match(text) and not self.bins.starts_with_any(text):
+                extracted_info['owner_name'] = text
+
+        temp_num = [''.join(DIGIT.findall(num)) for num in temp_num]
+
+        card_number = next((num for num in temp_num if len(num) == 16 and num.isdigit()), None)
+        if card_number is not None:
+            extracted_info['card_number'] = card_number
+            extracted_info['bank_name'] = self.bins.lookup(card_number)
+        else:
+            card_number = ''.join([num.zfill(4) for num in temp_num if num.isdigit()])[:16]
+            extracted_info['bank_name'] = self.bins.lookup(card_number)
+            # Without a known issuer the concatenated groups are not trusted as a card number
+            extracted_info['card_number'] = card_number if extracted_info['bank_name'] else ''
+
+        if extracted_info['cvv2'] == '':
+            extracted_info['cvv2'] = next((num for num in temp_num if (len(num) == 4 or len(num) == 3) and num.isdigit()), '')
+
+        return extracted_info
@@ -2,52 +2,127 @@ import cv2
 import argparse 
 
 from OCR.main_model import OCRReader, OCRDataProcessor
-from OCR.pre_proc import ImageProcessor, EnhanceImageStrategy, MakeNumbersBolderStrategy
-
-
-def main(img_path, strategy_name):
-    # Map strategy names to strategy classes
-    strategies = {
-        'enhance': EnhanceImageStrategy,
-        'bold': MakeNumbersBolderStrategy
-    }
-    
-    # Select the image processing strategy based on user input
-    strategy = strategies.get(strategy_name, MakeNumbersBolderStrategy)()
-    
-    # Create an instance of ImageProcessor with the selected strategy
-    image_processor = ImageProcessor(strategy)
-
-    # Process an image
-    try :
-        img = image_processor.process(img_path)  # Use the provided image path
-        img = cv2.cvtColor(img, cv2.COLOR_BGR2RGB)
+from OCR.card_layout import CardLayoutReader
+from OCR.cascade import StrategyCascade
+from OCR.batch import BatchRunner, print_stats
+from OCR.pre_proc import ImageProcessor, CardDetectionStrategy, EnhanceImageStrategy, MakeNumbersBolderStrategy
 
+
+def read_card(img, ocr_reader, ocr_processor, layout=False, verbose=True):
+    # Layout mode recognises only the card fields, falling back to the full card when no layout is found
+    if layout:
+        extracted_card_info, timings = CardLayoutReader(ocr_reader, ocr_processor.bins).read(img)
+        if verbose:
+            print(', '.join(f"{stage}: {1000 * seconds:.1f} ms" for stage, seconds in timings.items() if not stage.endswith('boxes')))
+            print(f"Recognised {timings['recognised_boxes']} of {timings['detected_boxes']} detected boxes")
+        if extracted_card_info is not None:
+            return extracted_card_info
+
+    results = ocr_reader.read_text(img)
+
+    # Process OCR data
+    groups = ocr_processor.group_and_sort_ocr_data(results)
+    return ocr_processor.extract_card_info(groups)
+
+
+def card_reader(strategy_name, ocr_reader, ocr_processor, layout=False, full_image=False, verbose=False):
+    # Returns (process, cascade): process(image) reads one card, quietly unless verbose, cascade is None unless
+    # strategy_name is auto
+    if strategy_name == 'auto':
+        cascade = StrategyCascade(lambda img: read_card(img, ocr_reader, ocr_processor, layout, verbose),
+                                  detect_card=not full_image)
+        return (lambda image: cascade.run(image)[0]), cascade
+
+    strategy = {'enhance': EnhanceImageStrategy, 'bold': MakeNumbersBolderStrategy}[strategy_name]()
+    image_processor = ImageProcessor(strategy) if full_image else ImageProcessor(CardDetectionStrategy(), strategy)
+    process = lambda image: read_card(cv2.cvtColor(image_processor.process(image), cv2.COLOR_BGR2RGB),
+                                      ocr_reader, ocr_processor, layout, verbose)
+    return process, None
+
+
+def run_batch(source, output_path, strategy_name, ocr_reader, ocr_processor, layout=False, full_image=False, resume=True):
+    # One warm reader for every card of a directory, manifest or archive, the results are streamed to JSONL
+    process, cascade = card_reader(strategy_name, ocr_reader, ocr_processor, layout, full_image)
+    try:
+        stats = BatchRunner(process, output_path, resume=resume).run(source)
+    except FileNotFoundError:
+        print("Error: The provided batch source does not exist.")
+        return -1
+
+    print_stats(stats)
+    if strategy_name == 'auto':
+        print(f"Accepted per stage: {cascade.stats()}")
+    return 0
+
+
+def run_profile(img_path, iterations, output_prefix, strategy_name, ocr_reader, ocr_processor, layout=False, full_image=False):
+    # Reads the image iterations times under torch.profiler and a sampling profiler, imported only here so that
+    # normal runs are not affected
+    from OCR.profiling import profile_calls
+
+    process, _ = card_reader(strategy_name, ocr_reader, ocr_processor, layout, full_image)
+    try:
+        print(profile_calls(process, [img_path], iterations, output_prefix))
+    except FileNotFoundError:
+        print("Error: The provided image file does not exist.")
+        return -1
+    return 0
+
+
+def main(img_path, strategy_name, device='cuda', num_threads=None, layout=False, full_image=False, eager_persian=False,
+         batch=None, output='results.jsonl', resume=True, profile_iters=None, profile_output='profile/card'):
+    # Read text using OCRReader (Singleton)
+    ocr_reader = OCRReader(device=device, num_threads=num_threads, lazy_persian=not eager_persian)
+    ocr_processor = OCRDataProcessor()
+
+    if batch is not None:
+        return run_batch(batch, output, strategy_name, ocr_reader, ocr_processor, layout, full_image, resume)
+    if profile_iters is not None:
+        return run_profile(img_path, profile_iters, profile_output, strategy_name, ocr_reader, ocr_processor, layout, full_image)
+
+    # The automatic cascade escalates from the cheapest strategy only while the card number or IBAN checksum fails,
+    # the other strategies crop the card to its canonical size and process it once
+    process, cascade = card_reader(strategy_name, ocr_reader, ocr_processor, layout, full_image, verbose=True)
+    try:
+        if cascade is not None:
+            extracted_card_info, report = cascade.run(img_path)
+        else:
+            extracted_card_info = process(img_path)
     except FileNotFoundError:
         print("Error: The provided image file does not exist.")
         return -1
     except Exception as e:
         print(f"An error occurred: {e}")
         return -1
-    
-    # Read text using OCRReader (Singleton)
-    ocr_reader = OCRReader()
-    results = ocr_reader.read_text(img)
-
-    # Process OCR data
-    ocr_processor = OCRDataProcessor()
-    groups = ocr_processor.group_and_sort_ocr_data(results)
-    extracted_card_info = ocr_processor.extract_card_info(groups)
 
+    if cascade is not None:
+        for stage in report['stages']:
+            print(f"{stage['stage']}: {1000 * stage['seconds']:.1f} ms, checks {stage['checks']}")
+        print(f"Accepted at stage: {report['accepted']}")
     print(extracted_card_info)
     return 0
 
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description='Credit Card OCR System')
 
-    parser.add_argument('--image_path', type=str, help='Path to the image file to process', required=True)
-    parser.add_argument('--strategy', type=str, choices=['enhance', 'bold'], default='bold', help='Image processing strategy to use', required=False)
+    inputs = parser.add_mutually_exclusive_group(required=True)
+    inputs.add_argument('--image_path', type=str, help='Path to the image file to process')
+    inputs.add_argument('--batch', type=str, help='Directory of images, manifest (one image path per line) or zip/tar archive to process with one reader')
+    parser.add_argument('--strategy', type=str, choices=['auto', 'enhance', 'bold'], default='bold', help='Image processing strategy to use, auto (opt-in) escalates from bold to enhance to an upscaled read until the card number and IBAN checksums pass', required=False)
+    parser.add_argument('--device', type=str, default='cuda', help="Device to run easyocr on, e.g. 'cuda', 'cuda:1' or 'cpu'. Default is cuda (cpu when no GPU is available).", required=False)
+    parser.add_argument('--num_threads', type=int, default=None, help='Number of CPU threads used by torch. Default is the torch default.', required=False)
+    parser.add_argument('--layout', action='store_true', help='Recognise only the number, expiry, CVV2, IBAN and name bands of the card', required=False)
+    parser.add_argument('--full_image', action='store_true', help='Skip the card detection and pass the whole image to OCR', required=False)
+    parser.add_argument('--eager_persian', action='store_true', help='Load the Persian recognizer at startup and run it on every box instead of only on names and uncertain boxes', required=False)
+    parser.add_argument('--output', type=str, default='results.jsonl', help='JSONL output of the batch mode, also used as the checkpoint to resume from. Default is results.jsonl.', required=False)
+    parser.add_argument('--no_resume', action='store_true', help='Overwrite the batch output instead of skipping the cards it already lists', required=False)
+    parser.add_argument('--profile', action='store_true', help='Profile the reading of --image_path instead of printing its fields', required=False)
+    parser.add_argument('--profile_iters', type=int, default=20, help='Number of profiled reads. Default is 20.', required=False)
+    parser.add_argument('--profile_output', type=str, default='profile/card', help='Prefix of the trace, flamegraph stacks and summary files. Default is profile/card.', required=False)
     args = parser.parse_args()
-    
-    main(args.image_path, args.strategy)
+    if args.profile and args.image_path is None:
+        parser.error('--profile requires --image_path')
+
+    main(args.image_path, args.strategy, args.device, args.num_threads, args.layout, args.full_image, args.eager_persian,
+         args.batch, args.output, not args.no_resume, args.profile_iters if args.profile else None, args.profile_output)
     
\ No newline at end of file
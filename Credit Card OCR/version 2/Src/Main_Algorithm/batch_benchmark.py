@@ -0,0 +1,71 @@
+import cv2
+import time
+import argparse
+
+import os
+import sys
+from pathlib import Path
+
+sys.path.append(os.path.abspath(Path(__file__).resolve().parents[0]))
+
+from ocr import OCRReader
+from utils.pre_proc import ImageProcessor, MakeNumbersBolderStrategy
+from utils.image_pack import iter_images
+
+
+def load_cards(image_dir, num_images):
+    # Preprocess every image of the directory (or image pack) once and repeat them up to num_images cards
+    image_processor = ImageProcessor(MakeNumbersBolderStrategy())
+    cards = []
+    for name, image in iter_images(image_dir):
+        try:
+            cards.append(cv2.cvtColor(image_processor.process(image), cv2.COLOR_BGR2RGB))
+        except Exception as e:
+            print(f"Skipping {name}: {e}")
+
+    if not cards:
+        return cards
+    return [cards[i % len(cards)] for i in range(num_images)]
+
+
+def main(image_dir, num_images, batch_sizes, device, num_threads):
+    ocr_reader = OCRReader(device=device, num_threads=num_threads)
+    cards = load_cards(image_dir, num_images)
+    if not cards:
+        print("Error: No readable image in the provided directory.")
+        return -1
+
+    print(f"Device: {ocr_reader.device}, {len(cards)} cards, "
+          f"{len(ocr_reader.group_by_size(cards))} size groups")
+
+    # Warmup
+    ocr_reader.read_text(cards[0])
+
+    start_time = time.perf_counter()
+    reference = [ocr_reader.read_text(card) for card in cards]
+    elapsed = time.perf_counter() - start_time
+    print(f"read_text       : {len(cards) / elapsed:6.2f} cards/s ({1000 * elapsed / len(cards):7.1f} ms/card)")
+
+    for batch_size in batch_sizes:
+        start_time = time.perf_counter()
+        results = ocr_reader.read_text_batch(cards, batch_size=batch_size)
+        elapsed = time.perf_counter() - start_time
+
+        same = sum([text for _, text, _ in a] == [text for _, text, _ in b] for a, b in zip(reference, results))
+        print(f"batch_size {batch_size:4d}: {len(cards) / elapsed:6.2f} cards/s ({1000 * elapsed / len(cards):7.1f} ms/card), "
+              f"same text as read_text for {same}/{len(cards)} cards")
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Measure the card throughput of the batched OCR path.')
+
+    parser.add_argument('-dir', '--image_dir', type=str, default=str(Path(__file__).resolve().parents[2] / 'Evaluate_Dataset'),
+                        help='Directory of card images or image pack (utils/image_pack.py)')
+    parser.add_argument('-n', '--num_images', type=int, default=32, help='Number of cards to read (images are repeated)')
+    parser.add_argument('-b', '--batch_sizes', type=int, nargs='+', default=[1, 4, 8, 16], help='Batch sizes to measure')
+    parser.add_argument('-d', '--device', type=str, default='cpu', help="Device to run easyocr on, e.g. 'cuda' or 'cpu'")
+    parser.add_argument('-t', '--num_threads', type=int, default=None, help='Number of CPU threads used by torch')
+
+    args = parser.parse_args()
+    main(args.image_dir, args.num_images, args.batch_sizes, args.device, args.num_threads)
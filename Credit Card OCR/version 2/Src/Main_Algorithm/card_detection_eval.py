@@ -0,0 +1,103 @@
+import cv2
+import glob
+import json
+import time
+import argparse
+import numpy as np
+
+import os
+import sys
+from pathlib import Path
+
+sys.path.append(os.path.abspath(Path(__file__).resolve().parents[0]))
+
+from ocr import OCRReader, OCRDataProcessor
+from utils.pre_proc import ImageProcessor, CardDetectionStrategy, MakeNumbersBolderStrategy, load_image
+
+
+FIELDS = ['card_number', 'iban', 'cvv2', 'expiry_date', 'owner_name', 'bank_name']
+
+
+def read_card(ocr_reader, ocr_processor, image_processor, image, runs_num):
+    # Returns the extracted fields, the processed image shape and the mean preprocessing and OCR times
+    pre_times, ocr_times = [], []
+    for _ in range(runs_num):
+        start_time = time.perf_counter()
+        img = cv2.cvtColor(image_processor.process(image), cv2.COLOR_BGR2RGB)
+        pre_times.append(time.perf_counter() - start_time)
+
+        start_time = time.perf_counter()
+        results = ocr_reader.read_text(img)
+        info = ocr_processor.extract_card_info(ocr_processor.group_and_sort_ocr_data(results))
+        ocr_times.append(time.perf_counter() - start_time)
+    return info, img.shape, np.mean(pre_times), np.mean(ocr_times)
+
+
+def main(image_dir, labels_path, runs_num, device, num_threads):
+    ocr_reader = OCRReader(device=device, num_threads=num_threads)
+    ocr_processor = OCRDataProcessor()
+    full_processor = ImageProcessor(MakeNumbersBolderStrategy())
+    card_processor = ImageProcessor(CardDetectionStrategy(), MakeNumbersBolderStrategy())
+
+    # Optional ground truth: {"image file name": {"card_number": "...", "cvv2": "...", ...}}
+    labels = {}
+    if labels_path is not None:
+        with open(labels_path, encoding='utf-8') as file:
+            labels = json.load(file)
+
+    totals = {'full': [0.0, 0.0], 'card': [0.0, 0.0]}
+    hits = {'full': {field: [] for field in FIELDS}, 'card': {field: [] for field in FIELDS}}
+    for img_path in sorted(glob.glob(os.path.join(image_dir, '*.*'))):
+        try:
+            image = load_image(img_path)
+        except (FileNotFoundError, ValueError):
+            continue
+        name = os.path.basename(img_path)
+
+        # Warmup on the first image
+        if not any(totals['full']):
+            ocr_reader.read_text(cv2.cvtColor(image, cv2.COLOR_BGR2RGB))
+
+        full_info, full_shape, full_pre, full_ocr = read_card(ocr_reader, ocr_processor, full_processor, image, runs_num)
+        card_info, card_shape, card_pre, card_ocr = read_card(ocr_reader, ocr_processor, card_processor, image, runs_num)
+        totals['full'][0] += full_pre
+        totals['full'][1] += full_ocr
+        totals['card'][0] += card_pre
+        totals['card'][1] += card_ocr
+
+        # Without labels the full image reading is the reference
+        truth = labels.get(name, full_info)
+        for field in FIELDS:
+            if field in truth:
+                hits['full'][field].append(full_info[field] == truth[field])
+                hits['card'][field].append(card_info[field] == truth[field])
+
+        print(f"{name}: {image.shape[1]}x{image.shape[0]} -> {card_shape[1]}x{card_shape[0]}, "
+              f"OCR {1000 * full_ocr:.0f} -> {1000 * card_ocr:.0f} ms (+{1000 * card_pre:.0f} ms card detection)")
+        print(f"    full: {full_info}")
+        print(f"    card: {card_info}")
+
+    full_time, card_time = sum(totals['full']), sum(totals['card'])
+    print("---------------------------------------------------------------------------------------------------------")
+    print(f"Total time full image {full_time:.2f} s, detected card {card_time:.2f} s, "
+          f"speedup {full_time / max(card_time, 1e-9):.2f}x")
+    reference = 'accuracy' if labels else 'agreement with the full image'
+    for field in FIELDS:
+        if hits['card'][field]:
+            print(f"{field:12s} {reference}: full {100 * np.mean(hits['full'][field]):5.1f}%, "
+                  f"card {100 * np.mean(hits['card'][field]):5.1f}%")
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Evaluate card detection and canonical downscaling before OCR.')
+
+    parser.add_argument('-dir', '--image_dir', type=str, default=str(Path(__file__).resolve().parents[2] / 'Evaluate_Dataset'),
+                        help='Directory of card images')
+    parser.add_argument('-lbl', '--labels', type=str, default=None, help='Optional json with the expected fields per image')
+    parser.add_argument('-r', '--runs_num', type=int, default=3, help='Repeat every reading to obtain a valid runtime')
+    parser.add_argument('-d', '--device', type=str, default='cpu', help="Device to run easyocr on, e.g. 'cuda' or 'cpu'")
+    parser.add_argument('-t', '--num_threads', type=int, default=None, help='Number of CPU threads used by torch')
+
+    args = parser.parse_args()
+    main(args.image_dir, args.labels, args.runs_num, args.device, args.num_threads)
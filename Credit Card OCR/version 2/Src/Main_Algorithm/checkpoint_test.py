@@ -0,0 +1,69 @@
+import os
+import sys
+import json
+import shutil
+import tempfile
+import argparse
+from pathlib import Path
+
+sys.path.append(os.path.abspath(Path(__file__).resolve().parents[0]))
+
+from utils.batch import BatchRunner, load_checkpoint
+
+
+def read_records(output_path):
+    with open(output_path, encoding='utf-8') as file:
+        return [json.loads(line) for line in file]
+
+
+def main(num_cards, crash_after):
+    # Resumes a batch whose last record was written without its newline by a crash, and checks that every card
+    # ends up in the output exactly once
+    work_dir = tempfile.mkdtemp()
+    try:
+        names = [f"card_{i:04d}.jpg" for i in range(num_cards)]
+        manifest = os.path.join(work_dir, 'cards.txt')
+        with open(manifest, 'w', encoding='utf-8') as file:
+            file.write(''.join(name + '\n' for name in names))
+        output_path = os.path.join(work_dir, 'cards.jsonl')
+        runner = BatchRunner(lambda image: {'file': os.path.basename(image)}, output_path)
+
+        runner.run(manifest, log_every=0)
+        with open(output_path, encoding='utf-8') as file:
+            lines = file.readlines()
+        # The crash: complete JSON records, the last one without its newline
+        with open(output_path, 'w', encoding='utf-8') as file:
+            file.write(''.join(lines[:crash_after - 1]) + lines[crash_after - 1].rstrip('\n'))
+
+        failures = 0
+        done = load_checkpoint(output_path)
+        if len(done) != crash_after - 1:
+            print(f"Checkpoint lists {len(done)} cards, {crash_after - 1} expected")
+            failures += 1
+
+        for attempt in range(2):
+            stats = runner.run(manifest, log_every=0)
+            records = read_records(output_path)
+            keys = [record['image'] for record in records]
+            if sorted(keys) != names:
+                print(f"Resume {attempt + 1}: {len(keys)} records, {len(set(keys))} distinct, {num_cards} expected")
+                failures += 1
+            if any(record['info']['file'] != record['image'] for record in records):
+                print(f"Resume {attempt + 1}: records mixed up")
+                failures += 1
+            print(f"Resume {attempt + 1}: {stats['cards']} cards read, {stats['skipped']} skipped")
+    finally:
+        shutil.rmtree(work_dir)
+
+    print(f"Checkpoint resume: {failures} failures")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Resume a batch from a checkpoint whose last record lacks its newline.')
+
+    parser.add_argument('-n', '--num_cards', type=int, default=10, help='Number of cards in the manifest')
+    parser.add_argument('-c', '--crash_after', type=int, default=4, help='Records left by the crash, the last one without its newline')
+
+    args = parser.parse_args()
+    sys.exit(main(args.num_cards, args.crash_after))
@@ -0,0 +1,155 @@
+import re
+import csv
+import time
+import random
+import argparse
+import tempfile
+
+import os
+import sys
+from pathlib import Path
+
+sys.path.append(os.path.abspath(Path(__file__).resolve().parents[0]))
+
+from utils.extraction import DEFAULT_BIN_TABLE, BinTrie, FieldExtractor, cluster_lines
+
+
+CV2_LIST = ['CV2', 'vv2', 'Cvv2', 'CVV2', 'cvv2', 'cv2', 'cw2', 'Cw2', 'cw', 'CV/2', 'C"v2']
+
+
+# Reference implementation the engine replaces, kept here to measure the speedup and check the results
+class LegacyDataProcessor:
+    def __init__(self, bank_prefixes):
+        self.bank_prefixes = bank_prefixes
+        self.cv2_list = CV2_LIST
+
+    @staticmethod
+    def group_and_sort_ocr_data(ocr_data, y_threshold=60):
+        grouped_data = {}
+        for item in ocr_data:
+            bbox, _, _ = item
+            y_coord = bbox[0][1]
+            found = False
+            for key in grouped_data:
+                if abs(key - y_coord) <= y_threshold:
+                    grouped_data[key].append(item)
+                    found = True
+                    break
+            if not found:
+                grouped_data[y_coord] = [item]
+
+        for key in grouped_data:
+            grouped_data[key] = sorted(grouped_data[key], key=lambda x: x[0][0][0])
+
+        return grouped_data
+
+    def extract_card_info(self, grouped_ocr_results):
+        extracted_info = {'card_number': [], 'iban': '', 'cvv2': '', 'expiry_date': '', 'owner_name': '', 'bank_name': ''}
+
+        temp_num = []
+        for group in grouped_ocr_results.values():
+            temp_card = ''
+            for _, text, _ in group:
+                text = text.replace(' ', "")
+                text = re.sub(r'[٠-٩]', 'v', text)
+
+                if 'R' in text and re.search(r'\d+', text):
+                    extracted_info['iban'] = re.sub(r'\s+', '', text)[:26]
+                    extracted_info['iban'] = extracted_info['iban'].replace('1R', 'IR').replace('&', '8').replace('{', '0').replace('"', '0').replace('|', '')
+
+                if (len(text) == 4 or len(text) == 8 or len(text) == 12 or len(text) >= 16) and not (':' in text):
+                    if text.isdigit(): temp_card += text.replace(' ', "")
+                elif re.match(r'^\D*(\d\D*){3}$', text) and text.isdigit():
+                    extracted_info['cvv2'] = text
+                elif any(keyword in text for keyword in self.cv2_list):
+                    found_keyword = next((keyword for keyword in self.cv2_list if keyword in text), None)
+                    if found_keyword is not None:
+                        cvv2 = text.replace(found_keyword, "").replace(':', "").replace(' ', "")
+                        if cvv2.isdigit(): extracted_info['cvv2'] = cvv2
+                elif re.match(r'^(\d{4}/\d{2}|\d{2}/\d{2})$', text):
+                    extracted_info['expiry_date'] = text
+                elif re.match(r'^[\D]+$', text) and not any(text.startswith(prefix) for prefix in self.bank_prefixes.keys()):
+                    extracted_info['owner_name'] = text
+            temp_num.append(temp_card)
+
+        temp_num = [''.join(re.findall(r'\d', s)) for s in temp_num]
+        try:
+            extracted_info['card_number'] = list(filter(lambda x: len(x) == 16 and x.isdigit(), temp_num))[0]
+            extracted_info['bank_name'] = self.bank_prefixes[extracted_info['card_number'][:4]]
+        except IndexError:
+            extracted_info['card_number'] = ''.join([num.zfill(4) for num in temp_num if num.isdigit()])[:16]
+            try: extracted_info['bank_name'] = self.bank_prefixes[extracted_info['card_number'][:4]]
+            except IndexError: extracted_info['card_number'] = ''
+
+        if extracted_info['cvv2'] == '':
+            try: extracted_info['cvv2'] = list(filter(lambda x: (len(x) == 4 or len(x) == 3) and x.isdigit(), temp_num))[0]
+            except IndexError: pass
+        return extracted_info
+
+
+def make_bin_table(path, num_issuers, rng):
+    # The default table plus random 4 digit issuers, written as a 'prefix,bank' csv
+    prefixes = dict(BinTrie.from_file(DEFAULT_BIN_TABLE).items())
+    while len(prefixes) < num_issuers:
+        prefixes.setdefault(str(rng.randint(1000, 9999)), f"Issuer {len(prefixes)}")
+    with open(path, 'w', newline='', encoding='utf-8') as file:
+        writer = csv.writer(file)
+        writer.writerow(['prefix', 'bank'])
+        writer.writerows(prefixes.items())
+    return prefixes
+
+
+def make_stream(num_tokens, rng, card_prefix):
+    # Synthetic OCR output of a large scan: card fields, labels, Persian names and noise on many text lines
+    vocab = ['CVV2:123', 'cvv2 456', 'CV2:78', '1403/05', '05/27', 'IR120120000000001234567890', '1R12 0120 0000',
+             'محمد رضایی', 'AHMAD', 'BANK', '۱۲۳', '٤٥٦', '12:30', 'cw 999', 'C"v2:12', 'Valid', '12', '987']
+    stream = [([[100, 40], [800, 40], [800, 90], [100, 90]], card_prefix + '123456789012', 0.9)]
+    for _ in range(num_tokens - 1):
+        x, y = rng.randint(0, 800), rng.randint(0, 50 * num_tokens)
+        text = rng.choice(vocab) if rng.random() < 0.8 else str(rng.randint(0, 10 ** rng.randint(1, 16)))
+        stream.append(([[x, y], [x + 80, y], [x + 80, y + 30], [x, y + 30]], text, 0.9))
+    # easyocr returns boxes roughly top to bottom
+    stream.sort(key=lambda item: item[0][0][1])
+    return stream
+
+
+def measure(function, repeats):
+    start_time = time.perf_counter()
+    for _ in range(repeats):
+        result = function()
+    return (time.perf_counter() - start_time) / repeats, result
+
+
+def main(sizes, num_issuers, repeats, seed):
+    rng = random.Random(seed)
+    with tempfile.TemporaryDirectory() as tmp:
+        table = os.path.join(tmp, 'bins.csv')
+        prefixes = make_bin_table(table, num_issuers, rng)
+        bins = BinTrie.from_file(table)
+
+    legacy = LegacyDataProcessor(prefixes)
+    extractor = FieldExtractor(bins, CV2_LIST)
+    print(f"BIN table: {len(bins)} issuers")
+
+    for size in sizes:
+        stream = make_stream(size, rng, '6037')
+        legacy_group, legacy_groups = measure(lambda: legacy.group_and_sort_ocr_data(stream), repeats)
+        engine_group, engine_groups = measure(lambda: cluster_lines(stream), repeats)
+        legacy_extract, legacy_info = measure(lambda: legacy.extract_card_info(legacy_groups), repeats)
+        engine_extract, engine_info = measure(lambda: extractor.extract(engine_groups), repeats)
+
+        print(f"{size:7d} tokens, {len(engine_groups):6d} lines | grouping {1000 * legacy_group:9.2f} -> {1000 * engine_group:7.2f} ms "
+              f"| extraction {1000 * legacy_extract:9.2f} -> {1000 * engine_extract:7.2f} ms "
+              f"| same result: {legacy_info == engine_info}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Benchmark the card field extraction engine on synthetic OCR tokens.')
+
+    parser.add_argument('-s', '--sizes', type=int, nargs='+', default=[50, 1000, 10000], help='Tokens per synthetic OCR stream')
+    parser.add_argument('-i', '--num_issuers', type=int, default=5000, help='Issuers in the synthetic BIN table')
+    parser.add_argument('-r', '--repeats', type=int, default=3, help='Repetitions per measurement')
+    parser.add_argument('--seed', type=int, default=0, help='Random seed')
+
+    args = parser.parse_args()
+    main(args.sizes, args.num_issuers, args.repeats, args.seed)
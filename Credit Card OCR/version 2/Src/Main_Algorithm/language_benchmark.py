@@ -0,0 +1,83 @@
+import json
+import time
+import argparse
+import subprocess
+import numpy as np
+
+import os
+import sys
+from pathlib import Path
+
+sys.path.append(os.path.abspath(Path(__file__).resolve().parents[0]))
+
+from ocr import OCRReader
+from batch_benchmark import load_cards
+
+
+# OCRReader is a singleton, so every mode is measured in its own process
+def run_mode(lazy_persian, image_dir, num_images, device, num_threads):
+    start_time = time.perf_counter()
+    ocr_reader = OCRReader(device=device, num_threads=num_threads, lazy_persian=lazy_persian)
+    startup = time.perf_counter() - start_time
+
+    cards = load_cards(image_dir, num_images)
+    if not cards:
+        return {'error': 'No readable image in the provided directory.'}
+
+    # The first card includes the lazy loading of the Persian recognizer, when any box needs it
+    start_time = time.perf_counter()
+    ocr_reader.read_text(cards[0])
+    first_card = time.perf_counter() - start_time
+
+    times = []
+    for card in cards:
+        start_time = time.perf_counter()
+        ocr_reader.read_text(card)
+        times.append(time.perf_counter() - start_time)
+
+    return {'startup': startup, 'first_card': first_card, 'card': float(np.mean(times)),
+            'boxes': ocr_reader.boxes, 'persian_boxes': ocr_reader.persian_boxes,
+            'persian_loaded': ocr_reader._persian_reader is not None}
+
+
+def main(image_dir, num_images, device, num_threads):
+    results = {}
+    for name, flag in (('eager', '--eager'), ('lazy', '--lazy')):
+        command = [sys.executable, os.path.abspath(__file__), '--worker', flag, '-dir', image_dir,
+                   '-n', str(num_images), '-d', device] + (['-t', str(num_threads)] if num_threads else [])
+        output = subprocess.run(command, capture_output=True, text=True)
+        if output.returncode != 0:
+            print(f"Error: The {name} run failed.\n{output.stderr}")
+            return -1
+        results[name] = json.loads(output.stdout.strip().splitlines()[-1])
+        if 'error' in results[name]:
+            print(f"Error: {results[name]['error']}")
+            return -1
+
+    for name, result in results.items():
+        share = result['persian_boxes'] / max(result['boxes'], 1)
+        print(f"{name:5s}: startup {result['startup']:6.2f} s, first card {1000 * result['first_card']:7.1f} ms, "
+              f"{1000 * result['card']:7.1f} ms/card, {100 * share:5.1f}% of {result['boxes']} boxes sent to Persian"
+              f"{'' if name == 'eager' else ' (recognizer loaded)' if result['persian_loaded'] else ' (recognizer never loaded)'}")
+    print(f"Startup speedup {results['eager']['startup'] / max(results['lazy']['startup'], 1e-9):.2f}x, "
+          f"per-card speedup {results['eager']['card'] / max(results['lazy']['card'], 1e-9):.2f}x")
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Compare eager and lazy loading of the Persian recognizer.')
+
+    parser.add_argument('-dir', '--image_dir', type=str, default=str(Path(__file__).resolve().parents[2] / 'Evaluate_Dataset'),
+                        help='Directory of card images')
+    parser.add_argument('-n', '--num_images', type=int, default=8, help='Number of cards to read (images are repeated)')
+    parser.add_argument('-d', '--device', type=str, default='cpu', help="Device to run easyocr on, e.g. 'cuda' or 'cpu'")
+    parser.add_argument('-t', '--num_threads', type=int, default=None, help='Number of CPU threads used by torch')
+    parser.add_argument('--worker', action='store_true', help=argparse.SUPPRESS)
+    parser.add_argument('--lazy', dest='lazy_persian', action='store_true', help=argparse.SUPPRESS)
+    parser.add_argument('--eager', dest='lazy_persian', action='store_false', help=argparse.SUPPRESS)
+
+    args = parser.parse_args()
+    if args.worker:
+        print(json.dumps(run_mode(args.lazy_persian, args.image_dir, args.num_images, args.device, args.num_threads)))
+    else:
+        main(args.image_dir, args.num_images, args.device, args.num_threads)
@@ -0,0 +1,66 @@
+import time
+import argparse
+import numpy as np
+
+import os
+import sys
+from pathlib import Path
+
+sys.path.append(os.path.abspath(Path(__file__).resolve().parents[0]))
+
+from ocr import OCRReader, OCRDataProcessor
+from utils.card_layout import CardLayoutReader
+from batch_benchmark import load_cards
+
+
+def main(image_dir, num_images, device, num_threads):
+    ocr_reader = OCRReader(device=device, num_threads=num_threads)
+    ocr_processor = OCRDataProcessor()
+    layout_reader = CardLayoutReader(ocr_reader, ocr_processor.bins)
+    cards = load_cards(image_dir, num_images)
+    if not cards:
+        print("Error: No readable image in the provided directory.")
+        return -1
+
+    # Warmup
+    ocr_reader.read_text(cards[0])
+    layout_reader.read(cards[0])
+
+    full_times, full_boxes = [], []
+    for card in cards:
+        start_time = time.perf_counter()
+        results = ocr_reader.read_text(card)
+        ocr_processor.extract_card_info(ocr_processor.group_and_sort_ocr_data(results))
+        full_times.append(time.perf_counter() - start_time)
+        full_boxes.append(len(results))
+
+    layout_times, stage_times, recognised, missed = [], {}, [], 0
+    for card in cards:
+        start_time = time.perf_counter()
+        info, timings = layout_reader.read(card)
+        layout_times.append(time.perf_counter() - start_time)
+        recognised.append(timings['recognised_boxes'])
+        missed += info is None
+        for stage, seconds in timings.items():
+            if not stage.endswith('boxes'):
+                stage_times.setdefault(stage, []).append(seconds)
+
+    print(f"Full card   : {1000 * np.mean(full_times):7.1f} ms/card, {np.mean(full_boxes):5.1f} boxes recognised per card")
+    print(f"Layout mode : {1000 * np.mean(layout_times):7.1f} ms/card, {np.mean(recognised):5.1f} boxes recognised per card, "
+          f"no layout found on {missed}/{len(cards)} cards")
+    for stage, seconds in stage_times.items():
+        print(f"    {stage:12s}: {1000 * np.mean(seconds):7.1f} ms")
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Compare full card recognition with the layout mode.')
+
+    parser.add_argument('-dir', '--image_dir', type=str, default=str(Path(__file__).resolve().parents[2] / 'Evaluate_Dataset'),
+                        help='Directory of card images')
+    parser.add_argument('-n', '--num_images', type=int, default=16, help='Number of cards to read (images are repeated)')
+    parser.add_argument('-d', '--device', type=str, default='cpu', help="Device to run easyocr on, e.g. 'cuda' or 'cpu'")
+    parser.add_argument('-t', '--num_threads', type=int, default=None, help='Number of CPU threads used by torch')
+
+    args = parser.parse_args()
+    main(args.image_dir, args.num_images, args.device, args.num_threads)
@@ -1,37 +1,128 @@
-import re
 import easyocr
 import numpy as np
+import cv2
+import torch
+import threading
 from singleton_decorator import singleton
+from utils.extraction import DEFAULT_BIN_TABLE, BinTrie, FieldExtractor, cluster_lines
+
 
 # OCR Reader Singleton
 @singleton
 class OCRReader:
-    def __init__(self):
-        self.reader = easyocr.Reader(['en', 'fa'], gpu=True)
+    def __init__(self, device='cuda', num_threads=None, languages=('en', 'fa'), lazy_persian=True, persian_threshold=0.5):
+        # device: 'cuda', 'cuda:<index>' or 'cpu'. Falls back to the CPU when CUDA is not available.
+        # num_threads: Torch intra-op threads used on the CPU, None keeps the torch default.
+        # lazy_persian: Load only the Latin reader (with the text detector) at startup. The Persian recognizer is
+        #               loaded on first use and runs only on the boxes the Latin pass scored below persian_threshold
+        #               or read without any digit, i.e. names and labels.
+        # Being a singleton, only the arguments of the first instantiation take effect.
+        if num_threads:
+            torch.set_num_threads(num_threads)
+
+        if device.startswith('cuda') and not torch.cuda.is_available():
+            device = 'cpu'
+        self.device = device
+        self.gpu = False if device == 'cpu' else device
+
+        self.lazy_persian = lazy_persian and 'fa' in languages
+        self.persian_threshold = persian_threshold
+        latin = [language for language in languages if language != 'fa'] if self.lazy_persian else list(languages)
+        self.reader = easyocr.Reader(latin or ['en'], gpu=self.gpu)
+
+        self._persian_reader = None
+        self._persian_lock = threading.Lock()
+        self.boxes = 0
+        self.persian_boxes = 0
+
+    @property
+    def persian_reader(self):
+        # Recognition-only Persian reader, loaded on first use
+        if self._persian_reader is None:
+            with self._persian_lock:
+                if self._persian_reader is None:
+                    self._persian_reader = easyocr.Reader(['fa'], gpu=self.gpu, detector=False)
+        return self._persian_reader
+
+    @staticmethod
+    def to_horizontal(bbox):
+        xs, ys = [p[0] for p in bbox], [p[1] for p in bbox]
+        return [int(min(xs)), int(max(xs)), int(min(ys)), int(max(ys))]
+
+    def refine_persian(self, image, results):
+        # Re-recognises the uncertain and digit-free boxes of a Latin pass with the Persian recognizer and keeps,
+        # per box, the reading with the higher confidence
+        self.boxes += len(results)
+        if not self.lazy_persian:
+            return results
+
+        targets = [i for i, (_, text, conf) in enumerate(results)
+                   if conf < self.persian_threshold or not any(char.isdigit() for char in text)]
+        if not targets:
+            return results
+
+        self.persian_boxes += len(targets)
+        grey = cv2.cvtColor(image, cv2.COLOR_RGB2GRAY) if image.ndim == 3 else image
+        persian = self.persian_reader.recognize(grey, horizontal_list=[self.to_horizontal(results[i][0]) for i in targets],
+                                                free_list=[], detail=1, paragraph=False, reformat=False)
+
+        results = list(results)
+        for i, (_, text, conf) in zip(targets, persian):
+            if conf > results[i][2]:
+                results[i] = (results[i][0], text, conf)
+        return results
 
     def read_text(self, image):
-        return self.reader.readtext(np.array(image), paragraph=False)
+        image = np.array(image)
+        return self.refine_persian(image, self.reader.readtext(image, paragraph=False))
+
+    @staticmethod
+    def group_by_size(images, size_step=32):
+        # Images whose sides round to the same multiple of size_step (and with the same channels) form one group
+        # and are resized to that size
+        groups = {}
+        for i, image in enumerate(images):
+            h, w = image.shape[:2]
+            key = (max(1, round(h / size_step)) * size_step, max(1, round(w / size_step)) * size_step) + image.shape[2:]
+            groups.setdefault(key, []).append(i)
+        return groups
+
+    def read_text_batch(self, images, batch_size=8, size_step=32):
+        # Reads many images through the batched easyocr path.
+        # images: RGB numpy arrays of any size. They are grouped by size (see group_by_size), resized to the size of
+        #         their group and read batch_size at a time, so the text detector runs once per batch.
+        # Returns one readtext style result list per image, in input order and in original image coordinates.
+        images = [np.asarray(image) for image in images]
+        results = [None] * len(images)
+
+        for key, indices in self.group_by_size(images, size_step).items():
+            height, width = key[:2]
+            for start in range(0, len(indices), batch_size):
+                chunk = indices[start:start + batch_size]
+                batch = [images[i] if images[i].shape[:2] == (height, width)
+                         else cv2.resize(images[i], (width, height), interpolation=cv2.INTER_LINEAR)
+                         for i in chunk]
+                outputs = self.reader.readtext_batched(batch, batch_size=batch_size, paragraph=False)
+
+                for i, output in zip(chunk, outputs):
+                    sy, sx = images[i].shape[0] / height, images[i].shape[1] / width
+                    output = [([[x * sx, y * sy] for x, y in bbox], text, conf) for bbox, text, conf in output]
+                    results[i] = self.refine_persian(images[i], output)
+
+        return results
 
 
 # OCR Data Processing
 class OCRDataProcessor:
-    def __init__(self):
-        self.bank_prefixes = {
-            "6219": "Saman",
-            "6037": "Melli",
-            "5892": "Sepah",
-            "5022": "Pasargad",
-            "6274": "Eghtesad Novin",
-            "6395": "Ghavamin",
-            "6221": "Parsian",
-            "6362": "Ayande",
-            "5894": "Refah",
-            "6104": "Melat"
-        }
+    def __init__(self, bin_table=DEFAULT_BIN_TABLE):
+        # bin_table: 'prefix,bank' csv of card issuers, prefixes (BINs) may have any length
+        self.bins = BinTrie.from_file(bin_table)
+        self.bank_prefixes = dict(self.bins.items())
 
         self.cv2_list = [
             'CV2', 'vv2', 'Cvv2', 'CVV2', 'cvv2', 'cv2', 'cw2', 'Cw2', 'cw', 'CV/2', 'C"v2'
         ]
+        self.extractor = FieldExtractor(self.bins, self.cv2_list)
 
     @staticmethod
     def correct_ocr_errors(text):
@@ -39,89 +130,7 @@ class OCRDataProcessor:
 
     @staticmethod
     def group_and_sort_ocr_data(ocr_data, y_threshold=60):
-        grouped_data = {}
-        for item in ocr_data:
-            bbox, _, _ = item
-            y_coord = bbox[0][1]
-            found = False
-            for key in grouped_data:
-                if abs(key - y_coord) <= y_threshold:
-                    grouped_data[key].append(item)
-                    found = True
-                    break
-            if not found:
-                grouped_data[y_coord] = [item]
-
-        for key in grouped_data:
-            grouped_data[key] = sorted(grouped_data[key], key=lambda x: x[0][0][0])
-
-        return grouped_data
+        return cluster_lines(ocr_data, y_threshold)
 
     def extract_card_info(self, grouped_ocr_results):
-        extracted_info = {
-            'card_number': [],
-            'iban': '',
-            'cvv2': '',
-            'expiry_date': '',
-            'owner_name': '',
-            'bank_name': ''
-        }
-        
-        temp_num = []
-        for group in grouped_ocr_results.values():
-            temp_card = ''
-            for _, text, _ in group:
-                text = text.replace(' ',"")
-                
-                pattern = r'[٠-٩]'
-                text = re.sub(pattern, 'v', text)
-                
-                if 'R' in text and re.search(r'\d+', text):
-    #             if 'R' in text and len(re.sub(r'\D', '', text)) >= 24 and re.search(r'\d+', text):
-                    extracted_info['iban'] = re.sub(r'\s+', '', text)[:26]  # IBAN length is 26 characters
-                    extracted_info['iban'] = extracted_info['iban'].replace('1R', 'IR').replace('&','8').replace('{','0').replace('"','0').replace('|','')
-                
-                if (len(text) == 4 or len(text) == 8 or len(text) == 12 or len(text) >= 16) and not(':' in text):
-                    if text.isdigit(): temp_card += text.replace(' ', "")
-                
-                elif re.match(r'^\D*(\d\D*){3}$', text) and text.isdigit():
-                    extracted_info['cvv2'] = text
-                
-                elif any(keyword in text for keyword in self.cv2_list):
-                    found_keyword = next((keyword for keyword in self.cv2_list if keyword in text), None)
-
-                    if found_keyword is not None:
-                        cvv2 = text.replace(found_keyword, "").replace(':', "").replace(' ', "")
-  
-                        if cvv2.isdigit(): extracted_info['cvv2'] = cvv2
-                        
-                elif re.match(r'^(\d{4}/\d{2}|\d{2}/\d{2})$', text):
-                    extracted_info['expiry_date'] = text
-                    
-                elif re.match(r'^[\D]+$', text) and not any(text.startswith(prefix) for prefix in self.bank_prefixes.keys()):
-                    extracted_info['owner_name'] = text
-                    
-            temp_num.append(temp_card)
-        
-        extract_digits = lambda s: ''.join(re.findall(r'\d', s))
-        temp_num = list(map(extract_digits, temp_num))
-        
-        try:
-            extracted_info['card_number'] = list(filter(lambda x: len(x) == 16 and x.isdigit(), temp_num))[0]
-            extracted_info['bank_name'] = self.bank_prefixes[extracted_info['card_number'][:4]]
-        except IndexError: 
-            extracted_info['card_number'] = ''.join([num.zfill(4) for num in temp_num if num.isdigit()])
-            extracted_info['card_number'] = extracted_info['card_number'][:16]
-            
-            try: extracted_info['bank_name'] = self.bank_prefixes[extracted_info['card_number'][:4]]
-            except IndexError: extracted_info['card_number'] = ''
-        
-    #     if len(extracted_info['card_number']) != 16: 
-    #         extracted_info['card_number'] = ''
-    #         extracted_info['bank_name'] = ''
-        
-        if extracted_info['cvv2'] == '':
-            try: extracted_info['cvv2'] = list(filter(lambda x: (len(x) == 4 or len(x) == 3) and x.isdigit(), temp_num))[0]
-            except IndexError: pass
-            
-        return extracted_info
\ No newline at end of file
+        return self.extractor.extract(grouped_ocr_results)
@@ -8,11 +8,72 @@ from pathlib import Path
 sys.path.append(os.path.abspath(Path(__file__).resolve().parents[0]))
 
 from ocr import OCRReader, OCRDataProcessor
-from utils.pre_proc import ImageProcessor, MakeNumbersBolderStrategy
+from utils.card_layout import CardLayoutReader
+from utils.pre_proc import ImageProcessor, CardDetectionStrategy, MakeNumbersBolderStrategy
+from utils.batch import BatchRunner, print_stats
 
-def main(img_path):
-    # Create an instance of ImageProcessor with the desired strategy
-    image_processor = ImageProcessor(MakeNumbersBolderStrategy())
+
+def read_card(img, ocr_reader, ocr_processor, layout=False, verbose=True):
+    # Layout mode recognises only the card fields, falling back to the full card when no layout is found
+    if layout:
+        extracted_card_info, timings = CardLayoutReader(ocr_reader, ocr_processor.bins).read(img)
+        if verbose:
+            print(', '.join(f"{stage}: {1000 * seconds:.1f} ms" for stage, seconds in timings.items() if not stage.endswith('boxes')))
+            print(f"Recognised {timings['recognised_boxes']} of {timings['detected_boxes']} detected boxes")
+        if extracted_card_info is not None:
+            return extracted_card_info
+
+    results = ocr_reader.read_text(img)
+
+    # Process OCR data
+    groups = ocr_processor.group_and_sort_ocr_data(results)
+    return ocr_processor.extract_card_info(groups)
+
+
+def card_reader(image_processor, ocr_reader, ocr_processor, layout=False):
+    # process(image) reads one card quietly, from a path, encoded bytes or a BGR array
+    return lambda image: read_card(cv2.cvtColor(image_processor.process(image), cv2.COLOR_BGR2RGB),
+                                   ocr_reader, ocr_processor, layout, verbose=False)
+
+
+def run_batch(source, output_path, image_processor, ocr_reader, ocr_processor, layout=False, resume=True):
+    # One warm reader for every card of a directory, manifest or archive, the results are streamed to JSONL
+    process = card_reader(image_processor, ocr_reader, ocr_processor, layout)
+    try:
+        stats = BatchRunner(process, output_path, resume=resume).run(source)
+    except FileNotFoundError:
+        print("Error: The provided batch source does not exist.")
+        return -1
+
+    print_stats(stats)
+    return 0
+
+
+def run_profile(img_path, iterations, output_prefix, image_processor, ocr_reader, ocr_processor, layout=False):
+    # Reads the image iterations times under torch.profiler and a sampling profiler, imported only here so that
+    # normal runs are not affected
+    from utils.profiling import profile_calls
+
+    try:
+        print(profile_calls(card_reader(image_processor, ocr_reader, ocr_processor, layout), [img_path], iterations, output_prefix))
+    except FileNotFoundError:
+        print("Error: The provided image file does not exist.")
+        return -1
+    return 0
+
+
+def main(img_path, device='cuda', num_threads=None, layout=False, full_image=False, eager_persian=False,
+         batch=None, output='results.jsonl', resume=True, profile_iters=None, profile_output='profile/card'):
+    # Create an instance of ImageProcessor with the desired strategy, after cropping the card to its canonical size
+    strategies = (MakeNumbersBolderStrategy(),) if full_image else (CardDetectionStrategy(), MakeNumbersBolderStrategy())
+    image_processor = ImageProcessor(*strategies)
+
+    if batch is not None:
+        ocr_reader = OCRReader(device=device, num_threads=num_threads, lazy_persian=not eager_persian)
+        return run_batch(batch, output, image_processor, ocr_reader, OCRDataProcessor(), layout, resume)
+    if profile_iters is not None:
+        ocr_reader = OCRReader(device=device, num_threads=num_threads, lazy_persian=not eager_persian)
+        return run_profile(img_path, profile_iters, profile_output, image_processor, ocr_reader, OCRDataProcessor(), layout)
 
     # Process an image
     try :
@@ -27,25 +88,48 @@ def main(img_path):
         return -1
     
     # Read text using OCRReader (Singleton)
-    ocr_reader = OCRReader()
-    results = ocr_reader.read_text(img)
-
-    # Process OCR data
+    ocr_reader = OCRReader(device=device, num_threads=num_threads, lazy_persian=not eager_persian)
     ocr_processor = OCRDataProcessor()
-    groups = ocr_processor.group_and_sort_ocr_data(results)
-    extracted_card_info = ocr_processor.extract_card_info(groups)
 
+    extracted_card_info = read_card(img, ocr_reader, ocr_processor, layout)
     print(extracted_card_info)
     return 0
 
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description='Process an image for credit card information extraction.')
     
-    # Add an argument to specify the image file path
-    parser.add_argument('-pth', '--image_path', type=str, help='Path to the image file to process',required=True)
+    # Add arguments to specify the image file path, or the directory, manifest or archive of the batch mode
+    inputs = parser.add_mutually_exclusive_group(required=True)
+    inputs.add_argument('-pth', '--image_path', type=str, help='Path to the image file to process')
+    inputs.add_argument('-b', '--batch', type=str, help='Directory of images, manifest (one image path per line) or zip/tar archive to process with one reader')
+
+    # Add arguments to select the device and the number of CPU threads
+    parser.add_argument('-d', '--device', type=str, default='cuda', help="Device to run easyocr on, e.g. 'cuda', 'cuda:1' or 'cpu'")
+    parser.add_argument('-t', '--num_threads', type=int, default=None, help='Number of CPU threads used by torch')
     
+    # Add an argument to recognise only the card fields
+    parser.add_argument('-l', '--layout', action='store_true', help='Recognise only the number, expiry, CVV2, IBAN and name bands of the card')
+
+    # Add an argument to pass the whole image to OCR instead of the detected card
+    parser.add_argument('-f', '--full_image', action='store_true', help='Skip the card detection and pass the whole image to OCR')
+
+    # Add an argument to load the Persian recognizer at startup instead of on first use
+    parser.add_argument('-e', '--eager_persian', action='store_true', help='Load the Persian recognizer at startup and run it on every box')
+
+    # Add arguments for the output and checkpoint of the batch mode
+    parser.add_argument('-o', '--output', type=str, default='results.jsonl', help='JSONL output of the batch mode, also the checkpoint to resume from')
+    parser.add_argument('--no_resume', action='store_true', help='Overwrite the batch output instead of skipping the cards it already lists')
+
+    # Add arguments to profile the reading of one image
+    parser.add_argument('--profile', action='store_true', help='Profile the reading of the image instead of printing its fields')
+    parser.add_argument('--profile_iters', type=int, default=20, help='Number of profiled reads')
+    parser.add_argument('--profile_output', type=str, default='profile/card', help='Prefix of the trace, flamegraph stacks and summary files')
+
     # Parse the command-line arguments
     args = parser.parse_args()
+    if args.profile and args.image_path is None:
+        parser.error('--profile requires --image_path')
     
     # Call the main function with the provided image path
-    main(args.image_path)
\ No newline at end of file
+    main(args.image_path, args.device, args.num_threads, args.layout, args.full_image, args.eager_persian,
+         args.batch, args.output, not args.no_resume, args.profile_iters if args.profile else None, args.profile_output)
\ No newline at end of file
@@ -0,0 +1,216 @@
+import cv2
+import json
+import time
+import argparse
+import resource
+import platform
+import tracemalloc
+import numpy as np
+from easyocr.utils import reformat_input
+
+import os
+import sys
+from pathlib import Path
+
+sys.path.append(os.path.abspath(Path(__file__).resolve().parents[0]))
+
+from ocr import OCRReader, OCRDataProcessor
+from utils.pre_proc import ImageProcessor, CardDetectionStrategy, MakeNumbersBolderStrategy, load_image
+from utils.image_pack import iter_images
+
+
+FIELDS = ['card_number', 'iban', 'cvv2', 'expiry_date', 'owner_name', 'bank_name']
+STAGES = ['preprocess', 'detection', 'recognition', 'persian', 'grouping', 'extraction']
+
+
+def run_stages(image, image_processor, ocr_reader, ocr_processor):
+    # One card through the pipeline of run.py, split at the stage boundaries. Returns the fields and the stage times.
+    times = {}
+    start_time = time.perf_counter()
+    img = cv2.cvtColor(image_processor.process(image), cv2.COLOR_BGR2RGB)
+    times['preprocess'] = time.perf_counter() - start_time
+
+    # easyocr's readtext is detect followed by recognize on the grey image
+    start_time = time.perf_counter()
+    img, img_grey = reformat_input(img)
+    horizontal_list, free_list = ocr_reader.reader.detect(img)
+    times['detection'] = time.perf_counter() - start_time
+
+    start_time = time.perf_counter()
+    results = ocr_reader.reader.recognize(img_grey, horizontal_list[0], free_list[0], detail=1, paragraph=False)
+    times['recognition'] = time.perf_counter() - start_time
+
+    start_time = time.perf_counter()
+    results = ocr_reader.refine_persian(img, results)
+    times['persian'] = time.perf_counter() - start_time
+
+    start_time = time.perf_counter()
+    groups = ocr_processor.group_and_sort_ocr_data(results)
+    times['grouping'] = time.perf_counter() - start_time
+
+    start_time = time.perf_counter()
+    info = ocr_processor.extract_card_info(groups)
+    times['extraction'] = time.perf_counter() - start_time
+    return info, times
+
+
+def stage_peaks(image, image_processor, ocr_reader, ocr_processor):
+    # Peak traced Python/NumPy memory per stage, from a separate run because tracing slows every allocation down.
+    # Torch tensors are not allocated through Python and only show up in the maximum resident set size.
+    peaks = {}
+    tracemalloc.start()
+    try:
+        def traced(stage, function, *args):
+            tracemalloc.reset_peak()
+            base = tracemalloc.get_traced_memory()[0]
+            result = function(*args)
+            peaks[stage] = tracemalloc.get_traced_memory()[1] - base
+            return result
+
+        img = traced('preprocess', lambda: cv2.cvtColor(image_processor.process(image), cv2.COLOR_BGR2RGB))
+        img, img_grey = reformat_input(img)
+        horizontal_list, free_list = traced('detection', ocr_reader.reader.detect, img)
+        results = traced('recognition', lambda: ocr_reader.reader.recognize(img_grey, horizontal_list[0], free_list[0],
+                                                                             detail=1, paragraph=False))
+        results = traced('persian', ocr_reader.refine_persian, img, results)
+        groups = traced('grouping', ocr_processor.group_and_sort_ocr_data, results)
+        traced('extraction', ocr_processor.extract_card_info, groups)
+    finally:
+        tracemalloc.stop()
+    return peaks
+
+
+def max_rss_mb():
+    # ru_maxrss is in kilobytes on Linux and in bytes on macOS
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss / (1024 * 1024) if platform.system() == 'Darwin' else rss / 1024
+
+
+def summarise(values):
+    values = np.asarray(values)
+    return {'p50_ms': 1000 * float(np.percentile(values, 50)), 'p95_ms': 1000 * float(np.percentile(values, 95)),
+            'mean_ms': 1000 * float(values.mean())}
+
+
+def compare(report, baseline, tolerance):
+    # Prints the p50/p95 change of every stage and the accuracy change of every field. Returns the regressions, the
+    # stages slower than the baseline by more than tolerance and the fields that lost accuracy.
+    regressions = []
+    print("--------------------------------------------- vs. baseline ---------------------------------------------")
+    for stage, current in report['stages'].items():
+        previous = baseline.get('stages', {}).get(stage)
+        if previous is None:
+            continue
+        changes = []
+        for key in ('p50_ms', 'p95_ms'):
+            ratio = current[key] / max(previous[key], 1e-6)
+            changes.append(f"{key[:3]} {previous[key]:8.2f} -> {current[key]:8.2f} ms ({100 * (ratio - 1):+6.1f}%)")
+            if ratio > 1 + tolerance and current[key] - previous[key] > 0.05:
+                regressions.append(f"{stage} {key[:3]}")
+        print(f"{stage:12s}: {', '.join(changes)}")
+
+    for field, accuracy in report['accuracy'].items():
+        previous = baseline.get('accuracy', {}).get(field)
+        if previous is None:
+            continue
+        print(f"{field:12s}: accuracy {100 * previous:5.1f}% -> {100 * accuracy:5.1f}%")
+        if accuracy < previous:
+            regressions.append(f"{field} accuracy")
+
+    print(f"Regressions (tolerance {100 * tolerance:.0f}%): {', '.join(regressions) if regressions else 'none'}")
+    return regressions
+
+
+def main(image_dir, labels_path, repeats, warmup, device, num_threads, full_image, output, baseline_path, tolerance):
+    ocr_reader = OCRReader(device=device, num_threads=num_threads)
+    ocr_processor = OCRDataProcessor()
+    strategies = (MakeNumbersBolderStrategy(),) if full_image else (CardDetectionStrategy(), MakeNumbersBolderStrategy())
+    image_processor = ImageProcessor(*strategies)
+
+    images = {}
+    for name, image in iter_images(image_dir):
+        try:
+            images[name] = load_image(image)
+        except (FileNotFoundError, ValueError):
+            continue
+    if not images:
+        print("Error: No readable image in the provided directory.")
+        # Exit status 2, so that a missing input is not mistaken for a regression (1)
+        return 2
+
+    # Optional ground truth: {"image file name": {"card_number": "...", "cvv2": "...", ...}}
+    labels = {}
+    if labels_path is not None:
+        with open(labels_path, encoding='utf-8') as file:
+            labels = json.load(file)
+
+    # Warmup, so that model loading, lazy initialisation and the first CUDA kernels are not timed
+    for _ in range(warmup):
+        for image in images.values():
+            run_stages(image, image_processor, ocr_reader, ocr_processor)
+
+    times = {stage: [] for stage in STAGES + ['total']}
+    hits = {field: [] for field in FIELDS}
+    peaks = {stage: 0 for stage in STAGES}
+    for name, image in images.items():
+        for _ in range(repeats):
+            info, card_times = run_stages(image, image_processor, ocr_reader, ocr_processor)
+            for stage, seconds in card_times.items():
+                times[stage].append(seconds)
+            times['total'].append(sum(card_times.values()))
+
+        for field in FIELDS:
+            if field in labels.get(name, {}):
+                hits[field].append(info[field] == labels[name][field])
+        for stage, peak in stage_peaks(image, image_processor, ocr_reader, ocr_processor).items():
+            peaks[stage] = max(peaks[stage], peak)
+
+    report = {
+        'images': len(images), 'repeats': repeats, 'device': ocr_reader.device, 'full_image': full_image,
+        'stages': {stage: summarise(values) for stage, values in times.items()},
+        'peak_memory_mb': {stage: peak / (1024 * 1024) for stage, peak in peaks.items()},
+        'max_rss_mb': max_rss_mb(),
+        'accuracy': {field: float(np.mean(values)) for field, values in hits.items() if values},
+    }
+
+    total = report['stages']['total']['mean_ms']
+    print(f"{len(images)} images x {repeats} repeats on {ocr_reader.device}")
+    for stage in STAGES + ['total']:
+        summary = report['stages'][stage]
+        peak = f", peak {report['peak_memory_mb'][stage]:7.2f} MB" if stage in peaks else ''
+        print(f"{stage:12s}: p50 {summary['p50_ms']:8.2f} ms, p95 {summary['p95_ms']:8.2f} ms, "
+              f"{100 * summary['mean_ms'] / max(total, 1e-9):5.1f}% of the time{peak}")
+    print(f"Max resident set size: {report['max_rss_mb']:.0f} MB")
+    for field, accuracy in report['accuracy'].items():
+        print(f"{field:12s}: accuracy {100 * accuracy:5.1f}%")
+
+    if output is not None:
+        with open(output, 'w', encoding='utf-8') as file:
+            json.dump(report, file, indent=2)
+
+    if baseline_path is not None:
+        with open(baseline_path, encoding='utf-8') as file:
+            baseline = json.load(file)
+        if compare(report, baseline, tolerance):
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Benchmark every stage of the credit card pipeline.')
+
+    parser.add_argument('-dir', '--image_dir', type=str, default=str(Path(__file__).resolve().parents[2] / 'Evaluate_Dataset'),
+                        help='Directory of card images or image pack (utils/image_pack.py)')
+    parser.add_argument('-lbl', '--labels', type=str, default=None, help='Optional json with the expected fields per image')
+    parser.add_argument('-r', '--repeats', type=int, default=5, help='Timed runs per image')
+    parser.add_argument('-w', '--warmup', type=int, default=1, help='Untimed runs over all images before timing')
+    parser.add_argument('-d', '--device', type=str, default='cpu', help="Device to run easyocr on, e.g. 'cuda' or 'cpu'")
+    parser.add_argument('-t', '--num_threads', type=int, default=None, help='Number of CPU threads used by torch')
+    parser.add_argument('-f', '--full_image', action='store_true', help='Skip the card detection, as run.py -f')
+    parser.add_argument('-o', '--output', type=str, default=None, help='Write the report to this json file')
+    parser.add_argument('-bl', '--baseline', type=str, default=None, help='Report json of an earlier run to compare against')
+    parser.add_argument('--tolerance', type=float, default=0.1, help='Relative slowdown of a stage reported as a regression')
+
+    args = parser.parse_args()
+    sys.exit(main(args.image_dir, args.labels, args.repeats, args.warmup, args.device, args.num_threads,
+                  args.full_image, args.output, args.baseline, args.tolerance))
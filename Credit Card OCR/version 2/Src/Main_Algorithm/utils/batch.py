@@ -0,0 +1,154 @@
+import os
+import json
+import time
+import tarfile
+import zipfile
+import numpy as np
+from utils.image_pack import ImagePack, is_pack
+
+
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.bmp', '.tif', '.tiff', '.webp')
+ARCHIVE_EXTENSIONS = ('.zip', '.tar', '.tar.gz', '.tgz', '.tar.bz2', '.tar.xz')
+
+
+# Batch Inputs
+def is_image(name):
+    return name.lower().endswith(IMAGE_EXTENSIONS)
+
+
+def iter_directory(directory):
+    # Image paths below the directory, in a stable order so that a resumed job sees the same sequence
+    for root, dirs, files in os.walk(directory):
+        dirs.sort()
+        for name in sorted(files):
+            if is_image(name):
+                path = os.path.join(root, name)
+                yield os.path.relpath(path, directory), path
+
+
+def iter_manifest(manifest):
+    # One image path per line (the first column of a csv), relative paths are relative to the manifest.
+    # Empty lines and lines starting with '#' are skipped.
+    base = os.path.dirname(os.path.abspath(manifest))
+    with open(manifest, encoding='utf-8') as file:
+        for line in file:
+            path = line.split(',')[0].strip()
+            if path and not path.startswith('#'):
+                yield path, path if os.path.isabs(path) else os.path.join(base, path)
+
+
+def iter_archive(archive, skip=()):
+    # Encoded image bytes of the archive members. Members whose name is in skip are not read.
+    if archive.lower().endswith('.zip'):
+        with zipfile.ZipFile(archive) as file:
+            for info in file.infolist():
+                if not info.is_dir() and is_image(info.filename) and info.filename not in skip:
+                    yield info.filename, file.read(info)
+        return
+
+    # Streamed, so compressed tar files are read once from start to end
+    with tarfile.open(archive, 'r|*') as file:
+        for member in file:
+            if member.isfile() and is_image(member.name) and member.name not in skip:
+                yield member.name, file.extractfile(member).read()
+
+
+def iter_inputs(source, skip=()):
+    # source: Directory of images, archive (zip, tar, tar.gz, ...), image pack (.pack) or manifest (any other file).
+    # Yields (key, image) pairs where image is a path, encoded bytes or a decoded view, accepted by pre_proc.load_image.
+    if os.path.isdir(source):
+        items = iter_directory(source)
+    elif is_pack(source):
+        items = iter(ImagePack(source))
+    elif source.lower().endswith(ARCHIVE_EXTENSIONS):
+        return iter_archive(source, skip)
+    elif os.path.isfile(source):
+        items = iter_manifest(source)
+    else:
+        raise FileNotFoundError(source)
+    return ((key, image) for key, image in items if key not in skip)
+
+
+# Checkpointing
+def load_checkpoint(output_path):
+    # Keys already written to the JSONL output. The file is truncated after its last complete line: a line cut short
+    # by a crash, even one that is valid JSON but lacks its newline, is removed, so that the card is read again and
+    # the next record does not get appended to it.
+    done = set()
+    if not os.path.isfile(output_path):
+        return done
+
+    with open(output_path, 'rb+') as file:
+        valid_size = 0
+        for line in file:
+            if not line.endswith(b'\n'):
+                break
+            try:
+                done.add(json.loads(line)['image'])
+            except (ValueError, KeyError):
+                break
+            valid_size += len(line)
+        file.truncate(valid_size)
+    return done
+
+
+class BatchRunner:
+    def __init__(self, read_card, output_path, resume=True, flush_every=64):
+        # read_card: Callable taking an image path or encoded bytes and returning the extracted card info dict.
+        # output_path: JSONL file, one {"image", "info", "seconds"} (or {"image", "error"}) object per card. The
+        #              output is the checkpoint: with resume, the cards it already lists are skipped.
+        # flush_every: Cards between two flushes to disk, at most this many cards are read again after a crash.
+        self.read_card = read_card
+        self.output_path = output_path
+        self.resume = resume
+        self.flush_every = flush_every
+
+    def run(self, source, log_every=1000):
+        done = load_checkpoint(self.output_path) if self.resume else set()
+        latencies, errors = [], 0
+
+        start_time = time.perf_counter()
+        with open(self.output_path, 'a' if self.resume else 'w', encoding='utf-8') as output:
+            for key, image in iter_inputs(source, done):
+                card_start = time.perf_counter()
+                try:
+                    record = {'image': key, 'info': self.read_card(image)}
+                except Exception as e:
+                    record = {'image': key, 'error': f"{type(e).__name__}: {e}"}
+                    errors += 1
+                seconds = time.perf_counter() - card_start
+                record['seconds'] = round(seconds, 4)
+                latencies.append(seconds)
+                output.write(json.dumps(record, ensure_ascii=False) + '\n')
+
+                if len(latencies) % self.flush_every == 0:
+                    output.flush()
+                    os.fsync(output.fileno())
+                if log_every and len(latencies) % log_every == 0:
+                    print(f"{len(latencies)} cards, {len(latencies) / (time.perf_counter() - start_time):.2f} cards/s")
+
+        return self.stats(latencies, errors, len(done), time.perf_counter() - start_time)
+
+    @staticmethod
+    def stats(latencies, errors, skipped, seconds):
+        # Per-card latency percentiles and the aggregate throughput of this run
+        cards = len(latencies)
+        latencies = np.asarray(latencies) if cards else np.zeros(1)
+        return {
+            'cards': cards,
+            'errors': errors,
+            'skipped': skipped,
+            'seconds': seconds,
+            'throughput': cards / seconds if seconds > 0 else 0.0,
+            'mean_ms': 1000 * float(latencies.mean()),
+            'p50_ms': 1000 * float(np.percentile(latencies, 50)),
+            'p95_ms': 1000 * float(np.percentile(latencies, 95)),
+            'max_ms': 1000 * float(latencies.max()),
+        }
+
+
+def print_stats(stats):
+    print(f"Read {stats['cards']} cards ({stats['errors']} errors, {stats['skipped']} skipped from the checkpoint) "
+          f"in {stats['seconds']:.1f} s, {stats['throughput']:.2f} cards/s")
+    print(f"Latency per card: mean {stats['mean_ms']:.1f} ms, p50 {stats['p50_ms']:.1f} ms, "
+          f"p95 {stats['p95_ms']:.1f} ms, max {stats['max_ms']:.1f} ms")
@@ -0,0 +1,189 @@
+import re
+import time
+import cv2
+import numpy as np
+
+
+# Width of the normalised card, ID-1 cards are 85.6 x 54 mm
+CARD_WIDTH = 856
+
+# Character allowlists of the bands, None recognises the full en + fa character set
+BAND_ALLOWLISTS = {
+    'card_number': '0123456789',
+    'expiry_cvv2': '0123456789/:CVvc',
+    'iban': 'IR0123456789',
+    'owner_name': None,
+}
+
+
+# Card Normalisation
+def normalise_card(image, width=CARD_WIDTH):
+    # Resize the card to the canonical width, keeping the aspect ratio
+    h, w = image.shape[:2]
+    if w == width:
+        return image
+    interpolation = cv2.INTER_AREA if w > width else cv2.INTER_CUBIC
+    return cv2.resize(image, (width, max(1, round(h * width / w))), interpolation=interpolation)
+
+
+def to_horizontal(horizontal_list, free_list):
+    # Detector boxes as [x_min, x_max, y_min, y_max], rotated boxes replaced by their bounding box
+    boxes = [list(map(int, box)) for box in horizontal_list]
+    for quad in free_list:
+        xs, ys = [p[0] for p in quad], [p[1] for p in quad]
+        boxes.append([int(min(xs)), int(max(xs)), int(min(ys)), int(max(ys))])
+    return boxes
+
+
+def group_lines(boxes):
+    # Group boxes into text lines by their vertical centre, lines sorted top to bottom
+    if not boxes:
+        return []
+    heights = np.array([box[3] - box[2] for box in boxes])
+    tolerance = 0.5 * max(float(np.median(heights)), 1.0)
+
+    lines = []
+    for box in sorted(boxes, key=lambda b: (b[2] + b[3]) / 2):
+        center = (box[2] + box[3]) / 2
+        if lines and abs(center - lines[-1]['center']) <= tolerance:
+            line = lines[-1]
+            line['boxes'].append(box)
+            line['center'] = np.mean([(b[2] + b[3]) / 2 for b in line['boxes']])
+        else:
+            lines.append({'center': center, 'boxes': [box]})
+
+    for line in lines:
+        line['boxes'].sort(key=lambda b: b[0])
+        line['width'] = sum(b[1] - b[0] for b in line['boxes'])
+        line['height'] = float(np.median([b[3] - b[2] for b in line['boxes']]))
+    return lines
+
+
+def assign_bands(boxes, shape):
+    # Locate the card fields from the detector boxes alone.
+    # The card number is the most prominent line (width x text height) in the middle of the card. The first line
+    # below it holds expiry date and CVV2, the widest remaining line below is the IBAN when it spans a good part of
+    # the card, and the next remaining line is the owner name. Boxes outside these bands are never recognised.
+    height, width = shape[:2]
+    lines = group_lines(boxes)
+    middle = [line for line in lines if 0.25 * height <= line['center'] <= 0.8 * height]
+    if not middle:
+        return None
+
+    number = max(middle, key=lambda line: line['width'] * line['height'])
+    bands = {'card_number': number['boxes'], 'expiry_cvv2': [], 'iban': [], 'owner_name': []}
+
+    below = [line for line in lines if line['center'] > number['center']]
+    if below:
+        bands['expiry_cvv2'] = below[0]['boxes']
+        below = below[1:]
+
+    if below:
+        iban = max(below, key=lambda line: line['width'])
+        if iban['width'] >= 0.4 * width:
+            bands['iban'] = iban['boxes']
+            below = [line for line in below if line is not iban]
+
+    if below:
+        bands['owner_name'] = below[0]['boxes']
+    return bands
+
+
+# Field Parsing
+def parse_card_number(texts):
+    digits = re.sub(r'\D', '', ''.join(texts))
+    return digits[:16] if len(digits) >= 16 else ''
+
+
+def parse_expiry_cvv2(texts):
+    expiry, cvv2 = '', ''
+    joined = ' '.join(texts)
+
+    match = re.search(r'(\d{4}|\d{2})/(\d{2})', joined)
+    if match:
+        expiry = match.group(0)
+        joined = joined.replace(expiry, ' ')
+
+    match = re.search(r'[CcVv]+2?:?\s*(\d{3,4})(?!\d)', joined)
+    if match is None:
+        match = re.search(r'(?<!\d)(\d{3,4})(?!\d)', joined)
+    if match:
+        cvv2 = match.group(1)
+    return expiry, cvv2
+
+
+def parse_iban(texts):
+    digits = re.sub(r'\D', '', ''.join(texts))
+    return 'IR' + digits[:24] if len(digits) >= 24 else ''
+
+
+def parse_owner_name(texts):
+    # Persian names are read right to left, the boxes come sorted left to right
+    return ' '.join(reversed([text.strip() for text in texts if text.strip()]))
+
+
+class CardLayoutReader:
+    def __init__(self, ocr_reader, bins):
+        # ocr_reader: An OCRReader, its Latin easyocr reader is used for detection and band recognition, the name band
+        #             is refined with its Persian recognizer.
+        # bins: BinTrie from card number prefixes to bank names, e.g. OCRDataProcessor().bins.
+        self.ocr_reader = ocr_reader
+        self.reader = ocr_reader.reader
+        self.bins = bins
+        self.parsers = {
+            'card_number': parse_card_number,
+            'expiry_cvv2': parse_expiry_cvv2,
+            'iban': parse_iban,
+            'owner_name': parse_owner_name,
+        }
+
+    def recognise_band(self, grey, boxes, allowlist, persian=False):
+        if not boxes:
+            return []
+        results = self.reader.recognize(grey, horizontal_list=boxes, free_list=[], allowlist=allowlist,
+                                        detail=1, paragraph=False, reformat=False)
+        if persian:
+            results = self.ocr_reader.refine_persian(grey, results)
+        # easyocr returns the horizontal boxes in their input order, i.e. left to right
+        return [text for _, text, _ in results]
+
+    def read(self, image):
+        # Reads one RGB card image in layout mode.
+        # Returns (extracted_info, timings) where extracted_info has the keys of OCRDataProcessor.extract_card_info
+        # (None when no card number band is found) and timings holds the seconds spent per stage and per field,
+        # plus the number of detected and recognised boxes.
+        timings = {}
+
+        start_time = time.perf_counter()
+        card = normalise_card(np.asarray(image))
+        grey = cv2.cvtColor(card, cv2.COLOR_RGB2GRAY) if card.ndim == 3 else card
+        timings['normalise'] = time.perf_counter() - start_time
+
+        start_time = time.perf_counter()
+        horizontal_list, free_list = self.reader.detect(card)
+        boxes = to_horizontal(horizontal_list[0], free_list[0])
+        bands = assign_bands(boxes, card.shape)
+        timings['detect'] = time.perf_counter() - start_time
+        timings['detected_boxes'] = len(boxes)
+        if bands is None:
+            timings['recognised_boxes'] = 0
+            return None, timings
+
+        fields = {}
+        for band, band_boxes in bands.items():
+            start_time = time.perf_counter()
+            texts = self.recognise_band(grey, band_boxes, BAND_ALLOWLISTS[band], persian=band == 'owner_name')
+            fields[band] = self.parsers[band](texts)
+            timings[band] = time.perf_counter() - start_time
+        timings['recognised_boxes'] = sum(len(band_boxes) for band_boxes in bands.values())
+
+        expiry, cvv2 = fields['expiry_cvv2']
+        extracted_info = {
+            'card_number': fields['card_number'],
+            'iban': fields['iban'],
+            'cvv2': cvv2,
+            'expiry_date': expiry,
+            'owner_name': fields['owner_name'],
+            'bank_name': self.bins.lookup(fields['card_number']),
+        }
+        return extracted_info, timings
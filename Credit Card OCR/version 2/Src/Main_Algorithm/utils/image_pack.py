@@ -0,0 +1,150 @@
+import os
+import sys
+import glob
+import json
+import struct
+import argparse
+import cv2
+import numpy as np
+
+
+MAGIC = b'IMGPACK1'
+HEADER = struct.Struct('<8sQQ')
+ALIGNMENT = 64
+PACK_EXTENSION = '.pack'
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.bmp', '.tif', '.tiff', '.webp')
+
+
+# Writing
+def fit_max_side(image, max_side):
+    # Shrinks (INTER_AREA) so that the longest side is at most max_side, smaller images are returned as they are
+    h, w = image.shape[:2]
+    scale = max_side / max(h, w)
+    if scale >= 1:
+        return image
+    return cv2.resize(image, (max(1, round(w * scale)), max(1, round(h * scale))), interpolation=cv2.INTER_AREA)
+
+
+class PackWriter:
+    def __init__(self, pack_path, max_side=None):
+        # Streams decoded images into a pack file, see pack_images for the layout. The file is written as
+        # pack_path.tmp and renamed into place by close. max_side: Optional longest side the images are shrunk to.
+        self.pack_path = pack_path
+        self.max_side = max_side
+        self.index = []
+        self.file = open(pack_path + '.tmp', 'wb')
+        self.file.write(HEADER.pack(MAGIC, 0, 0))
+
+    def add(self, name, image):
+        # Appends one uint8 image under name
+        original_shape = image.shape
+        if self.max_side:
+            image = fit_max_side(image, self.max_side)
+
+        offset = self.file.tell()
+        padding = -offset % ALIGNMENT
+        self.file.write(b'\0' * padding)
+        offset += padding
+        self.file.write(np.ascontiguousarray(image).tobytes())
+        self.index.append({'name': name, 'offset': offset, 'shape': list(image.shape),
+                           'original_shape': list(original_shape)})
+
+    def close(self):
+        # Writes the index and the header and renames the pack into place. Returns the number of packed images
+        index_offset = self.file.tell()
+        index_bytes = json.dumps({'images': self.index, 'max_side': self.max_side}, ensure_ascii=False).encode('utf-8')
+        self.file.write(index_bytes)
+        self.file.seek(0)
+        self.file.write(HEADER.pack(MAGIC, index_offset, len(index_bytes)))
+        self.file.close()
+        os.replace(self.pack_path + '.tmp', self.pack_path)
+        return len(self.index)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, *exc):
+        if exc_type is None:
+            self.close()
+        else:
+            self.file.close()
+        return False
+
+
+def pack_images(img_paths, pack_path, max_side=None, names=None):
+    # Decodes every image once into a single file: a 24 byte header (magic, index offset, index length), the raw
+    # uint8 BGR pixels of every image aligned to 64 bytes, then a json index of {name, offset, shape, original_shape}.
+    # names: Optional key per image (default is the file name). Unreadable files are skipped.
+    names = [os.path.basename(p) for p in img_paths] if names is None else list(names)
+    with PackWriter(pack_path, max_side) as writer:
+        for img_path, name in zip(img_paths, names):
+            image = cv2.imread(img_path, cv2.IMREAD_COLOR)
+            if image is None:
+                print(f"Skipping {img_path}: not a decodable image")
+                continue
+            writer.add(name, image)
+    return len(writer.index)
+
+
+# Reading
+class ImagePack:
+    def __init__(self, pack_path):
+        # Read-only memory mapping of a pack: images are numpy views of the mapping, nothing is decoded or copied
+        # and the pages are shared by every process reading the same pack
+        with open(pack_path, 'rb') as file:
+            magic, index_offset, index_length = HEADER.unpack(file.read(HEADER.size))
+            if magic != MAGIC:
+                raise ValueError(f"{pack_path} is not an image pack.")
+            file.seek(index_offset)
+            index = json.loads(file.read(index_length).decode('utf-8'))
+
+        self.path = pack_path
+        self.max_side = index.get('max_side')
+        self.entries = index['images']
+        self.names = [entry['name'] for entry in self.entries]
+        self.positions = {name: i for i, name in enumerate(self.names)}
+        self.data = np.memmap(pack_path, dtype=np.uint8, mode='r')
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __getitem__(self, key):
+        # key: Position or name of the image. Returns a read-only uint8 BGR view
+        entry = self.entries[self.positions[key] if isinstance(key, str) else key]
+        shape = tuple(entry['shape'])
+        size = int(np.prod(shape))
+        return self.data[entry['offset']:entry['offset'] + size].reshape(shape)
+
+    def __iter__(self):
+        for i, name in enumerate(self.names):
+            yield name, self[i]
+
+
+def is_pack(source):
+    return os.path.isfile(source) and source.lower().endswith(PACK_EXTENSION)
+
+
+def iter_images(source):
+    # (name, image) pairs of a pack (decoded views) or of a directory's images (paths), named by file name in both
+    # cases and both accepted by pre_proc.load_image
+    if is_pack(source):
+        return iter(ImagePack(source))
+    return ((os.path.basename(p), p) for p in sorted(glob.glob(os.path.join(source, '*.*')))
+            if p.lower().endswith(IMAGE_EXTENSIONS))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Pre-decode card images into a memory-mapped image pack")
+    parser.add_argument('-dir', '--image_dir', type=str, required=True, help='Directory of card images')
+    parser.add_argument('-o', '--output', type=str, required=True, help='Pack file to write, e.g. cards.pack')
+    parser.add_argument('-m', '--max_side', type=int, default=None, help='Pre-resize so that the longest side is at most this')
+
+    args = parser.parse_args()
+    img_paths = sorted(p for p in glob.glob(os.path.join(args.image_dir, '*.*')) if p.lower().endswith(IMAGE_EXTENSIONS))
+    count = pack_images(img_paths, args.output, args.max_side)
+    print(f"Packed {count} images into {args.output} ({os.path.getsize(args.output) / 2 ** 20:.1f} MB)")
+    return 0 if count else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
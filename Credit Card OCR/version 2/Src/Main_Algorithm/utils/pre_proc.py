@@ -1,37 +1,198 @@
+import os
 import cv2
+import threading
 import numpy as np
+from concurrent.futures import ThreadPoolExecutor
 from singleton_decorator import singleton
 
+
+# Image Loading
+def load_image(image):
+    # Accepts a file path, encoded image bytes (e.g. from a network socket or a queue) or a decoded BGR array
+    if isinstance(image, np.ndarray):
+        return image
+    if isinstance(image, (bytes, bytearray, memoryview)):
+        decoded = cv2.imdecode(np.frombuffer(image, dtype=np.uint8), cv2.IMREAD_COLOR)
+        if decoded is None:
+            raise ValueError("The provided bytes are not a decodable image.")
+        return decoded
+
+    image_path = os.fspath(image)
+    if not os.path.isfile(image_path):
+        raise FileNotFoundError(image_path)
+    decoded = cv2.imread(image_path, cv2.IMREAD_COLOR)
+    if decoded is None:
+        raise ValueError(f"{image_path} is not a decodable image.")
+    return decoded
+
+
+# Scratch Buffers
+class ScratchBuffers:
+    def __init__(self):
+        # Per-thread intermediate arrays, reallocated only when the image size changes
+        self._local = threading.local()
+
+    def get(self, name, shape, dtype=np.uint8):
+        buffers = self._local.__dict__
+        buffer = buffers.get(name)
+        if buffer is None or buffer.shape != shape or buffer.dtype != dtype:
+            buffer = np.empty(shape, dtype=dtype)
+            buffers[name] = buffer
+        return buffer
+
+
 # Image Processing Strategies
 class ImageProcessor:
-    def __init__(self, strategy):
+    def __init__(self, strategy, *strategies, max_workers=None):
+        # strategy, *strategies: Applied in order to the decoded image, e.g. ImageProcessor(MakeNumbersBolderStrategy(),
+        #                        EnhanceImageStrategy()) bolds the numbers and then enhances the result.
+        # max_workers: Threads used by process_many (default is the ThreadPoolExecutor default).
         self.strategy = strategy
+        self.strategies = (strategy,) + strategies
+        self.max_workers = max_workers
+
+    def process(self, image):
+        # image: File path, encoded bytes or BGR array. The image is decoded once for the whole chain and an input
+        #        array is never modified.
+        image = load_image(image)
+        for strategy in self.strategies:
+            image = strategy.apply(image)
+        return image
+
+    def process_many(self, images, max_workers=None):
+        # Processes the images on a thread pool, OpenCV releases the GIL while decoding and filtering.
+        # Returns the processed images in input order, the first failure is raised.
+        with ThreadPoolExecutor(max_workers=max_workers or self.max_workers) as executor:
+            return list(executor.map(self.process, images))
 
-    def process(self, image_path):
-        return self.strategy.process(image_path)
 
 @singleton
 class EnhanceImageStrategy:
-    @staticmethod
-    def process(image_path):
-        image = cv2.imread(image_path, cv2.IMREAD_COLOR)
-        yuv = cv2.cvtColor(image, cv2.COLOR_BGR2YUV)
-        y, u, v = cv2.split(yuv)
-        clahe = cv2.createCLAHE(clipLimit=2.0, tileGridSize=(8, 8))
-        y = clahe.apply(y)
-        merged = cv2.merge([y, u, v])
-        result = cv2.cvtColor(merged, cv2.COLOR_YUV2BGR)
-        sharpen_kernel = np.array([[-1, -1, -1], [-1, 9, -1], [-1, -1, -1]])
-        result = cv2.filter2D(result, -1, sharpen_kernel)
-        return result
+    def __init__(self):
+        self.clahe = threading.local()
+        self.scratch = ScratchBuffers()
+        self.sharpen_kernel = np.array([[-1, -1, -1], [-1, 9, -1], [-1, -1, -1]])
+
+    def process(self, image):
+        return self.apply(load_image(image))
+
+    def apply(self, image):
+        # CLAHE objects are not thread safe, so every thread gets its own
+        clahe = getattr(self.clahe, 'clahe', None)
+        if clahe is None:
+            clahe = self.clahe.clahe = cv2.createCLAHE(clipLimit=2.0, tileGridSize=(8, 8))
+
+        h, w = image.shape[:2]
+        yuv = cv2.cvtColor(image, cv2.COLOR_BGR2YUV, dst=self.scratch.get('yuv', (h, w, 3)))
+        y = cv2.extractChannel(yuv, 0, dst=self.scratch.get('y', (h, w)))
+        y = clahe.apply(y, dst=self.scratch.get('clahe', (h, w)))
+        cv2.insertChannel(y, yuv, 0)
+        result = cv2.cvtColor(yuv, cv2.COLOR_YUV2BGR, dst=self.scratch.get('bgr', (h, w, 3)))
+        return cv2.filter2D(result, -1, self.sharpen_kernel)
+
 
 @singleton
 class MakeNumbersBolderStrategy:
-    @staticmethod
-    def process(image_path):
-        image = cv2.imread(image_path, cv2.IMREAD_COLOR)
-        gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
-        _, thresh = cv2.threshold(gray, 20, 255, cv2.THRESH_BINARY_INV)
+    def __init__(self):
+        self.scratch = ScratchBuffers()
+
+    def process(self, image):
+        return self.apply(load_image(image))
+
+    def apply(self, image):
+        h, w = image.shape[:2]
+        gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY, dst=self.scratch.get('gray', (h, w)))
+        _, thresh = cv2.threshold(gray, 20, 255, cv2.THRESH_BINARY_INV, dst=self.scratch.get('thresh', (h, w)))
         contours, _ = cv2.findContours(thresh, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
-        cv2.drawContours(image, contours, -1, (0, 0, 0), 3)
-        return image
\ No newline at end of file
+        result = image.copy()
+        cv2.drawContours(result, contours, -1, (0, 0, 0), 3)
+        return result
+
+
+# Width and height of the canonical card, ID-1 cards are 85.6 x 54 mm
+CARD_SIZE = (856, 540)
+
+
+def order_corners(pts):
+    # Order four points as top-left, top-right, bottom-right, bottom-left
+    pts = np.asarray(pts, dtype=np.float32).reshape(4, 2)
+    s = pts.sum(axis=1)
+    d = np.diff(pts, axis=1).ravel()
+    return np.array([pts[np.argmin(s)], pts[np.argmin(d)], pts[np.argmax(s)], pts[np.argmax(d)]], dtype=np.float32)
+
+
+def downscale(image, max_side):
+    # Shrink the image so that its longest side is at most max_side, smaller images are returned unchanged
+    h, w = image.shape[:2]
+    scale = max_side / max(h, w)
+    if scale >= 1:
+        return image
+    return cv2.resize(image, (max(1, round(w * scale)), max(1, round(h * scale))), interpolation=cv2.INTER_AREA)
+
+
+@singleton
+class CardDetectionStrategy:
+    def __init__(self, card_size=CARD_SIZE, max_side=1280, detect_side=640, min_area=0.2, aspect_tolerance=0.25):
+        # card_size: (width, height) of the warped card (default is 856 x 540).
+        # max_side: Longest side of the fallback downscale when no card is found (default is 1280).
+        # detect_side: Longest side of the copy the card outline is searched on (default is 640).
+        # min_area: Minimum card area as a fraction of the image (default is 0.2).
+        # aspect_tolerance: Allowed relative deviation of the outline from the card aspect ratio (default is 0.25).
+        self.card_size = card_size
+        self.max_side = max_side
+        self.detect_side = detect_side
+        self.min_area = min_area
+        self.aspect_tolerance = aspect_tolerance
+
+    def process(self, image):
+        return self.apply(load_image(image))
+
+    def find_card(self, image):
+        # Returns the ordered card corners in the coordinates of image, None when no card outline is found
+        small = downscale(image, self.detect_side)
+        scale = image.shape[1] / small.shape[1]
+
+        gray = cv2.cvtColor(small, cv2.COLOR_BGR2GRAY)
+        gray = cv2.GaussianBlur(gray, (5, 5), 0)
+        median = float(np.median(gray))
+        edges = cv2.Canny(gray, int(max(0, 0.66 * median)), int(min(255, 1.33 * median)))
+        edges = cv2.dilate(edges, cv2.getStructuringElement(cv2.MORPH_RECT, (3, 3)))
+
+        contours, _ = cv2.findContours(edges, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+        image_area = small.shape[0] * small.shape[1]
+        card_ratio = max(self.card_size) / min(self.card_size)
+
+        for contour in sorted(contours, key=cv2.contourArea, reverse=True)[:5]:
+            hull = cv2.convexHull(contour)
+            if cv2.contourArea(hull) < self.min_area * image_area:
+                break
+
+            approx = cv2.approxPolyDP(hull, 0.02 * cv2.arcLength(hull, True), True)
+            # Rounded card corners sometimes leave more than four vertices, the minimum area rectangle covers those
+            corners = approx.reshape(-1, 2) if len(approx) == 4 else cv2.boxPoints(cv2.minAreaRect(hull))
+            corners = order_corners(corners)
+
+            width = (np.linalg.norm(corners[1] - corners[0]) + np.linalg.norm(corners[2] - corners[3])) / 2
+            height = (np.linalg.norm(corners[3] - corners[0]) + np.linalg.norm(corners[2] - corners[1])) / 2
+            ratio = max(width, height) / max(min(width, height), 1)
+            if abs(ratio - card_ratio) <= self.aspect_tolerance * card_ratio:
+                return corners * scale
+        return None
+
+    def apply(self, image):
+        # Warp the detected card to card_size (transposed for portrait cards), or downscale the whole image to max_side when no card is found.
+        # The card is warped from a copy of at most twice the card size, so a 12MP photo is decimated with INTER_AREA
+        # once instead of being sampled sparsely by the perspective warp.
+        source = downscale(image, 2 * max(self.card_size))
+        corners = self.find_card(source)
+        if corners is None:
+            return downscale(image, self.max_side)
+
+        width, height = self.card_size
+        if np.linalg.norm(corners[3] - corners[0]) > np.linalg.norm(corners[1] - corners[0]):
+            # Cards with a vertical layout keep their orientation, the text stays upright as photographed
+            width, height = height, width
+
+        target = np.array([[0, 0], [width - 1, 0], [width - 1, height - 1], [0, height - 1]], dtype=np.float32)
+        matrix = cv2.getPerspectiveTransform(corners, target)
+        return cv2.warpPerspective(source, matrix, (width, height), flags=cv2.INTER_LINEAR, borderMode=cv2.BORDER_REPLICATE)
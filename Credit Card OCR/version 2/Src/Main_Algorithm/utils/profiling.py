@@ -0,0 +1,124 @@
+import os
+import sys
+import time
+import threading
+import collections
+
+
+# Categories of the summary table. A sample belongs to the first category that has a frame of its stack matching one
+# of the markers ('file:function' substrings), the nn modules being checked before the easyocr glue around them.
+CARD_RULES = (('decode', ('pre_proc.py:load_image',)),
+              ('model forward', ('torch/nn/modules/',)),
+              ('easyocr glue', ('easyocr/',)),
+              ('preprocessing', ('pre_proc.py:',)),
+              ('extraction', (':group_and_sort_ocr_data', ':extract_card_info', 'extraction.py:')))
+
+
+class SamplingProfiler:
+    def __init__(self, interval=0.002, thread_id=None):
+        # Samples the Python stack of one thread (default is the creating thread) every interval seconds from a
+        # background thread. Stacks are counted as root-to-leaf (file, function, line) tuples, written by
+        # write_collapsed in the collapsed format read by flamegraph.pl, speedscope and similar tools.
+        self.interval = interval
+        self.thread_id = threading.get_ident() if thread_id is None else thread_id
+        self.stacks = collections.Counter()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def _sample(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append((code.co_filename.replace(os.sep, '/'), code.co_name, code.co_firstlineno))
+                frame = frame.f_back
+            if stack:
+                self.stacks[tuple(reversed(stack))] += 1
+
+    def __enter__(self):
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._sample, name='sampling-profiler', daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+        return False
+
+    def write_collapsed(self, path):
+        with open(path, 'w', encoding='utf-8') as file:
+            for stack, count in self.stacks.most_common():
+                labels = (f"{name} ({file_path}:{line})".replace(";", ",") for file_path, name, line in stack)
+                file.write(";".join(labels) + f" {count}\n")
+
+    def summarize(self, rules, seconds):
+        # (category, samples, share, seconds) rows for the rules (see CARD_RULES), 'other' last. The wall time of
+        # the sampled run is shared among the categories by their number of samples.
+        counts = collections.Counter()
+        for stack, count in self.stacks.items():
+            frames = [f"{path}:{name}" for path, name, _ in stack]
+            category = next((name for name, markers in rules
+                             if any(marker in frame for frame in frames for marker in markers)), 'other')
+            counts[category] += count
+
+        total = max(sum(counts.values()), 1)
+        return [(name, counts[name], counts[name] / total, seconds * counts[name] / total)
+                for name in [name for name, _ in rules] + ['other']]
+
+
+def profile_calls(call, inputs, iterations, output_prefix, rules=CARD_RULES, warmup=1, row_limit=15):
+    # Runs call(item) iterations times over the cycled inputs, after warmup untimed calls, under torch.profiler and
+    # the sampling profiler. Pass paths so that the decode (load_image) is measured too. Nothing of this module is
+    # imported or wrapped in normal runs.
+    # Writes {prefix}.trace.json (Chrome trace, chrome://tracing or Perfetto), {prefix}.collapsed.txt (flamegraph
+    # stacks) and {prefix}.summary.txt, and returns the summary.
+    if not inputs:
+        raise ValueError("No input to profile.")
+    try:
+        import torch
+        from torch.profiler import profile, record_function, ProfilerActivity
+    except ImportError:
+        torch = None
+
+    for i in range(warmup):
+        call(inputs[i % len(inputs)])
+
+    os.makedirs(os.path.dirname(os.path.abspath(output_prefix)), exist_ok=True)
+    sampler = SamplingProfiler()
+    if torch is not None:
+        activities = [ProfilerActivity.CPU] + ([ProfilerActivity.CUDA] if torch.cuda.is_available() else [])
+        with profile(activities=activities) as prof, sampler:
+            start_time = time.perf_counter()
+            for i in range(iterations):
+                with record_function(f"iteration {i}"):
+                    call(inputs[i % len(inputs)])
+            if torch.cuda.is_available():
+                torch.cuda.synchronize()
+            seconds = time.perf_counter() - start_time
+        prof.export_chrome_trace(output_prefix + '.trace.json')
+        sort_by = 'self_cuda_time_total' if torch.cuda.is_available() else 'self_cpu_time_total'
+        op_table = prof.key_averages().table(sort_by=sort_by, row_limit=row_limit)
+    else:
+        with sampler:
+            start_time = time.perf_counter()
+            for i in range(iterations):
+                call(inputs[i % len(inputs)])
+            seconds = time.perf_counter() - start_time
+        op_table = 'torch is not installed, no operator breakdown.'
+    sampler.write_collapsed(output_prefix + '.collapsed.txt')
+
+    lines = [f"{iterations} iterations in {seconds:.3f} s, {1000 * seconds / max(iterations, 1):.2f} ms per iteration",
+             f"{sum(sampler.stacks.values())} stack samples every {1000 * sampler.interval:.0f} ms", "",
+             f"{'category':24s} {'samples':>8s} {'share':>7s} {'ms/iter':>9s}"]
+    for name, count, share, category_seconds in sampler.summarize(rules, seconds):
+        lines.append(f"{name:24s} {count:8d} {100 * share:6.1f}% {1000 * category_seconds / max(iterations, 1):9.2f}")
+    lines += ['', 'Top operators:', op_table, '']
+    if torch is not None:
+        lines.append(f"Chrome trace: {output_prefix}.trace.json")
+    lines.append(f"Flamegraph stacks: {output_prefix}.collapsed.txt")
+    summary = '\n'.join(lines)
+    with open(output_prefix + '.summary.txt', 'w', encoding='utf-8') as file:
+        file.write(summary + "\n")
+    return summary
@@ -1,7 +1,14 @@
+import time
 from torch import argmax as torch_argmax
 from ultralytics import YOLO
 import numpy as np
 from ocrPlate.Src.Utils.postprocessing import working_with_results
+from ocrPlate.Src.Utils.plate_reading import PlateReading, ID_TO_NAME, ID_TO_PERSIAN_NAME
+from ocrPlate.Src.Utils.preprocessing import rectify_plate, apply_clahe
+from ocrPlate.Src.Utils.buckets import assign_buckets, BucketStats
+from ocrPlate.Src.Utils.inference_context import ThreadLocalContexts
+from ocrPlate.Src.Utils.tiling import tile_grid, merge_tile_boxes
+from ocrPlate.Src.Utils.escalation import has_wildcard, needs_escalation, prefer_second, EscalationStats
 
 
 
@@ -14,7 +21,18 @@ class OCRModel:
                  char_iou: float = 0.7,
                  plate_imgsz: tuple = (640, 640),
                  char_imgsz: tuple = (320, 320),
-                 device='cpu'):
+                 device='cpu',
+                 enhance: bool = False,
+                 clahe: bool = False,
+                 rectified_width: int = 256,
+                 char_buckets: tuple = None,
+                 tile_size: tuple = None,
+                 tile_overlap: float = 0.2,
+                 tile_batch: int = 16,
+                 tile_nms: float = 0.5,
+                 escalate_imgsz: tuple = None,
+                 escalate_conf: float = 0.7,
+                 escalate_enhance: bool = True):
 
         """
         Constructor method that initializes an instance of the PlateOCR class.
@@ -28,8 +46,35 @@ class OCRModel:
             plate_imgsz (tuple): Image size for plate detection (default is (640, 640)).
             char_imgsz (tuple): Image size for character detection (default is (320, 320)).
             device (int or str): device to run on, i.e. cuda device=0/1/2/3 or device='cpu'. int type for gpu and str type for cpu (default is 0).
+            enhance (bool): Rectify plate crops to the canonical plate aspect ratio before character detection (default is False).
+                            Rectified crops can be read at a much smaller char_imgsz.
+            clahe (bool): Apply CLAHE to the plate crops, only used together with enhance (default is False).
+            rectified_width (int): Width in pixels of the rectified plate (default is 256).
+            char_buckets (tuple): Optional square resolutions for the character stage, e.g. (160, 224, 320). Each crop
+                                  is read at the smallest bucket covering its native size instead of char_imgsz,
+                                  and crops of the same bucket share one batched call (default is None).
+            tile_size (tuple): Optional (width, height) of plate detection tiles, e.g. (640, 640). The image (or
+                               ROI) is covered by overlapping tiles read at native scale with imgsz=tile_size,
+                               instead of being letterboxed to plate_imgsz, so distant plates on 4K frames keep
+                               their pixels (default is None).
+            tile_overlap (float): Overlap of neighbouring tiles as a fraction of the tile size (default is 0.2).
+            tile_batch (int): Tiles per batched plate detection call (default is 16).
+            tile_nms (float): Boxes of neighbouring tiles whose intersection covers more than this fraction of the
+                              smaller box are merged (default is 0.5).
+            escalate_imgsz (tuple): Optional character stage size of a second pass, e.g. (480, 480). All crops are
+                                    first read at the cheap char_imgsz (or char_buckets), and only the readings
+                                    with '*' positions or a median confidence below escalate_conf are read again
+                                    at this size. The statistics are booked in self.escalation_stats (default is
+                                    None).
+            escalate_conf (float): Median confidence below which a reading escalates (default is 0.7).
+            escalate_enhance (bool): Rectify the escalated crops with enhance_plate, unless enhance already did
+                                     (default is True).
 
         Initializes various parameters and loads the YOLO model.
+
+        The instance keeps no per-call inference state; the shared counters (bucket_stats, escalation_stats) are
+        lock-protected. One instance can therefore be shared by a thread pool: every thread predicts through its own
+        InferenceContext (see context), on the same network weights.
         """
 
         try:
@@ -58,6 +103,19 @@ class OCRModel:
             self.plate_imgsz = plate_imgsz
             self.char_imgsz = char_imgsz
             self.device = device
+            self.enhance = enhance
+            self.clahe = clahe
+            self.rectified_width = rectified_width
+            self.char_buckets = tuple(sorted(char_buckets)) if char_buckets else None
+            self.bucket_stats = BucketStats(self.char_buckets) if char_buckets else None
+            self.tile_size = tuple(tile_size) if tile_size else None
+            self.tile_overlap = tile_overlap
+            self.tile_batch = tile_batch
+            self.tile_nms = tile_nms
+            self.escalate_imgsz = tuple(escalate_imgsz) if escalate_imgsz else None
+            self.escalate_conf = escalate_conf
+            self.escalate_enhance = escalate_enhance
+            self.escalation_stats = EscalationStats()
 
         except TypeError as e:
             # Handle the exception by printing an error message or taking appropriate action
@@ -68,21 +126,8 @@ class OCRModel:
                              34, 35]
         self.plate_classes = [36]
 
-        self.id_to_name = {
-            0: 0, 1: 1, 2: 2, 3: 3, 4: 4, 5: 5, 6: 6, 7: 7, 8: 8, 9: 9,
-            10: "b", 11: "j", 12: "dal", 13: "sin", 14: "sad", 15: "ta", 16: "gh", 17: "l",
-            18: "m", 19: "v", 20: "h", 21: "n", 22: "y", 23: "a", 24: "p", 25: "t", 26: "se",
-            27: "z", 28: "zh", 29: "sh", 30: "ein", 31: "f", 32: "k", 33: "g", 34: "D", 35: "S",
-            36: "plate_area"
-        }
-
-        self.id_to_persian_name = {
-            0: 0, 1: 1, 2: 2, 3: 3, 4: 4, 5: 5, 6: 6, 7: 7, 8: 8, 9: 9,
-            10: "ب", 11: "ج", 12: "د", 13: "س", 14: "ص", 15: "ط", 16: "ق", 17: "ل",
-            18: "م", 19: "و", 20: "ه", 21: "ن", 22: "ی", 23: "الف", 24: "پ", 25: "ت", 26: "ث",
-            27: "ز", 28: "ژ (معلولین و جانبازان)", 29: "ش", 30: "ع", 31: "ف", 32: "ک", 33: "گ", 34: "D", 35: "S",
-            36: "plate_area"
-        }
+        self.id_to_name = ID_TO_NAME
+        self.id_to_persian_name = ID_TO_PERSIAN_NAME
 
         self.eng_to_presian = {0: 0, 1: 1, 2: 2, 3: 3, 4: 4, 5: 5, 6: 6, 7: 7, 8: 8, 9: 9,
                                'b': 'ب', 'j': 'ج', 'dal': 'د', 'sin': 'س', 'sad': 'ص', 'ta': 'ط',
@@ -92,6 +137,23 @@ class OCRModel:
                                '*': '*', '-': '-'}
 
         self.ocr_model = self.load_model()
+        self.contexts = ThreadLocalContexts(self.ocr_model)
+
+    def context(self):
+        """
+        Returns:
+            InferenceContext: The inference context of the calling thread, created on its first call.
+        """
+
+        return self.contexts.get()
+
+    def predict(self, **kwargs):
+        """
+        Runs the shared YOLO model through the inference context of the calling thread, same arguments as
+        YOLO.predict.
+        """
+
+        return self.context().predict(**kwargs)
 
     def load_model(self):
         """
@@ -113,72 +175,295 @@ class OCRModel:
             # Handle the exception here (e.g., print an error message or take appropriate action)
             print(f"Error loading the model: {str(e)}")
 
-    def detect_plate(self, img):
+    def detect_plate(self, img, roi=None):
         """
         Method to detect the license plate in an input image.
 
         Args:
             img (numpy.ndarray): Input image for license plate detection.
+            roi (tuple): Optional (x1, y1, x2, y2) search area, e.g. the motion region reported by MotionGate.
+                         Only this part of the image is passed to the plate detector.
 
-        Updates the self.plate attribute with the detected license plate image (numpy.ndarray).
+        Returns:
+            numpy.ndarray or None: The most confident license plate crop, None when no plate is detected.
         """
 
         try:
-            results = self.ocr_model.predict(source=img,
-                                             conf=self.plate_conf,
-                                             iou=self.plate_iou,
-                                             imgsz=self.plate_imgsz,
-                                             device=self.device,
-                                             classes=self.plate_classes,
-                                             verbose=False)
-
-            for r in results:
-                confs = r.boxes.conf
-                if len(confs) == 1:
-                    coordination = r.boxes.xyxy
-                    for i, c in enumerate(coordination):
-                        x1 = int(c[0])
-                        y1 = int(c[1])
-                        x2 = int(c[2])
-                        y2 = int(c[3])
-
-                    self.plate = img[y1:y2, x1:x2]
-
-                elif len(confs) > 1:
-                    argmax_conf = torch_argmax(confs)
-                    coordination = r.boxes.xyxy[argmax_conf].unsqueeze(0)
-                    for i, c in enumerate(coordination):
-                        x1 = int(c[0])
-                        y1 = int(c[1])
-                        x2 = int(c[2])
-                        y2 = int(c[3])
-
-                    self.plate = img[y1:y2, x1:x2]
-
-                elif len(confs) == 0:
-                    self.plate = np.array([None])
-
+            box = self.locate_plates([img], [self.roi_bounds(img, roi)])[0]
+            if box is None:
+                return None
+            x1, y1, x2, y2 = box
+            return img[y1:y2, x1:x2]
 
         except Exception as e:
             # Handle the exception here (e.g., print an error message or take appropriate action)
             print(f"Error detecting plate: {str(e)}")
+            return None
+
+    @staticmethod
+    def crop_roi(img, roi):
+        """
+        Method to restrict an image to a search area.
+
+        Args:
+            img (numpy.ndarray): Input image.
+            roi (tuple or None): (x1, y1, x2, y2) search area in pixel coordinates.
+
+        Returns:
+            numpy.ndarray: A view of the search area, or img itself when roi is None or empty.
+        """
+
+        bounds = OCRModel.roi_bounds(img, roi)
+        if bounds is None:
+            return img
+
+        x1, y1, x2, y2 = bounds
+        return img[y1:y2, x1:x2]
+
+    @staticmethod
+    def roi_bounds(img, roi):
+        """
+        Returns:
+            tuple or None: roi clipped to the image as integers, None when roi is None or empty.
+        """
+
+        if roi is None:
+            return None
+
+        h, w = img.shape[:2]
+        x1, y1, x2, y2 = max(0, int(roi[0])), max(0, int(roi[1])), min(w, int(roi[2])), min(h, int(roi[3]))
+        if x2 <= x1 or y2 <= y1:
+            return None
+        return x1, y1, x2, y2
+
+    @staticmethod
+    def crop_plate(result, img):
+        """
+        Method to crop the most confident plate box of a single YOLO result out of the image.
 
-    def enhance_plate(self):
+        Args:
+            result (ultralytics.engine.results.Results): Plate detection result for img.
+            img (numpy.ndarray): The image the result was predicted on.
+
+        Returns:
+            numpy.ndarray or None: The plate crop, or None when no plate is detected.
+        """
+
+        box = OCRModel.plate_box(result)
+        if box is None:
+            return None
+
+        x1, y1, x2, y2 = box
+        return img[y1:y2, x1:x2]
+
+    @staticmethod
+    def plate_box(result):
         """
-        Placeholder method for enhancing the detected license plate image.
-        This method is currently not implemented and marked as pass.
+        Returns:
+            tuple or None: (x1, y1, x2, y2) of the most confident plate box of a YOLO result, None if there is none.
         """
 
-        # self.improved_plate = ...
-        pass
+        confs = result.boxes.conf
+        if len(confs) == 0:
+            return None
 
+        x1, y1, x2, y2 = map(int, result.boxes.xyxy[torch_argmax(confs)])
+        return x1, y1, x2, y2
+
+    def locate_plates(self, imgs, bounds):
+        """
+        Method to find the most confident plate box of every image in one batched plate stage.
+
+        Args:
+            imgs (list): Input images (numpy.ndarray).
+            bounds (list): Clipped search area per image from roi_bounds, None entries search the whole image.
+
+        Returns:
+            list: (x1, y1, x2, y2) in image coordinates per image, None where no (non-empty) plate is detected.
+        """
 
-    def detect_character(self, img):
+        if self.tile_size is not None:
+            located = []
+            for boxes, _ in self.detect_plates_tiled(imgs, bounds):
+                located.append(tuple(int(v) for v in boxes[0]) if len(boxes) else None)
+            return located
+
+        searched = [img if b is None else img[b[1]:b[3], b[0]:b[2]] for img, b in zip(imgs, bounds)]
+        plate_results = self.predict(source=searched,
+                                     conf=self.plate_conf,
+                                     iou=self.plate_iou,
+                                     imgsz=self.plate_imgsz,
+                                     device=self.device,
+                                     classes=self.plate_classes,
+                                     verbose=False)
+
+        located = []
+        for r, b in zip(plate_results, bounds):
+            box = self.plate_box(r)
+            if box is None or box[2] <= box[0] or box[3] <= box[1]:
+                located.append(None)
+                continue
+            ox, oy = (0, 0) if b is None else b[:2]
+            located.append((box[0] + ox, box[1] + oy, box[2] + ox, box[3] + oy))
+        return located
+
+    def detect_plates_tiled(self, imgs, bounds=None):
+        """
+        Method to detect all plates of the images on overlapping native-scale tiles.
+
+        Args:
+            imgs (list): Input images (numpy.ndarray).
+            bounds (list): Optional clipped search area per image from roi_bounds, only that area is tiled.
+
+        The tiles of all images are read tile_batch at a time at imgsz=tile_size, and the boxes of every image are
+        merged across its tiles (see tiling.nms).
+
+        Returns:
+            list: (boxes, scores) per image, (K, 4) int32 boxes in image coordinates by decreasing score.
+        """
+
+        bounds = [None] * len(imgs) if bounds is None else bounds
+        tile_size = self.tile_size or tuple(self.plate_imgsz)
+        grids = [tile_grid(img.shape[1], img.shape[0], tile_size, self.tile_overlap, b) for img, b in zip(imgs, bounds)]
+        tiles = [(i, t) for i, grid in enumerate(grids) for t in grid]
+
+        tile_boxes, tile_scores = [[] for _ in imgs], [[] for _ in imgs]
+        for start in range(0, len(tiles), self.tile_batch):
+            chunk = tiles[start:start + self.tile_batch]
+            results = self.predict(source=[imgs[i][y1:y2, x1:x2] for i, (x1, y1, x2, y2) in chunk],
+                                   conf=self.plate_conf,
+                                   iou=self.plate_iou,
+                                   imgsz=(tile_size[1], tile_size[0]),
+                                   device=self.device,
+                                   classes=self.plate_classes,
+                                   verbose=False)
+            for (i, _), r in zip(chunk, results):
+                tile_boxes[i].append(r.boxes.xyxy.detach().cpu().numpy())
+                tile_scores[i].append(r.boxes.conf.detach().cpu().numpy())
+
+        return [merge_tile_boxes(grid, boxes, scores, self.tile_nms)
+                for grid, boxes, scores in zip(grids, tile_boxes, tile_scores)]
+
+    def enhance_plate(self, plate):
+        """
+        Method to enhance the detected license plate image.
+
+        Args:
+            plate (numpy.ndarray): License plate crop from detect_plate.
+
+        The plate outline is located from its edges and warped to a fronto-parallel plate of the canonical aspect
+        ratio, optionally followed by CLAHE. Skewed and off-axis crops then need far fewer pixels to be read.
+
+        Returns:
+            numpy.ndarray: The enhanced plate image.
+        """
+
+        try:
+            improved_plate = rectify_plate(plate, width=self.rectified_width)
+            if self.clahe:
+                improved_plate = apply_clahe(improved_plate)
+            return improved_plate
+        except Exception as e:
+            # Fall back to the raw crop, enhancement must never lose a reading
+            print(f"Error enhancing plate: {str(e)}")
+            return plate
+
+    def predict_characters(self, plates):
+        """
+        Method to run the character detector over plate crops.
+
+        Args:
+            plates (list): Plate crops (numpy.ndarray).
+
+        Without char_buckets all crops are letterboxed to char_imgsz in one call. With char_buckets each crop is
+        assigned to the smallest bucket covering its longest side, every bucket is run as one batched call and
+        the bucket distribution and latency are booked in self.bucket_stats.
+
+        Returns:
+            list: YOLO results, one per crop in input order.
+        """
+
+        if self.char_buckets is None:
+            return self.predict(source=plates,
+                                conf=self.char_conf,
+                                iou=self.char_iou,
+                                imgsz=self.char_imgsz,
+                                device=self.device,
+                                classes=self.char_classes,
+                                verbose=False)
+
+        results = [None] * len(plates)
+        assigned = assign_buckets([max(plate.shape[:2]) for plate in plates], self.char_buckets)
+        for bucket_index in np.unique(assigned):
+            members = np.flatnonzero(assigned == bucket_index)
+            size = self.char_buckets[bucket_index]
+            with self.bucket_stats.timer(bucket_index, len(members)):
+                bucket_results = self.predict(source=[plates[i] for i in members],
+                                              conf=self.char_conf,
+                                              iou=self.char_iou,
+                                              imgsz=(size, size),
+                                              device=self.device,
+                                              classes=self.char_classes,
+                                              verbose=False)
+            for i, r in zip(members, bucket_results):
+                results[i] = r
+
+        return results
+
+    def read_characters(self, plates, parse):
+        """
+        Method to read plate crops, escalating uncertain readings to a second pass when escalate_imgsz is set.
+
+        Args:
+            plates (list): Plate crops (numpy.ndarray).
+            parse (callable): parse(i, result) turns the YOLO result of crop i into (output, median_conf, wildcard).
+
+        The first pass reads every crop through predict_characters. Readings with '*' positions or a median
+        confidence below escalate_conf are read again at escalate_imgsz, from the enhanced crop when
+        escalate_enhance is set, in one batched call. The escalated reading replaces the first one when it is
+        better (see escalation.prefer_second).
+
+        Returns:
+            list: The parsed output of every crop, in input order.
+        """
+
+        if self.escalate_imgsz is None:
+            return [parse(i, r)[0] for i, r in enumerate(self.predict_characters(plates))]
+
+        start_time = time.perf_counter()
+        parsed = [parse(i, r) for i, r in enumerate(self.predict_characters(plates))]
+        first_seconds = time.perf_counter() - start_time
+
+        escalated = [i for i, (_, median_conf, wildcard) in enumerate(parsed)
+                     if needs_escalation(median_conf, wildcard, self.escalate_conf)]
+        replaced = 0
+        start_time = time.perf_counter()
+        if escalated:
+            enhance = self.escalate_enhance and not self.enhance
+            results = self.predict(source=[self.enhance_plate(plates[i]) if enhance else plates[i] for i in escalated],
+                                   conf=self.char_conf,
+                                   iou=self.char_iou,
+                                   imgsz=self.escalate_imgsz,
+                                   device=self.device,
+                                   classes=self.char_classes,
+                                   verbose=False)
+            for i, r in zip(escalated, results):
+                second = parse(i, r)
+                if prefer_second(parsed[i][1:], second[1:]):
+                    parsed[i] = second
+                    replaced += 1
+        second_seconds = time.perf_counter() - start_time
+
+        self.escalation_stats.book(len(plates), len(escalated), replaced, first_seconds, second_seconds)
+        return [output for output, _, _ in parsed]
+
+    def detect_character(self, img, roi=None):
         """
         Method to detect individual characters on the license plate.
 
         Args:
             img (numpy.ndarray): Input image containing the license plate.
+            roi (tuple): Optional (x1, y1, x2, y2) search area for plate detection.
 
         Uses the YOLO model to detect characters and arranges them in the correct order.
         Handles cases where characters may be missing and inserts missing characters using handle_missed_character.
@@ -188,24 +473,19 @@ class OCRModel:
         """
         try:
             detected_car = False
-            self.detect_plate(img)
-            # self.plate = np.array([1])
+            plate = self.detect_plate(img, roi)
 
-            if (self.plate != None).all():
+            if plate is not None:
 
                 detected_car = True
 
-                # self.enhance_plate()
+                plate = self.enhance_plate(plate) if self.enhance else plate
 
-                results = self.ocr_model.predict(source=self.plate,
-                                                 conf=self.char_conf,
-                                                 iou=self.char_iou,
-                                                 imgsz=self.char_imgsz,
-                                                 device=self.device,
-                                                 classes=self.char_classes,
-                                                 verbose=False)
+                def parse(i, r):
+                    detection_list, median_conf = working_with_results([r], self.id_to_persian_name)
+                    return (detection_list, median_conf), median_conf, has_wildcard(detection_list)
 
-                detection_list, median_conf = working_with_results(results, self.id_to_persian_name)
+                detection_list, median_conf = self.read_characters([plate], parse)[0]
                 return detection_list, median_conf, detected_car
 
             else:
@@ -216,4 +496,112 @@ class OCRModel:
 
         except Exception as e:
             # Handle the exception here (e.g., print an error message or take appropriate action)
-            print(f"Error in detect_character: {str(e)}")
\ No newline at end of file
+            print(f"Error in detect_character: {str(e)}")
+
+    def detect_character_batch(self, imgs, rois=None):
+        """
+        Batched counterpart of detect_character.
+
+        Args:
+            imgs (list): Input images (numpy.ndarray) containing cars.
+            rois (list): Optional search area per image, None entries search the whole image.
+
+        Runs the plate stage once over all images and the character stage once over all detected plates,
+        so that frames coming from several sources share the same forward passes.
+
+        Returns:
+            list: a (detection_list, median_conf, detected_car) tuple per input image, in input order.
+        """
+        try:
+            imgs = list(imgs)
+            outputs = [([None, None, None, "-", None], None, False) for _ in imgs]
+            if len(imgs) == 0:
+                return outputs
+
+            bounds = [None] * len(imgs) if rois is None else [self.roi_bounds(img, roi) for img, roi in zip(imgs, rois)]
+            indices, plates = [], []
+            for i, (box, img) in enumerate(zip(self.locate_plates(imgs, bounds), imgs)):
+                if box is not None:
+                    x1, y1, x2, y2 = box
+                    indices.append(i)
+                    plates.append(self.enhance_plate(img[y1:y2, x1:x2]) if self.enhance else img[y1:y2, x1:x2])
+
+            if len(plates) == 0:
+                return outputs
+
+            def parse(k, r):
+                try:
+                    detection_list, median_conf = working_with_results([r], self.id_to_persian_name)
+                    return (detection_list, median_conf, True), median_conf, has_wildcard(detection_list)
+                except Exception as e:
+                    # A single unreadable plate must not discard the rest of the batch
+                    print(f"Error reading plate {indices[k]} of the batch: {str(e)}")
+                    return (outputs[indices[k]][0], None, True), None, True
+
+            for i, output in zip(indices, self.read_characters(plates, parse)):
+                outputs[i] = output
+
+            return outputs
+
+        except Exception as e:
+            # Handle the exception here (e.g., print an error message or take appropriate action)
+            print(f"Error in detect_character_batch: {str(e)}")
+
+    def read_plates(self, imgs, rois=None):
+        """
+        Method to read plates into compact PlateReading objects.
+
+        Args:
+            imgs (list): Input images (numpy.ndarray) containing cars.
+            rois (list): Optional search area per image, None entries search the whole image.
+
+        Same two batched stages as detect_character_batch, but the result keeps class ids, confidences and the
+        plate box as small arrays instead of building label strings. Decode with PlateReading.text or
+        PlateReading.to_detection_list when strings are needed.
+
+        Returns:
+            list: a PlateReading per input image, in input order.
+        """
+        imgs = list(imgs)
+        readings = [PlateReading.not_detected() for _ in imgs]
+        if len(imgs) == 0:
+            return readings
+
+        try:
+            bounds = [None] * len(imgs) if rois is None else [self.roi_bounds(img, roi) for img, roi in zip(imgs, rois)]
+
+            indices, plates, boxes = [], [], []
+            for i, (box, img) in enumerate(zip(self.locate_plates(imgs, bounds), imgs)):
+                if box is None:
+                    continue
+                x1, y1, x2, y2 = box
+                plate = img[y1:y2, x1:x2]
+                indices.append(i)
+                plates.append(self.enhance_plate(plate) if self.enhance else plate)
+                boxes.append(box)
+
+            if len(plates) == 0:
+                return readings
+
+            def parse(k, r):
+                reading = PlateReading.from_result(r, boxes[k])
+                return reading, reading.median_conf, reading.has_wildcard or not reading.legible
+
+            for i, reading in zip(indices, self.read_characters(plates, parse)):
+                readings[i] = reading
+
+        except Exception as e:
+            # Handle the exception here (e.g., print an error message or take appropriate action)
+            print(f"Error in read_plates: {str(e)}")
+
+        return readings
+
+    def read_plate(self, img, roi=None):
+        """
+        Single image counterpart of read_plates.
+
+        Returns:
+            PlateReading: The reading of the most confident plate in img.
+        """
+
+        return self.read_plates([img], None if roi is None else [roi])[0]
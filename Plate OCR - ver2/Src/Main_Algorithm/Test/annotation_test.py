@@ -0,0 +1,117 @@
+import sys
+sys.path.insert(0, "../")
+
+import os
+os.chdir('../../../')
+
+import argparse
+import glob
+import time
+import cv2
+import numpy as np
+from ocrPlate.Src.Main_Algorithm.Codes.main import OCRModel
+from ocrPlate.Src.Utils.image_pack import ImagePack
+from ocrPlate.Src.Utils.annotation import GlyphCache, AnnotationWriter
+
+
+def load_frames(args):
+    # Decoded up front, so that the timings below only cover inference and annotation
+    if args.video is not None:
+        cap = cv2.VideoCapture(args.video)
+        frames = []
+        while len(frames) < args.max_frames:
+            ok, frame = cap.read()
+            if not ok:
+                break
+            frames.append(frame)
+        cap.release()
+        return frames
+    if args.pack is not None:
+        return [img for _, img in ImagePack(args.pack)][:args.max_frames]
+    paths = sorted(glob.glob(os.path.join(args.input_dir, "*.jpg")))[:args.max_frames]
+    return [img for img in (cv2.imread(p) for p in paths) if img is not None]
+
+
+def pil_annotate(frame, readings, font, output_path, jpeg_quality):
+    # Baseline: the whole frame goes through PIL to draw the Persian text, on the inference thread
+    from PIL import Image, ImageDraw
+
+    image = Image.fromarray(cv2.cvtColor(frame, cv2.COLOR_BGR2RGB))
+    draw = ImageDraw.Draw(image)
+    for reading in readings:
+        if reading.detected:
+            x1, y1, x2, y2 = (int(v) for v in reading.box)
+            draw.rectangle((x1, y1, x2, y2), outline=(0, 220, 0), width=2)
+            draw.text((x1, max(y1 - font.size - 4, 0)), " ".join(reading.labels(persian=True)), fill=(0, 220, 0),
+                      font=font)
+    cv2.imwrite(output_path, cv2.cvtColor(np.asarray(image), cv2.COLOR_RGB2BGR), [cv2.IMWRITE_JPEG_QUALITY, jpeg_quality])
+
+
+def run(ocr_model, frames, batch_size, annotate=None):
+    """
+    Reads the frames in batches, handing every batch and its readings to annotate, and returns the frames/s.
+    """
+
+    start_time = time.perf_counter()
+    for i in range(0, len(frames), batch_size):
+        batch = frames[i:i + batch_size]
+        readings = ocr_model.read_plates(batch)
+        if annotate is not None:
+            for k, (frame, reading) in enumerate(zip(batch, readings)):
+                annotate(i + k, frame, reading)
+    return len(frames) / (time.perf_counter() - start_time)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Annotated output written inline with PIL versus on the AnnotationWriter thread")
+    parser.add_argument("--device", type=int, help="{0: gpu, 1: cpu}")
+    parser.add_argument("--font", type=str, required=True, help="TrueType font with Persian glyphs")
+    parser.add_argument("--video", type=str, default=None, help="Video file to annotate")
+    parser.add_argument("--pack", type=str, default=None, help="Image pack to annotate")
+    parser.add_argument("--input_dir", type=str, default="Datasets/IR_LPR/test_samples", help="Directory of car images")
+    parser.add_argument("--output_dir", type=str, default="annotated", help="Directory receiving the annotated output")
+    parser.add_argument("--format", type=str, choices=["jpg", "video"], default="jpg", help="Annotated frames or one video")
+    parser.add_argument("--max_frames", type=int, default=500, help="Maximum number of frames")
+    parser.add_argument("--batch_size", type=int, default=8, help="Frames per read_plates call")
+    parser.add_argument("--block", action="store_true", help="Wait for the writer instead of dropping frames when its queue is full")
+
+    args = parser.parse_args()
+
+    # device=0 for cuda and device='cpu' for cpu
+    d = 0 if args.device == 0 else 'cpu'
+    ocr_model = OCRModel(model_path="Models/OCR_0/best.pt",
+                         plate_conf=0.6,
+                         char_conf=0.5,
+                         plate_iou=0.7,
+                         char_iou=0.7,
+                         plate_imgsz=(640, 640),
+                         char_imgsz=(320, 320),
+                         device=d)
+
+    frames = load_frames(args)
+    if not frames:
+        print("No frame to annotate.")
+        return
+
+    ocr_model.read_plates(frames[:1])  # Warmup
+    print(f"No annotation     : {run(ocr_model, frames, args.batch_size):7.2f} frames/s")
+
+    from PIL import ImageFont
+    font = ImageFont.truetype(args.font, 28)
+    pil_dir = os.path.join(args.output_dir, "pil")
+    os.makedirs(pil_dir, exist_ok=True)
+    fps = run(ocr_model, frames, args.batch_size,
+              lambda i, frame, reading: pil_annotate(frame, [reading], font, os.path.join(pil_dir, f"{i:08d}.jpg"), 90))
+    print(f"Inline PIL        : {fps:7.2f} frames/s")
+
+    glyphs = GlyphCache(args.font)
+    with AnnotationWriter(args.output_dir, glyphs, output_format=args.format, block=args.block) as writer:
+        fps = run(ocr_model, frames, args.batch_size, lambda i, frame, reading: writer.submit(frame, [reading]))
+    report = writer.report()
+    print(f"AnnotationWriter  : {fps:7.2f} frames/s, {report['written']} written, {report['dropped']} dropped, "
+          f"{report['render_ms_per_frame']:.2f} ms drawing + {report['encode_ms_per_frame']:.2f} ms encoding per frame "
+          f"on the writer thread")
+
+
+if __name__ == "__main__":
+    main()
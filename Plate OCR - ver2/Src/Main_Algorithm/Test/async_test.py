@@ -0,0 +1,142 @@
+import sys
+sys.path.insert(0, "../")
+
+import os
+os.chdir('../../../')
+
+import argparse
+import asyncio
+import glob
+import time
+from ocrPlate.Src.Main_Algorithm.Codes.main import OCRModel
+from ocrPlate.Src.Utils.async_ocr import AsyncOCRModel, decode_image
+
+
+def same_detection(a, b):
+    # Confidences with a tolerance, batches of another size may pick another reduction order
+    (list_a, conf_a, car_a), (list_b, conf_b, car_b) = a, b
+    if list_a != list_b or car_a != car_b:
+        return False
+    if conf_a is None or conf_b is None:
+        return conf_a is conf_b
+    return abs(conf_a - conf_b) <= 1e-4
+
+
+async def run(ocr_model, img_paths, reference, args):
+    async with AsyncOCRModel(ocr_model, max_batch=args.max_batch, max_wait=args.max_wait,
+                             inference_workers=args.workers) as async_model:
+        # Every image read repeats times by concurrent callers, from the file path so that decoding is overlapped
+        # with inference as well
+        calls = [i for i in range(len(img_paths))] * args.repeats
+        ticks = 0
+
+        async def ticker():
+            # Counts how often the event loop gets to run while the model is busy
+            nonlocal ticks
+            while True:
+                await asyncio.sleep(0.001)
+                ticks += 1
+
+        ticker_task = asyncio.ensure_future(ticker())
+        start_time = time.perf_counter()
+        outputs = await asyncio.gather(*[async_model.detect_character(img_paths[i]) for i in calls])
+        elapsed = time.perf_counter() - start_time
+        ticker_task.cancel()
+
+        mismatches = sum(not same_detection(output, reference[i]) for i, output in zip(calls, outputs))
+        print(f"Async    : {len(calls) / elapsed:7.2f} images/s, {async_model.batches} batches of "
+              f"{async_model.requests / max(async_model.batches, 1):.1f} requests on average, "
+              f"event loop ran {ticks} times in {elapsed:.2f} s")
+        print(f"{len(calls)} concurrent requests, {mismatches} differ from the serial run")
+
+        # A timeout shorter than the inference raises asyncio.TimeoutError, cancelled requests never reach the model
+        try:
+            await async_model.detect_character(img_paths[0], timeout=1e-4)
+            print("Timeout  : not raised")
+            mismatches += 1
+        except asyncio.TimeoutError:
+            print("Timeout  : raised")
+
+        tasks = [asyncio.ensure_future(async_model.detect_character(img_paths[i])) for i in calls]
+        await asyncio.sleep(0)
+        for task in tasks[len(tasks) // 2:]:
+            task.cancel()
+        done = await asyncio.gather(*tasks, return_exceptions=True)
+        cancelled = sum(isinstance(d, asyncio.CancelledError) for d in done)
+        print(f"Cancel   : {cancelled} of {len(tasks)} requests cancelled, {async_model.expired} dropped before inference")
+    return mismatches
+
+
+async def check_close(ocr_model, img):
+    """
+    A request the batcher already took while waiting for more is cancelled by close instead of hanging, and
+    requests after close raise RuntimeError.
+
+    Returns:
+        int: Number of failed checks.
+    """
+
+    async_model = AsyncOCRModel(ocr_model, max_batch=4, max_wait=10.0)
+    pending = asyncio.ensure_future(async_model.detect_character(img))
+    await asyncio.sleep(0.05)
+    await async_model.close()
+    failures = 0
+    try:
+        await asyncio.wait_for(pending, 5.0)
+        print("Close    : collected request computed")
+        failures += 1
+    except asyncio.CancelledError:
+        print("Close    : collected request cancelled")
+    except asyncio.TimeoutError:
+        print("Close    : collected request hangs")
+        failures += 1
+    try:
+        await async_model.detect_character(img)
+        print("Closed   : request accepted")
+        failures += 1
+    except RuntimeError:
+        print("Closed   : RuntimeError raised")
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Asyncio callers sharing one OCRModel through AsyncOCRModel")
+    parser.add_argument("--device", type=int, help="{0: gpu, 1: cpu}")
+    parser.add_argument("--input_dir", type=str, default="Datasets/IR_LPR/test_samples", help="Directory of car images")
+    parser.add_argument("--repeats", type=int, default=5, help="Times every image is requested")
+    parser.add_argument("--max_batch", type=int, default=8, help="Maximum requests per inference call")
+    parser.add_argument("--max_wait", type=float, default=0.005, help="Seconds a batch waits for more requests")
+    parser.add_argument("--workers", type=int, default=1, help="Batches running at the same time")
+
+    args = parser.parse_args()
+
+    # device=0 for cuda and device='cpu' for cpu
+    d = 0 if args.device == 0 else 'cpu'
+    ocr_model = OCRModel(model_path="Models/OCR_0/best.pt",
+                         plate_conf=0.6,
+                         char_conf=0.5,
+                         plate_iou=0.7,
+                         char_iou=0.7,
+                         plate_imgsz=(640, 640),
+                         char_imgsz=(320, 320),
+                         device=d)
+
+    img_paths = sorted(glob.glob(os.path.join(args.input_dir, "*.jpg")))
+    if not img_paths:
+        print("No image in the input directory.")
+        return
+
+    # Serial reference through the batched entry point the async model uses, after a warmup
+    imgs = [decode_image(p) for p in img_paths]
+    ocr_model.detect_character_batch(imgs[:1])
+    start_time = time.perf_counter()
+    reference = [ocr_model.detect_character_batch([img])[0] for img in imgs]
+    print(f"Serial   : {len(imgs) / (time.perf_counter() - start_time):7.2f} images/s")
+
+    mismatches = asyncio.run(run(ocr_model, img_paths, reference, args))
+    mismatches += asyncio.run(check_close(ocr_model, imgs[0]))
+    sys.exit(1 if mismatches else 0)
+
+
+if __name__ == "__main__":
+    main()
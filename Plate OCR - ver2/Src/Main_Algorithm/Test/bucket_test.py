@@ -0,0 +1,79 @@
+import sys
+sys.path.insert(0, "../")
+
+import os
+os.chdir('../../../')
+
+import argparse
+import glob
+import time
+import cv2
+import numpy as np
+from ocrPlate.Src.Main_Algorithm.Codes.main import OCRModel
+from ocrPlate.Src.Utils.buckets import BucketStats
+
+
+def run(ocr_model, imgs, batch_size, runs_num):
+    """
+    Reads all images in batches and returns the readings of the last run and the mean time per image.
+
+    The total time is divided by the total number of images, so a small last batch weighs as much as its images
+    and not as much as a full batch.
+    """
+
+    seconds, count = 0.0, 0
+    for _ in range(runs_num):
+        readings = []
+        for i in range(0, len(imgs), batch_size):
+            start_time = time.perf_counter()
+            readings.extend(ocr_model.read_plates(imgs[i:i + batch_size]))
+            seconds += time.perf_counter() - start_time
+            count += len(imgs[i:i + batch_size])
+    return readings, seconds / max(count, 1)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Size-bucketed character stage evaluation")
+    parser.add_argument("--device", type=int, help="{0: gpu, 1: cpu}")
+    parser.add_argument("--input_dir", type=str, default="Datasets/IR_LPR/test_samples", help="Directory of car images")
+    parser.add_argument("--buckets", type=int, nargs="+", default=[160, 224, 320], help="Character stage resolutions")
+    parser.add_argument("--batch_size", type=int, default=16, help="Images per read_plates call")
+    parser.add_argument("--runs_num", type=int, default=5, help="Repeat the detection to obtain a valid runtime")
+
+    args = parser.parse_args()
+
+    # device=0 for cuda and device='cpu' for cpu
+    d = 0 if args.device == 0 else 'cpu'
+    ocr_model = OCRModel(model_path="Models/OCR_0/best.pt",
+                         plate_conf=0.6,
+                         char_conf=0.5,
+                         plate_iou=0.7,
+                         char_iou=0.7,
+                         plate_imgsz=(640, 640),
+                         char_imgsz=(320, 320),
+                         device=d,
+                         char_buckets=tuple(args.buckets))
+
+    imgs = [img for img in (cv2.imread(p) for p in sorted(glob.glob(os.path.join(args.input_dir, "*.*")))) if img is not None]
+
+    buckets = ocr_model.char_buckets
+    ocr_model.char_buckets = None
+    run(ocr_model, imgs[:1], 1, 1)  # Warmup
+    fixed_readings, fixed_time = run(ocr_model, imgs, args.batch_size, args.runs_num)
+
+    ocr_model.char_buckets = buckets
+    run(ocr_model, imgs[:1], 1, 1)  # Warmup
+    ocr_model.bucket_stats = BucketStats(buckets)
+    bucket_readings, bucket_time = run(ocr_model, imgs, args.batch_size, args.runs_num)
+
+    agreement = np.mean([a.text() == b.text() for a, b in zip(fixed_readings, bucket_readings)]) if imgs else 0.0
+    print(f"Fixed char_imgsz {ocr_model.char_imgsz}: {fixed_time * 1000:.2f} ms/image")
+    print(f"Bucketed {buckets}: {bucket_time * 1000:.2f} ms/image, agreement with fixed size {100 * agreement:.1f}%")
+    print("---------------------------------------------------------------------------------------------------------")
+    for size, stats in ocr_model.bucket_stats.report().items():
+        print(f"bucket {size:4d}: {stats['plates']:6d} plates ({100 * stats['share']:5.1f}%), "
+              f"{stats['calls']:5d} calls, {stats['ms_per_call']:7.2f} ms/call, {stats['ms_per_plate']:7.2f} ms/plate")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+import sys
+sys.path.insert(0, "../")
+
+import os
+os.chdir('../../../')
+
+import argparse
+import glob
+import time
+import random
+import threading
+import cv2
+import numpy as np
+from concurrent.futures import ThreadPoolExecutor
+from ocrPlate.Src.Main_Algorithm.Codes.main import OCRModel
+
+
+def same_detection(a, b):
+    """
+    Compares two detect_character outputs, confidences with a tolerance for kernels that pick another reduction
+    order under load.
+    """
+
+    if a is None or b is None:
+        return a is b
+    (list_a, conf_a, car_a), (list_b, conf_b, car_b) = a, b
+    if list_a != list_b or car_a != car_b:
+        return False
+    if conf_a is None or conf_b is None:
+        return conf_a is conf_b
+    return abs(conf_a - conf_b) <= 1e-4
+
+
+def same_reading(a, b):
+    return (a.flags == b.flags and np.array_equal(a.ids, b.ids) and np.array_equal(a.box, b.box)
+            and np.allclose(a.confs, b.confs, atol=1e-4))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Concurrent callers sharing one OCRModel")
+    parser.add_argument("--device", type=int, help="{0: gpu, 1: cpu}")
+    parser.add_argument("--input_dir", type=str, default="Datasets/IR_LPR/test_samples", help="Directory of car images")
+    parser.add_argument("--threads", type=int, default=8, help="Number of concurrent callers")
+    parser.add_argument("--repeats", type=int, default=5, help="Times every image is read by the thread pool")
+    parser.add_argument("--enhance", action="store_true", help="Rectify the plate crops before character detection")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed of the call order")
+
+    args = parser.parse_args()
+
+    # device=0 for cuda and device='cpu' for cpu
+    d = 0 if args.device == 0 else 'cpu'
+    ocr_model = OCRModel(model_path="Models/OCR_0/best.pt",
+                         plate_conf=0.6,
+                         char_conf=0.5,
+                         plate_iou=0.7,
+                         char_iou=0.7,
+                         plate_imgsz=(640, 640),
+                         char_imgsz=(320, 320),
+                         device=d,
+                         enhance=args.enhance)
+
+    imgs = [img for img in (cv2.imread(p) for p in sorted(glob.glob(os.path.join(args.input_dir, "*.*")))) if img is not None]
+    if not imgs:
+        print("No readable image in the input directory.")
+        return
+
+    # Serial reference, after a warmup
+    ocr_model.detect_character(imgs[0])
+    start_time = time.perf_counter()
+    reference = [ocr_model.detect_character(img) for img in imgs]
+    reference_readings = [ocr_model.read_plate(img) for img in imgs]
+    serial_time = time.perf_counter() - start_time
+
+    # Every image read repeats times by all threads, in a shuffled order so that different plates and both entry
+    # points are in flight at the same time
+    calls = [(i, method) for i in range(len(imgs)) for method in ("detect_character", "read_plate")] * args.repeats
+    random.Random(args.seed).shuffle(calls)
+    threads = set()
+
+    def call(item):
+        i, method = item
+        threads.add(threading.current_thread().name)
+        return i, method, getattr(ocr_model, method)(imgs[i])
+
+    start_time = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.threads) as executor:
+        outputs = list(executor.map(call, calls))
+    threaded_time = time.perf_counter() - start_time
+
+    mismatches = 0
+    for i, method, output in outputs:
+        ok = same_detection(output, reference[i]) if method == "detect_character" else same_reading(output, reference_readings[i])
+        if not ok:
+            mismatches += 1
+            expected = reference[i] if method == "detect_character" else reference_readings[i]
+            print(f"Mismatch on image {i} ({method}): {output} != {expected}")
+
+    serial_rate = 2 * len(imgs) / serial_time
+    threaded_rate = len(calls) / threaded_time
+    print(f"Serial   : {serial_rate:7.2f} calls/s")
+    print(f"Threaded : {threaded_rate:7.2f} calls/s with {args.threads} threads ({len(threads)} inference contexts), "
+          f"{threaded_rate / serial_rate:.2f}x")
+    print(f"{len(calls)} concurrent calls, {mismatches} differ from the serial run")
+    sys.exit(1 if mismatches else 0)
+
+
+if __name__ == "__main__":
+    main()
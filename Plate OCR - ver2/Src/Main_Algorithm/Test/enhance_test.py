@@ -0,0 +1,115 @@
+import sys
+sys.path.insert(0, "../")
+
+import os
+os.chdir('../../../')
+
+import argparse
+import glob
+import time
+import cv2
+import numpy as np
+from ocrPlate.Src.Main_Algorithm.Codes.main import OCRModel
+from ocrPlate.Src.Utils.plate_reading import PlateReading
+
+
+def load_labels(labels_path):
+    """
+    Reads a 'file_name,plate' csv, plates written with the English labels (e.g. 12b34567).
+    """
+
+    labels = {}
+    if labels_path is None:
+        return labels
+    with open(labels_path, encoding="utf-8") as file:
+        for line in file:
+            if "," in line:
+                name, plate = line.strip().split(",", 1)
+                labels[name] = plate
+    return labels
+
+
+def char_stage(ocr_model, plates, char_imgsz, enhance):
+    """
+    Runs only the character stage over pre-cropped plates.
+
+    Returns:
+        tuple: (readings, latencies) where latencies include the enhancement time.
+    """
+
+    readings, latencies = [], []
+    for plate in plates:
+        start_time = time.perf_counter()
+        source = ocr_model.enhance_plate(plate) if enhance else plate
+        results = ocr_model.predict(source=source,
+                                    conf=ocr_model.char_conf,
+                                    iou=ocr_model.char_iou,
+                                    imgsz=char_imgsz,
+                                    device=ocr_model.device,
+                                    classes=ocr_model.char_classes,
+                                    verbose=False)
+        readings.append(PlateReading.from_result(results[0]))
+        latencies.append(time.perf_counter() - start_time)
+    return readings, latencies
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Plate rectification evaluation")
+    parser.add_argument("--device", type=int, help="{0: gpu, 1: cpu}")
+    parser.add_argument("--input_dir", type=str, default="Datasets/IR_LPR/test_samples", help="Directory of car images")
+    parser.add_argument("--labels", type=str, default=None, help="Optional 'file_name,plate' csv with ground truth")
+    parser.add_argument("--small_imgsz", type=int, default=160, help="char_imgsz used for rectified plates")
+    parser.add_argument("--clahe", action="store_true", help="Apply CLAHE after rectification")
+    parser.add_argument("--runs_num", type=int, default=10, help="Repeat the character stage to obtain a valid runtime")
+
+    args = parser.parse_args()
+
+    # device=0 for cuda and device='cpu' for cpu
+    d = 0 if args.device == 0 else 'cpu'
+    ocr_model = OCRModel(model_path="Models/OCR_0/best.pt",
+                         plate_conf=0.6,
+                         char_conf=0.5,
+                         plate_iou=0.7,
+                         char_iou=0.7,
+                         plate_imgsz=(640, 640),
+                         char_imgsz=(320, 320),
+                         device=d,
+                         clahe=args.clahe)
+
+    names, plates = [], []
+    for img_path in sorted(glob.glob(os.path.join(args.input_dir, "*.*"))):
+        img = cv2.imread(img_path)
+        if img is None:
+            continue
+        plate = ocr_model.detect_plate(img)
+        if plate is not None:
+            names.append(os.path.basename(img_path))
+            plates.append(plate)
+
+    labels = load_labels(args.labels)
+    configs = [("raw", (320, 320), False),
+               ("raw small", (args.small_imgsz, args.small_imgsz), False),
+               ("rectified small", (args.small_imgsz, args.small_imgsz), True)]
+
+    # Warmup
+    for _, imgsz, enhance in configs:
+        char_stage(ocr_model, plates[:1], imgsz, enhance)
+
+    reference = None
+    for name, imgsz, enhance in configs:
+        times = []
+        for _ in range(args.runs_num):
+            readings, latencies = char_stage(ocr_model, plates, imgsz, enhance)
+            times.extend(latencies)
+        texts = [reading.text() for reading in readings]
+        if reference is None:
+            reference = texts
+
+        truth = [labels.get(n, ref) for n, ref in zip(names, reference)]
+        accuracy = np.mean([t == g for t, g in zip(texts, truth)]) if texts else 0.0
+        print(f"{name:16s} imgsz={imgsz[0]:4d}  char stage {np.mean(times) * 1000:7.2f} ms/plate  "
+              f"{'accuracy' if labels else 'agreement with raw 320'} {100 * accuracy:5.1f}%")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+import sys
+sys.path.insert(0, "../")
+
+import os
+os.chdir('../../../')
+
+import argparse
+import glob
+import time
+import cv2
+import numpy as np
+from ocrPlate.Src.Main_Algorithm.Codes.main import OCRModel
+from ocrPlate.Src.Utils.escalation import EscalationStats
+
+
+def run(ocr_model, imgs, batch_size, runs_num):
+    """
+    Reads all images in batches and returns the readings of the last run and the mean time per image.
+
+    The total time is divided by the total number of images, so a small last batch weighs as much as its images
+    and not as much as a full batch.
+    """
+
+    seconds, count = 0.0, 0
+    for _ in range(runs_num):
+        readings = []
+        for i in range(0, len(imgs), batch_size):
+            start_time = time.perf_counter()
+            readings.extend(ocr_model.read_plates(imgs[i:i + batch_size]))
+            seconds += time.perf_counter() - start_time
+            count += len(imgs[i:i + batch_size])
+    return readings, seconds / max(count, 1)
+
+
+def agreement(readings, reference):
+    return np.mean([a.text() == b.text() for a, b in zip(readings, reference)]) if reference else 0.0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Confidence-driven escalation of the character stage")
+    parser.add_argument("--device", type=int, help="{0: gpu, 1: cpu}")
+    parser.add_argument("--input_dir", type=str, default="Datasets/IR_LPR/test_samples", help="Directory of car images")
+    parser.add_argument("--small_imgsz", type=int, default=160, help="Character stage size of the first pass")
+    parser.add_argument("--large_imgsz", type=int, default=320, help="Character stage size of the escalated pass and of the reference")
+    parser.add_argument("--escalate_conf", type=float, nargs="+", default=[0.6, 0.7, 0.8], help="Median confidence thresholds to compare")
+    parser.add_argument("--no_enhance", action="store_true", help="Read the escalated crops without enhance_plate")
+    parser.add_argument("--batch_size", type=int, default=16, help="Images per read_plates call")
+    parser.add_argument("--runs_num", type=int, default=5, help="Repeat the detection to obtain a valid runtime")
+
+    args = parser.parse_args()
+
+    # device=0 for cuda and device='cpu' for cpu
+    d = 0 if args.device == 0 else 'cpu'
+    ocr_model = OCRModel(model_path="Models/OCR_0/best.pt",
+                         plate_conf=0.6,
+                         char_conf=0.5,
+                         plate_iou=0.7,
+                         char_iou=0.7,
+                         plate_imgsz=(640, 640),
+                         char_imgsz=(args.large_imgsz, args.large_imgsz),
+                         device=d,
+                         escalate_enhance=not args.no_enhance)
+
+    imgs = [img for img in (cv2.imread(p) for p in sorted(glob.glob(os.path.join(args.input_dir, "*.*")))) if img is not None]
+
+    # Reference: every crop at the large size
+    run(ocr_model, imgs[:1], 1, 1)  # Warmup
+    reference, large_time = run(ocr_model, imgs, args.batch_size, args.runs_num)
+    print(f"Fixed {args.large_imgsz:4d}        : {large_time * 1000:7.2f} ms/image")
+
+    ocr_model.char_imgsz = (args.small_imgsz, args.small_imgsz)
+    run(ocr_model, imgs[:1], 1, 1)  # Warmup
+    small, small_time = run(ocr_model, imgs, args.batch_size, args.runs_num)
+    print(f"Fixed {args.small_imgsz:4d}        : {small_time * 1000:7.2f} ms/image, "
+          f"agreement with {args.large_imgsz} {100 * agreement(small, reference):5.1f}%")
+    print("---------------------------------------------------------------------------------------------------------")
+
+    ocr_model.escalate_imgsz = (args.large_imgsz, args.large_imgsz)
+    for threshold in args.escalate_conf:
+        ocr_model.escalate_conf = threshold
+        run(ocr_model, imgs[:1], 1, 1)  # Warmup
+        ocr_model.escalation_stats = EscalationStats()
+        readings, adaptive_time = run(ocr_model, imgs, args.batch_size, args.runs_num)
+        report = ocr_model.escalation_stats.report()
+        print(f"Adaptive conf {threshold:.2f}: {adaptive_time * 1000:7.2f} ms/image, "
+              f"agreement with {args.large_imgsz} {100 * agreement(readings, reference):5.1f}%, "
+              f"escalation rate {100 * report['escalation_rate']:5.1f}% "
+              f"({100 * report['replaced_rate']:5.1f}% replaced), character stage "
+              f"{report['first_ms_per_plate']:.2f} + {report['second_ms_per_plate']:.2f} ms per escalated plate = "
+              f"{report['blended_ms_per_plate']:.2f} ms/plate blended")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+import sys
+sys.path.insert(0, "../")
+
+import os
+os.chdir('../../../')
+
+import argparse
+import time
+import numpy as np
+from ocrPlate.Src.Utils.event_store import PlateEventStore
+from ocrPlate.Src.Utils.plate_reading import NUM_CHARS, WILDCARD_ID, PLATE_DETECTED, PlateReading
+
+
+def simulate(rng, sources, duration, rate, frames_per_pass, wildcard_rate):
+    """
+    Synthetic reading stream: every source sees vehicles one after another, each read frames_per_pass times
+    with some positions randomly read as '*'.
+
+    Returns:
+        tuple: (list of (source, timestamp, reading), number of vehicle passes)
+    """
+
+    total = int(duration * rate)
+    per_source = total // sources
+    interval = sources / rate
+    stream, passes = [], 0
+    for s in range(sources):
+        t, i = 0.0, 0
+        while i < per_source:
+            ids = rng.integers(0, 10, NUM_CHARS).astype(np.uint8)
+            ids[2] = rng.integers(10, 36)
+            passes += 1
+            for _ in range(min(frames_per_pass, per_source - i)):
+                noisy = ids.copy()
+                noisy[rng.random(NUM_CHARS) < wildcard_rate] = WILDCARD_ID
+                confs = np.where(noisy != WILDCARD_ID, rng.uniform(0.5, 1.0, NUM_CHARS), 0).astype(np.float32)
+                stream.append((f"cam{s}", t, PlateReading(noisy, confs, flags=1)))
+                t += interval
+                i += 1
+            # Gap between two vehicles, longer than the TTL
+            t += 5.0
+    stream.sort(key=lambda item: item[1])
+    return stream, passes
+
+
+def check_legacy_readings():
+    """
+    Legacy detection lists, the class 28 letter included, are stored as detected readings, and lists that can't
+    be encoded are counted apart from the ignored ones.
+
+    Returns:
+        int: Number of failed checks.
+    """
+
+    store = PlateEventStore()
+    store.add("cam0", ["12", "ژ (معلولین و جانبازان)", "345", "-", "67"], 0.0, confidence=0.9)
+    store.add("cam0", ["12", "ب", "3*5", "-", "67"], 0.0, confidence=0.9)
+    store.add("cam0", ["12", "?", "345", "-", "67"], 0.0, confidence=0.9)
+    events = store.flush()
+    texts = sorted(event.text() for event in events)
+    failures = 0
+    if texts != ["12b3*567", "12zh34567"]:
+        print(f"Legacy readings stored as {texts}")
+        failures += 1
+    if not all(event.reading.flags & PLATE_DETECTED for event in events):
+        print("Legacy readings stored without PLATE_DETECTED")
+        failures += 1
+    stats = store.stats()
+    if stats["unencodable"] != 1 or stats["ignored"] != 0:
+        print(f"Unencodable reading counted as {stats}")
+        failures += 1
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Plate event store throughput")
+    parser.add_argument("--sources", type=int, default=16, help="Number of simulated cameras")
+    parser.add_argument("--rate", type=float, default=10000, help="Readings per second over all sources")
+    parser.add_argument("--duration", type=float, default=60, help="Simulated seconds")
+    parser.add_argument("--frames_per_pass", type=int, default=300, help="Readings per vehicle pass")
+    parser.add_argument("--wildcard_rate", type=float, default=0.05, help="Probability of a '*' per position")
+    parser.add_argument("--ttl", type=float, default=3.0, help="Store TTL in seconds")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed")
+
+    args = parser.parse_args()
+    failures = check_legacy_readings()
+    print(f"Legacy readings: {failures} failures")
+    if failures:
+        sys.exit(1)
+
+    rng = np.random.default_rng(args.seed)
+    stream, passes = simulate(rng, args.sources, args.duration, args.rate, args.frames_per_pass, args.wildcard_rate)
+
+    store = PlateEventStore(ttl=args.ttl)
+    events, max_open = [], 0
+    start_time = time.perf_counter()
+    for source, timestamp, reading in stream:
+        events.extend(store.add(source, reading, timestamp))
+        max_open = max(max_open, len(store))
+    events.extend(store.flush())
+    elapsed = time.perf_counter() - start_time
+
+    print(f"{len(stream)} readings from {args.sources} sources in {elapsed:.2f} s: "
+          f"{len(stream) / elapsed:.0f} readings/s ({args.rate:.0f} readings/s required)")
+    print(f"{passes} vehicle passes -> {len(events)} events, at most {max_open} passes open at once")
+    print(store.stats())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+import sys
+sys.path.insert(0, "../")
+
+import os
+os.chdir('../../../')
+
+import argparse
+import time
+import cv2
+from ocrPlate.Src.Main_Algorithm.Codes.main import OCRModel
+from ocrPlate.Src.Utils.motion_gate import MotionGate
+
+
+def run_video(ocr_model, video_path, gate=None, use_roi=False, max_frames=None):
+    """
+    Runs the whole video through detect_character, optionally behind a motion gate.
+
+    Returns:
+        tuple: (frames, inferred_frames, cpu_seconds, wall_seconds) where only the pipeline (gate + OCR)
+               is timed, decoding is excluded.
+    """
+
+    cap = cv2.VideoCapture(video_path)
+    frames, inferred, cpu_time, wall_time = 0, 0, 0.0, 0.0
+    while max_frames is None or frames < max_frames:
+        ok, frame = cap.read()
+        if not ok:
+            break
+        frames += 1
+
+        cpu_start, wall_start = time.process_time(), time.perf_counter()
+        moved, roi = True, None
+        if gate is not None:
+            moved, rois = gate.update(frame)
+            roi = MotionGate.union(rois) if use_roi else None
+        if moved:
+            ocr_model.detect_character(frame, roi)
+            inferred += 1
+        cpu_time += time.process_time() - cpu_start
+        wall_time += time.perf_counter() - wall_start
+
+    cap.release()
+    return frames, inferred, cpu_time, wall_time
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Motion gate evaluation")
+    parser.add_argument("--device", type=int, help="{0: gpu, 1: cpu}")
+    parser.add_argument("--video", type=str, help="Video of a (low-traffic) static camera")
+    parser.add_argument("--sensitivity", type=int, default=25, help="Grey-level difference counted as motion")
+    parser.add_argument("--min_area", type=float, default=0.002, help="Minimum moving area as fraction of the frame")
+    parser.add_argument("--use_roi", action="store_true", help="Pass the motion region on as plate search area")
+    parser.add_argument("--max_frames", type=int, default=None, help="Stop after this many frames")
+
+    args = parser.parse_args()
+
+    # device=0 for cuda and device='cpu' for cpu
+    d = 0 if args.device == 0 else 'cpu'
+    ocr_model = OCRModel(model_path="Models/OCR_0/best.pt",
+                         plate_conf=0.6,
+                         char_conf=0.5,
+                         plate_iou=0.7,
+                         char_iou=0.7,
+                         plate_imgsz=(640, 640),
+                         char_imgsz=(320, 320),
+                         device=d)
+
+    baseline = run_video(ocr_model, args.video, max_frames=args.max_frames)
+    gate = MotionGate(sensitivity=args.sensitivity, min_area=args.min_area)
+    gated = run_video(ocr_model, args.video, gate=gate, use_roi=args.use_roi, max_frames=args.max_frames)
+
+    for name, (frames, inferred, cpu_time, wall_time) in [("ungated", baseline), ("gated", gated)]:
+        print(f"{name:8s}: {inferred}/{frames} frames inferred, "
+              f"cpu {cpu_time / max(frames, 1) * 1000:.1f} ms/frame, wall {wall_time / max(frames, 1) * 1000:.1f} ms/frame")
+    print(f"CPU load reduction: {100 * (1 - gated[2] / max(baseline[2], 1e-9)):.1f}%")
+
+
+if __name__ == "__main__":
+    main()
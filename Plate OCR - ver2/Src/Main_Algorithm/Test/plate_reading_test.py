@@ -0,0 +1,202 @@
+import sys
+sys.path.insert(0, "../")
+
+import os
+os.chdir('../../../')
+
+import argparse
+import json
+import time
+from types import SimpleNamespace
+
+import numpy as np
+from ocrPlate.Src.Utils.plate_reading import NUM_CHARS, WILDCARD_ID, ID_TO_NAME, ID_TO_PERSIAN_NAME, \
+    READING_DTYPE, PLATE_DETECTED, HAS_WILDCARD, ILLEGIBLE, PlateReading, decode_ids, pack_readings, unpack_readings
+from ocrPlate.Src.Utils.postprocessing import working_with_results
+
+
+class ArrayTensor(np.ndarray):
+    """
+    A numpy array with the detach().cpu().numpy() chain of a torch tensor, to feed synthetic boxes to
+    working_with_results and PlateReading.from_result without a model.
+    """
+
+    def detach(self):
+        return self
+
+    def cpu(self):
+        return self
+
+    def numpy(self):
+        return np.asarray(self)
+
+
+def random_readings(rng, n):
+    """
+    Readings with random ids (some wildcards), confidences, boxes and flags.
+    """
+
+    readings = []
+    for _ in range(n):
+        ids = rng.integers(0, 36, NUM_CHARS).astype(np.uint8)
+        ids[rng.random(NUM_CHARS) < 0.1] = WILDCARD_ID
+        confs = np.where(ids != WILDCARD_ID, rng.random(NUM_CHARS), 0).astype(np.float32)
+        box = rng.integers(0, 4000, 4).astype(np.int32)
+        flags = int(rng.choice([PLATE_DETECTED, PLATE_DETECTED | HAS_WILDCARD, PLATE_DETECTED | ILLEGIBLE, ILLEGIBLE]))
+        readings.append(PlateReading(ids, confs, box, flags))
+    return readings
+
+
+def synthetic_result(rng, missing, duplicate):
+    """
+    Character boxes of one plate crop in shuffled order: two digits, a letter and five digits, evenly spaced, with
+    missing characters left out and optionally a second, overlapping box on one character.
+    """
+
+    ids = rng.integers(0, 10, NUM_CHARS)
+    ids[2] = rng.integers(10, 36)
+    x1 = 10 + 30 * np.arange(NUM_CHARS)
+    xyxy = np.stack([x1, np.full(NUM_CHARS, 5), x1 + 20, np.full(NUM_CHARS, 45)], axis=1)
+    confs = rng.uniform(0.5, 1.0, NUM_CHARS)
+
+    keep = np.ones(NUM_CHARS, dtype=bool)
+    keep[rng.choice(NUM_CHARS, missing, replace=False)] = False
+    xyxy, ids, confs = xyxy[keep], ids[keep], confs[keep]
+    if duplicate:
+        k = rng.integers(0, len(ids))
+        xyxy = np.vstack([xyxy, xyxy[k] + [1, 0, 0, 0]])
+        ids = np.append(ids, (ids[k] + 1) % 10 if ids[k] < 10 else 10 + (ids[k] - 9) % 26)
+        confs = np.append(confs, rng.uniform(0.5, 1.0))
+
+    order = rng.permutation(len(ids))
+    boxes = SimpleNamespace(cls=ids[order].astype(np.float32).view(ArrayTensor),
+                            conf=confs[order].astype(np.float32).view(ArrayTensor),
+                            xyxy=xyxy[order].astype(np.float32).view(ArrayTensor))
+    return SimpleNamespace(boxes=boxes)
+
+
+def check_serialisation(rng, n):
+    """
+    to_bytes/from_bytes, pack_readings/unpack_readings and to_json/from_dict give back equal readings.
+
+    Returns:
+        int: Number of failed checks.
+    """
+
+    failures = 0
+    readings = random_readings(rng, n)
+    for reading in readings:
+        payload = reading.to_bytes()
+        if len(payload) != READING_DTYPE.itemsize or PlateReading.from_bytes(payload) != reading:
+            print(f"Binary round trip failed for {reading}")
+            failures += 1
+        if PlateReading.from_dict(json.loads(reading.to_json())) != reading:
+            print(f"JSON round trip failed for {reading}: {reading.to_json()}")
+            failures += 1
+
+    buffer = pack_readings(readings)
+    if len(buffer) != n * READING_DTYPE.itemsize or unpack_readings(buffer) != readings:
+        print("pack_readings/unpack_readings round trip failed")
+        failures += 1
+    return failures
+
+
+def check_decode_ids(rng, n):
+    """
+    decode_ids matches a per-element lookup of id_to_name and id_to_persian_name, for any array shape.
+
+    Returns:
+        int: Number of failed checks.
+    """
+
+    failures = 0
+    ids = rng.integers(0, 36, (n, NUM_CHARS)).astype(np.uint8)
+    ids[rng.random(ids.shape) < 0.1] = WILDCARD_ID
+    for persian, id_to_name in ((False, ID_TO_NAME), (True, ID_TO_PERSIAN_NAME)):
+        expected = np.vectorize(lambda i: "*" if i == WILDCARD_ID else str(id_to_name[i]), otypes=[object])(ids)
+        for shape in ((n, NUM_CHARS), (n * NUM_CHARS,), (n, 2, NUM_CHARS // 2)):
+            labels = decode_ids(ids.reshape(shape), persian)
+            if labels.shape != shape or not np.array_equal(labels, expected.reshape(shape)):
+                print(f"decode_ids(persian={persian}) differs from the lookup for shape {shape}")
+                failures += 1
+    return failures
+
+
+def check_from_arrays(rng, n):
+    """
+    PlateReading.from_result gives the same detection list and median confidence as working_with_results, for
+    complete plates, plates with one or two missing characters and plates with an overlapping duplicate box.
+
+    Returns:
+        tuple: Number of failed checks, and the synthetic results for the timing.
+    """
+
+    failures = 0
+    results = []
+    for i in range(n):
+        result = synthetic_result(rng, missing=i % 3, duplicate=i % 4 == 3)
+        results.append(result)
+        reading = PlateReading.from_result(result)
+        if not reading.legible:
+            print(f"Plate {i} ({i % 3} missing) could not be arranged: {reading}")
+            failures += 1
+            continue
+        detection_list, median_conf = working_with_results([result], ID_TO_PERSIAN_NAME)
+        if reading.to_detection_list() != detection_list:
+            print(f"Plate {i}: from_result {reading.to_detection_list()}, working_with_results {detection_list}")
+            failures += 1
+        elif not np.isclose(reading.median_conf, median_conf):
+            print(f"Plate {i}: median confidence {reading.median_conf} instead of {median_conf}")
+            failures += 1
+    return failures, results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="PlateReading round trips and from_result benchmark")
+    parser.add_argument("--readings", type=int, default=10000, help="Random readings serialised")
+    parser.add_argument("--plates", type=int, default=3000, help="Synthetic plate crops compared and timed")
+    parser.add_argument("--runs", type=int, default=5, help="Timed passes over the synthetic plates")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed")
+
+    args = parser.parse_args()
+    rng = np.random.default_rng(args.seed)
+
+    failures = 0
+    for name, check in (("Serialisation round trips", check_serialisation), ("decode_ids", check_decode_ids)):
+        count = check(rng, args.readings)
+        print(f"{name}: {count} failures")
+        failures += count
+    count, results = check_from_arrays(rng, args.plates)
+    print(f"from_result vs working_with_results: {count} failures")
+    failures += count
+    if failures:
+        sys.exit(1)
+
+    for name, read in (("working_with_results", lambda r: working_with_results([r], ID_TO_PERSIAN_NAME)),
+                       ("PlateReading.from_result", PlateReading.from_result),
+                       ("from_result + to_detection_list", lambda r: PlateReading.from_result(r).to_detection_list())):
+        times = []
+        for _ in range(args.runs):
+            start_time = time.perf_counter()
+            for result in results:
+                read(result)
+            times.append((time.perf_counter() - start_time) / len(results))
+        print(f"{name:32s} {min(times) * 1e6:8.1f} us/plate")
+
+    readings = random_readings(rng, args.readings)
+    start_time = time.perf_counter()
+    buffer = pack_readings(readings)
+    pack_time = time.perf_counter() - start_time
+    start_time = time.perf_counter()
+    unpack_readings(buffer)
+    unpack_time = time.perf_counter() - start_time
+    start_time = time.perf_counter()
+    for reading in readings:
+        reading.to_json()
+    json_time = time.perf_counter() - start_time
+    print(f"pack {pack_time / len(readings) * 1e6:.2f} us/reading, unpack {unpack_time / len(readings) * 1e6:.2f} "
+          f"us/reading, to_json {json_time / len(readings) * 1e6:.2f} us/reading")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+import sys
+sys.path.insert(0, "../")
+
+import os
+os.chdir('../../../')
+
+import argparse
+import json
+import shutil
+import tempfile
+import time
+import cv2
+import numpy as np
+from ocrPlate.Src.Main_Algorithm.Codes.main import OCRModel
+from ocrPlate.Src.Utils.stream_scheduler import FrameSource, StreamScheduler
+
+
+def check_replay(num_frames=60):
+    """
+    A video file read with realtime=False hands every frame to a slow consumer, none dropped.
+
+    Returns:
+        int: Number of failed checks.
+    """
+
+    work_dir = tempfile.mkdtemp()
+    try:
+        path = os.path.join(work_dir, "replay.avi")
+        video = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*"MJPG"), 25, (64, 48))
+        for i in range(num_frames):
+            video.write(np.full((48, 64, 3), i * 4, dtype=np.uint8))
+        video.release()
+
+        source = FrameSource("replay", path, buffer_size=2, latency_budget=0.01, realtime=False).start()
+        received = 0
+        while not source.exhausted:
+            item = source.pop_fresh()
+            if item is None:
+                time.sleep(0.001)
+                continue
+            received += 1
+            # Slower than the reader and than the latency budget
+            time.sleep(0.02)
+        source.stop()
+    finally:
+        shutil.rmtree(work_dir)
+
+    metrics = source.metrics.as_dict()
+    print(f"Replay   : {received} of {num_frames} frames received, {metrics}")
+    return int(received != num_frames or metrics["dropped_overflow"] or metrics["dropped_stale"])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Multi-source stream scheduler evaluation")
+    parser.add_argument("--device", type=int, help="{0: gpu, 1: cpu}")
+    parser.add_argument("--sources", type=str, nargs="+", help="Video files or rtsp:// urls, one per simulated camera")
+    parser.add_argument("--duration", type=float, default=30.0, help="Seconds to run")
+    parser.add_argument("--batch_size", type=int, default=8, help="Frames per inference call")
+    parser.add_argument("--latency_budget", type=float, default=0.5, help="Max frame age in seconds before it is dropped")
+    parser.add_argument("--annotate_dir", type=str, default=None, help="Optional directory receiving one annotated video per source")
+    parser.add_argument("--font", type=str, default=None, help="TrueType font with Persian glyphs, required by --annotate_dir")
+    parser.add_argument("--check_replay", action="store_true", help="Only check that a file replayed with realtime=False drops no frame, without the model")
+
+    args = parser.parse_args()
+    if args.check_replay:
+        sys.exit(1 if check_replay() else 0)
+    if args.annotate_dir is not None and args.font is None:
+        parser.error("--annotate_dir requires --font")
+
+    # device=0 for cuda and device='cpu' for cpu
+    d = 0 if args.device == 0 else 'cpu'
+    ocr_model = OCRModel(model_path="Models/OCR_0/best.pt",
+                         plate_conf=0.6,
+                         char_conf=0.5,
+                         plate_iou=0.7,
+                         char_iou=0.7,
+                         plate_imgsz=(640, 640),
+                         char_imgsz=(320, 320),
+                         device=d)
+
+    sources = [FrameSource(f"cam{i}", uri, latency_budget=args.latency_budget, loop=True)
+               for i, uri in enumerate(args.sources)]
+    scheduler = StreamScheduler(ocr_model, sources, batch_size=args.batch_size)
+
+    writer = None
+    if args.annotate_dir is not None:
+        # Imported here, so that runs without annotation do not load Pillow
+        from ocrPlate.Src.Utils.annotation import GlyphCache, AnnotationWriter
+        writer = AnnotationWriter(args.annotate_dir, GlyphCache(args.font), output_format="video")
+
+    def on_result(name, frame, output):
+        detection_list, median_conf, detected_car = output
+        if detected_car:
+            print(f"{name}: {detection_list} ({median_conf})")
+        if writer is not None:
+            writer.submit(frame, [output], stream=name)
+
+    try:
+        scheduler.run(on_result, duration=args.duration)
+    finally:
+        if writer is not None:
+            writer.close()
+            print(f"Annotation: {writer.report()}")
+
+    print("---------------------------------------------------------------------------------------------------------")
+    print(json.dumps(scheduler.metrics(), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+import sys
+sys.path.insert(0, "../")
+
+import os
+os.chdir('../../../')
+
+import argparse
+import itertools
+import time
+import numpy as np
+from ocrPlate.Src.Main_Algorithm.Codes.main import OCRModel
+from ocrPlate.Src.Utils.image_pack import ImagePack
+from ocrPlate.Src.Utils.synthetic_plates import SyntheticPlates, load_labels
+
+
+def iou(a, b):
+    w = max(0, min(a[2], b[2]) - max(a[0], b[0]))
+    h = max(0, min(a[3], b[3]) - max(a[1], b[1]))
+    union = (a[2] - a[0]) * (a[3] - a[1]) + (b[2] - b[0]) * (b[3] - b[1]) - w * h
+    return w * h / union if union > 0 else 0.0
+
+
+def iter_samples(args):
+    """
+    Yields:
+        tuple: (name, image, label) from a dataset written by synthetic_plates.py, or generated on the fly.
+    """
+
+    if args.data_dir is not None:
+        pack = ImagePack(os.path.join(args.data_dir, "plates.pack"))
+        labels = load_labels(os.path.join(args.data_dir, "labels.jsonl"))
+        samples = ((name, img, labels[name]) for name, img in pack)
+        return itertools.islice(samples, args.count) if args.count else samples
+    return SyntheticPlates(args.font, args.backgrounds, seed=args.seed).stream(args.count or 1000)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Plate OCR accuracy and throughput on synthetic plates")
+    parser.add_argument("--device", type=int, help="{0: gpu, 1: cpu}")
+    parser.add_argument("--data_dir", type=str, default=None, help="Dataset written by synthetic_plates.py (plates.pack and labels.jsonl)")
+    parser.add_argument("--font", type=str, default=None, help="TrueType font with Persian glyphs, to generate the samples on the fly")
+    parser.add_argument("--backgrounds", type=str, default=None, help="Optional directory of background images for on the fly samples")
+    parser.add_argument("--count", type=int, default=None, help="Number of samples (default: the whole dataset, or 1000 on the fly)")
+    parser.add_argument("--batch_size", type=int, default=16, help="Images per read_plates call")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed of on the fly samples")
+
+    args = parser.parse_args()
+    if args.data_dir is None and args.font is None:
+        parser.error("--data_dir or --font is required")
+
+    # device=0 for cuda and device='cpu' for cpu
+    d = 0 if args.device == 0 else 'cpu'
+    ocr_model = OCRModel(model_path="Models/OCR_0/best.pt",
+                         plate_conf=0.6,
+                         char_conf=0.5,
+                         plate_iou=0.7,
+                         char_iou=0.7,
+                         plate_imgsz=(640, 640),
+                         char_imgsz=(320, 320),
+                         device=d)
+
+    samples = iter_samples(args)
+    seconds, count, detected, correct = 0.0, 0, 0, 0
+    char_hits = np.zeros(8, dtype=np.int64)
+    warm = False
+    while True:
+        batch = list(itertools.islice(samples, args.batch_size))
+        if not batch:
+            break
+        imgs = [img for _, img, _ in batch]
+        if not warm:
+            ocr_model.read_plates(imgs[:1])  # Warmup
+            warm = True
+
+        start_time = time.perf_counter()
+        readings = ocr_model.read_plates(imgs)
+        seconds += time.perf_counter() - start_time
+
+        for (_, _, label), reading in zip(batch, readings):
+            count += 1
+            if reading.detected and iou(reading.box, label["box"]) >= 0.5:
+                detected += 1
+                correct += reading.text() == label["plate"]
+                char_hits += reading.ids == np.asarray(label["ids"], dtype=np.uint8)
+
+    if count == 0:
+        print("No sample to read.")
+        return
+
+    print(f"{count} synthetic images: {1000 * seconds / count:7.2f} ms/image, {count / seconds:7.1f} images/s")
+    print(f"Plate recall (IoU >= 0.5) {100 * detected / count:5.1f}%, plate accuracy {100 * correct / count:5.1f}%, "
+          f"character accuracy on found plates {100 * char_hits.sum() / max(8 * detected, 1):5.1f}%")
+    print("Character accuracy per position: " + " ".join(f"{100 * h / max(detected, 1):5.1f}%" for h in char_hits))
+
+
+if __name__ == "__main__":
+    main()
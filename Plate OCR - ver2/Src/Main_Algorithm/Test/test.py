@@ -6,15 +6,22 @@ os.chdir('../../../')
 
 import argparse
 from ocrPlate.Src.Main_Algorithm.Codes.main import OCRModel
+from ocrPlate.Src.Utils.image_pack import ImagePack
 import cv2
 import numpy as np
 import time
 
-def detect_and_print(ocr_model, img_paths):
+def iter_images(img_paths, pack=None):
+    # (path, image) pairs, decoded with cv2.imread on every pass, or zero-copy views of a pre-decoded pack
+    if pack is not None:
+        return iter(pack)
+    return ((img_path, cv2.imread(img_path)) for img_path in img_paths)
+
+
+def detect_and_print(ocr_model, img_paths, pack=None):
 
     results = {}
-    for img_path in img_paths:
-        img = cv2.imread(img_path)
+    for img_path, img in iter_images(img_paths, pack):
         # Main method!
         detection_list, median_conf, detected_car = ocr_model.detect_character(img)
         results[img_path] = [detection_list, median_conf, detected_car]
@@ -22,11 +29,10 @@ def detect_and_print(ocr_model, img_paths):
     return results
 
 
-def time_evaluation(ocr_model, img_paths, runs_num):
+def time_evaluation(ocr_model, img_paths, runs_num, pack=None):
 
     ####################################################### Warmup #######################################################
-    img_path = img_paths[0]
-    img = cv2.imread(img_path)
+    _, img = next(iter_images(img_paths, pack))
     # Main method!
     detection_list, median_conf, detected_car = ocr_model.detect_character(img)
     ####################################################### Warmup #######################################################
@@ -34,8 +40,7 @@ def time_evaluation(ocr_model, img_paths, runs_num):
 
     times = []
     for i in range(runs_num):
-        for img_path in img_paths:
-            img = cv2.imread(img_path)
+        for img_path, img in iter_images(img_paths, pack):
             start_time = time.time()
             # Main method!
             detection_list, median_conf, detected_car = ocr_model.detect_character(img)
@@ -46,15 +51,39 @@ def time_evaluation(ocr_model, img_paths, runs_num):
     execution_time = np.mean(times)
     return execution_time
 
+def profile(ocr_model, img_paths, iterations, output_prefix, pack=None):
+    # Imported here, so that normal runs do not load the profilers
+    from ocrPlate.Src.Utils.profiling import profile_calls, decode_image
+
+    if pack is not None:
+        call, inputs = ocr_model.detect_character, [img for _, img in pack]
+    else:
+        call, inputs = (lambda img_path: ocr_model.detect_character(decode_image(img_path))), img_paths
+    print(profile_calls(call, inputs, iterations, output_prefix))
+
+
 def main():
     parser = argparse.ArgumentParser(description="OCR Module Evaluating")
     parser.add_argument("--device", type=int, help="{0: gpu, 1: cpu}")
     parser.add_argument("--runs_num", type=int, help="{Repeat the detection to obtain a valid runtime}")
+    parser.add_argument("--pack", type=str, default=None, help="Image pack from image_pack.py to read instead of decoding the test images")
+    parser.add_argument("--synthetic", type=int, default=None, help="Read this many synthetic plates (see synthetic_plates.py) instead of the test images")
+    parser.add_argument("--font", type=str, default=None, help="TrueType font with Persian glyphs for --synthetic")
+    parser.add_argument("--profile", action="store_true", help="Profile detect_character instead of the evaluation")
+    parser.add_argument("--profile_iters", type=int, default=50, help="Number of profiled detect_character calls")
+    parser.add_argument("--profile_output", type=str, default="profile/test", help="Prefix of the trace, flamegraph stacks and summary files")
 
 
     args = parser.parse_args()
     device = args.device
     runs_num = args.runs_num
+    pack = ImagePack(args.pack) if args.pack else None
+    if args.synthetic:
+        if args.font is None:
+            parser.error("--synthetic requires --font")
+        from ocrPlate.Src.Utils.synthetic_plates import SyntheticPlates
+        # Any (name, image) sequence stands in for a pack
+        pack = [(name, img) for name, img, _ in SyntheticPlates(args.font).stream(args.synthetic)]
     
     img_paths = ["Datasets/IR_LPR/test_samples/day_00474.jpg",
                  "Datasets/IR_LPR/test_samples/day_00019.jpg",
@@ -82,10 +111,14 @@ def main():
                              char_imgsz=(320, 320),
                              device=d)
 
-        elapsed_time = time_evaluation(ocr_model, img_paths, runs_num)
+        if args.profile:
+            profile(ocr_model, img_paths, args.profile_iters, args.profile_output, pack)
+            return
+
+        elapsed_time = time_evaluation(ocr_model, img_paths, runs_num, pack)
         print(f"Average elapsed time: {round(elapsed_time, 2)} seconds for gpu\n")
         print("---------------------------------------------------------------------------------------------------------")
-        results = detect_and_print(ocr_model, img_paths)
+        results = detect_and_print(ocr_model, img_paths, pack)
         for key in results:
             print(f"OCR result: {key}    :    {results[key]}")
 
@@ -100,10 +133,14 @@ def main():
                              char_imgsz=(320, 320),
                              device=d)
 
-        elapsed_time = time_evaluation(ocr_model, img_paths, runs_num)
+        if args.profile:
+            profile(ocr_model, img_paths, args.profile_iters, args.profile_output, pack)
+            return
+
+        elapsed_time = time_evaluation(ocr_model, img_paths, runs_num, pack)
         print(f"Average elapsed time: {round(elapsed_time, 2)} seconds for cpu\n")
         print("---------------------------------------------------------------------------------------------------------") 
-        results = detect_and_print(ocr_model, img_paths)
+        results = detect_and_print(ocr_model, img_paths, pack)
         for key in results:
             print(f"OCR result: {key}    :    {results[key]}")
 
@@ -0,0 +1,162 @@
+import sys
+sys.path.insert(0, "../")
+
+import os
+os.chdir('../../../')
+
+import argparse
+import glob
+import time
+import cv2
+import numpy as np
+from ocrPlate.Src.Main_Algorithm.Codes.main import OCRModel
+from ocrPlate.Src.Utils.tiling import tile_grid, merge_tile_boxes
+
+
+def iou(a, b):
+    w = max(0, min(a[2], b[2]) - max(a[0], b[0]))
+    h = max(0, min(a[3], b[3]) - max(a[1], b[1]))
+    union = (a[2] - a[0]) * (a[3] - a[1]) + (b[2] - b[0]) * (b[3] - b[1]) - w * h
+    return w * h / union if union > 0 else 0.0
+
+
+def make_frames(imgs, boxes, canvas, scale, rng):
+    """
+    Simulates distant cars on a high resolution camera: every image is shrunk by scale and pasted at a random place
+    of a canvas of the given (width, height). The reference plate box is moved along.
+
+    Returns:
+        tuple: (frames, boxes in frame coordinates)
+    """
+
+    frames, frame_boxes = [], []
+    width, height = canvas
+    for img, box in zip(imgs, boxes):
+        small = cv2.resize(img, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+        h, w = small.shape[:2]
+        frame = np.full((height, width, 3), 114, dtype=np.uint8)
+        x, y = int(rng.integers(0, max(1, width - w))), int(rng.integers(0, max(1, height - h)))
+        frame[y:y + h, x:x + w] = small[:height - y, :width - x]
+        frames.append(frame)
+        frame_boxes.append(tuple(int(round(v * scale)) + o for v, o in zip(box, (x, y, x, y))))
+    return frames, frame_boxes
+
+
+def evaluate(ocr_model, frames, boxes, texts, runs_num):
+    """
+    Returns:
+        tuple: (recall of the reference plate boxes, agreement of the plate text with the reference, ms per frame)
+    """
+
+    times, hits, agree = [], [], []
+    for _ in range(runs_num):
+        hits, agree = [], []
+        for frame, box, text in zip(frames, boxes, texts):
+            start_time = time.perf_counter()
+            reading = ocr_model.read_plate(frame)
+            times.append(time.perf_counter() - start_time)
+            hits.append(reading.detected and iou(reading.box, box) >= 0.5)
+            agree.append(reading.detected and reading.text() == text)
+    return np.mean(hits), np.mean(agree), 1000 * np.mean(times)
+
+
+def check_border_boxes():
+    """
+    Tile detections on the image border, collapsing to an empty box once clipped or converted to integer pixels,
+    are dropped by merge_tile_boxes, and the boxes it keeps crop non-empty plates.
+
+    Returns:
+        int: Number of failed checks.
+    """
+
+    width, height = 1000, 600
+    img = np.zeros((height, width, 3), dtype=np.uint8)
+    grid = tile_grid(width, height, 640, 0.2)
+    right = int(np.argmax(grid[:, 2]))
+    x0, y0 = grid[right, :2]
+    tile_boxes, tile_scores = [np.zeros((0, 4), dtype=np.float32) for _ in grid], [np.zeros(0) for _ in grid]
+    # On the right border, below the bottom border, and a well inside box with a lower score
+    tile_boxes[right] = np.array([[width - x0 - 0.8, 10, width - x0 - 0.1, 60],
+                                  [100, height - y0 + 2, 220, height - y0 + 30],
+                                  [100, 100, 220, 140]], dtype=np.float32)
+    tile_scores[right] = np.array([0.95, 0.9, 0.8], dtype=np.float32)
+    boxes, scores = merge_tile_boxes(grid, tile_boxes, tile_scores)
+
+    failures = 0
+    if len(boxes) != 1 or tuple(boxes[0]) != (100 + x0, 100 + y0, 220 + x0, 140 + y0):
+        print(f"Border boxes kept: {boxes.tolist()}")
+        failures += 1
+    for x1, y1, x2, y2 in boxes:
+        if img[y1:y2, x1:x2].size == 0:
+            print(f"Empty crop for box {(x1, y1, x2, y2)}")
+            failures += 1
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Tiled plate detection on high resolution frames")
+    parser.add_argument("--device", type=int, help="{0: gpu, 1: cpu}")
+    parser.add_argument("--input_dir", type=str, default="Datasets/IR_LPR/test_samples", help="Directory of car images")
+    parser.add_argument("--canvas", type=int, nargs=2, default=[3840, 2160], help="Width and height of the simulated frames")
+    parser.add_argument("--scale", type=float, default=0.35, help="Scale of the car images pasted on the frames")
+    parser.add_argument("--large_imgsz", type=int, default=1920, help="plate_imgsz of the letterboxed baseline")
+    parser.add_argument("--tile_size", type=int, default=640, help="Side of the plate detection tiles")
+    parser.add_argument("--tile_overlap", type=float, default=0.2, help="Overlap of neighbouring tiles")
+    parser.add_argument("--tile_batch", type=int, default=16, help="Tiles per batched call")
+    parser.add_argument("--runs_num", type=int, default=3, help="Repeat the detection to obtain a valid runtime")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed of the car positions")
+
+    args = parser.parse_args()
+    failures = check_border_boxes()
+    print(f"Border boxes: {failures} failures")
+    if failures:
+        sys.exit(1)
+
+    # device=0 for cuda and device='cpu' for cpu
+    d = 0 if args.device == 0 else 'cpu'
+    ocr_model = OCRModel(model_path="Models/OCR_0/best.pt",
+                         plate_conf=0.6,
+                         char_conf=0.5,
+                         plate_iou=0.7,
+                         char_iou=0.7,
+                         plate_imgsz=(640, 640),
+                         char_imgsz=(320, 320),
+                         device=d,
+                         tile_overlap=args.tile_overlap,
+                         tile_batch=args.tile_batch)
+
+    # The reference plate of every car image, read at full size
+    imgs, boxes, texts = [], [], []
+    for img_path in sorted(glob.glob(os.path.join(args.input_dir, "*.*"))):
+        img = cv2.imread(img_path)
+        if img is None:
+            continue
+        reading = ocr_model.read_plate(img)
+        if reading.detected:
+            imgs.append(img)
+            boxes.append(tuple(int(v) for v in reading.box))
+            texts.append(reading.text())
+    if not imgs:
+        print("No plate found in the input images.")
+        return
+
+    frames, frame_boxes = make_frames(imgs, boxes, tuple(args.canvas), args.scale, np.random.default_rng(args.seed))
+    print(f"{len(frames)} frames of {args.canvas[0]}x{args.canvas[1]}, cars scaled by {args.scale}")
+    print("---------------------------------------------------------------------------------------------------------")
+
+    num_tiles = len(tile_grid(args.canvas[0], args.canvas[1], args.tile_size, args.tile_overlap))
+    configs = [(f"letterbox {ocr_model.plate_imgsz[0]}", ocr_model.plate_imgsz, None),
+               (f"letterbox {args.large_imgsz}", (args.large_imgsz, args.large_imgsz), None),
+               (f"tiled {args.tile_size} ({num_tiles} tiles)", ocr_model.plate_imgsz, (args.tile_size, args.tile_size))]
+
+    for name, plate_imgsz, tile_size in configs:
+        ocr_model.plate_imgsz = plate_imgsz
+        ocr_model.tile_size = tile_size
+        ocr_model.read_plate(frames[0])  # Warmup
+        recall, agreement, ms = evaluate(ocr_model, frames, frame_boxes, texts, args.runs_num)
+        print(f"{name:28s}: {ms:8.1f} ms/frame, plate recall {100 * recall:5.1f}%, "
+              f"text agreement with full size {100 * agreement:5.1f}%")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+import sys
+sys.path.insert(0, "../")
+
+import os
+os.chdir('../../../')
+
+import argparse
+import time
+import numpy as np
+from ocrPlate.Src.Utils.plate_reading import NUM_CHARS, WILDCARD_ID, ID_TO_PERSIAN_NAME, PLATE_CLASS_ID, \
+    PLATE_DETECTED, PlateReading, encode_plate
+from ocrPlate.Src.Utils.watchlist import PlateIndex
+
+
+def random_plates(rng, n):
+    """
+    Random plates in the Iranian layout: two digits, a letter and five digits.
+    """
+
+    codes = rng.integers(0, 10, (n, NUM_CHARS)).astype(np.uint8)
+    codes[:, 2] = rng.integers(10, 36, n)
+    return codes
+
+
+def make_query(rng, codes, wildcards, substitutions):
+    """
+    A stored plate with some positions replaced by '*' and some known positions replaced by another class.
+    """
+
+    ids = codes[rng.integers(0, len(codes))].copy()
+    positions = rng.choice(NUM_CHARS, wildcards + substitutions, replace=False)
+    ids[positions[:wildcards]] = WILDCARD_ID
+    for position in positions[wildcards:]:
+        ids[position] = (int(ids[position]) + 1) % 10 if position != 2 else 10 + (int(ids[position]) - 9) % 26
+    return ids
+
+
+def check_round_trip():
+    """
+    Every label of id_to_persian_name, multi-word ones included, encodes back to its class id from the English text,
+    the Persian text and the legacy detection list of a reading.
+
+    Returns:
+        int: Number of classes that don't round-trip.
+    """
+
+    failures = 0
+    for class_id in ID_TO_PERSIAN_NAME:
+        if class_id == PLATE_CLASS_ID:
+            continue
+        ids = np.array([1, 2, class_id, 3, 4, 5, 6, 7], dtype=np.uint8)
+        reading = PlateReading(ids, flags=PLATE_DETECTED)
+        for text in (reading.text(), reading.text(persian=True), "".join(reading.to_detection_list())):
+            try:
+                ok = np.array_equal(encode_plate(text), ids)
+            except ValueError:
+                ok = False
+            if not ok:
+                print(f"Round trip failed for class {class_id}: {text!r}")
+                failures += 1
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Plate watchlist index benchmark")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000000, 10000000], help="Watchlist sizes")
+    parser.add_argument("--queries", type=int, default=1000, help="Queries per query type")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed")
+
+    args = parser.parse_args()
+    failures = check_round_trip()
+    print(f"encode_plate round trip: {failures} failures")
+    if failures:
+        sys.exit(1)
+
+    rng = np.random.default_rng(args.seed)
+    query_types = [("exact", 0, 0), ("1 wildcard", 1, 0), ("2 wildcards", 2, 0),
+                   ("1 substitution", 0, 1), ("2 substitutions", 0, 2), ("3 wildcards + 1 sub", 3, 1)]
+
+    for size in args.sizes:
+        codes = random_plates(rng, size)
+
+        start_time = time.perf_counter()
+        index = PlateIndex(capacity=size)
+        index.add_many(codes)
+        build_time = time.perf_counter() - start_time
+        print(f"{len(index)} plates: build {build_time:.2f} s, memory {index.memory_bytes() / 2 ** 20:.1f} MiB")
+
+        for name, wildcards, substitutions in query_types:
+            times, matches = [], []
+            for _ in range(args.queries):
+                ids = make_query(rng, codes, wildcards, substitutions)
+                start_time = time.perf_counter()
+                slots = index.query_slots(ids, max_substitutions=substitutions)
+                times.append(time.perf_counter() - start_time)
+                matches.append(len(slots))
+            times = np.array(times) * 1e6
+            print(f"  {name:20s} mean {times.mean():9.1f} us  p95 {np.percentile(times, 95):9.1f} us  "
+                  f"matches/query {np.mean(matches):8.1f}")
+
+        new_plates = random_plates(rng, args.queries)
+        start_time = time.perf_counter()
+        for ids in new_plates:
+            index.add(ids)
+        add_time = (time.perf_counter() - start_time) / len(new_plates)
+        start_time = time.perf_counter()
+        for ids in new_plates:
+            index.remove(ids)
+        remove_time = (time.perf_counter() - start_time) / len(new_plates)
+        print(f"  add {add_time * 1e6:.1f} us/plate, remove {remove_time * 1e6:.1f} us/plate")
+        print("---------------------------------------------------------------------------------------------------------")
+
+
+if __name__ == "__main__":
+    main()
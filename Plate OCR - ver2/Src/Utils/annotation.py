@@ -0,0 +1,293 @@
+import os
+import queue
+import threading
+import time
+from collections import OrderedDict
+
+import cv2
+import numpy as np
+
+from ocrPlate.Src.Utils.plate_reading import PlateReading, NUM_CHARS, WILDCARD_ID, PLATE_DETECTED, HAS_WILDCARD, \
+    ILLEGIBLE, encode_plate
+from ocrPlate.Src.Utils.glyphs import GLYPH_TEXT, load_font, rasterise
+
+
+class GlyphCache:
+    def __init__(self, font_path, height=28, label_cache_size=512):
+        """
+        Persian labels for annotated frames, which cv2.putText can't draw.
+
+        Args:
+            font_path (str): TrueType font with Persian glyphs, e.g. Vazirmatn or B Traffic.
+            height (int): Glyph height of the labels in pixels (default is 28).
+            label_cache_size (int): Number of composed plate labels kept, least recently used first out. Videos
+                                    show the same plates for many frames, so most labels are composed once.
+
+        Every class of id_to_persian_name, and '*' for unknown positions, is rasterised once with Pillow and
+        scaled to the label height. Labels are then composed from the cached masks with numpy only.
+        """
+
+        font = load_font(font_path, 2 * height)
+        self.height = height
+        self.gap = max(1, height // 8)
+        self.glyphs = {}
+        for class_id, text in list(GLYPH_TEXT.items()) + [(WILDCARD_ID, "*")]:
+            ink = rasterise(text, font)
+            # '*' sits high in the line, it is scaled like a small glyph instead of stretched to the full height
+            h = height // 2 if class_id == WILDCARD_ID else height
+            w = max(1, round(ink.shape[1] * h / ink.shape[0]))
+            mask = np.zeros((height, w), dtype=np.float32)
+            mask[(height - h) // 2:(height - h) // 2 + h] = cv2.resize(ink, (w, h), interpolation=cv2.INTER_AREA)
+            self.glyphs[class_id] = mask
+        self.labels = OrderedDict()
+        self.label_cache_size = label_cache_size
+
+    def label(self, ids):
+        """
+        Args:
+            ids (numpy.ndarray): 8 class ids in plate order.
+
+        Returns:
+            numpy.ndarray: float32 ink coverage (0 to 1) of the plate label, height pixels high.
+        """
+
+        key = np.asarray(ids, dtype=np.uint8).tobytes()
+        mask = self.labels.get(key)
+        if mask is not None:
+            self.labels.move_to_end(key)
+            return mask
+
+        parts = []
+        for k, class_id in enumerate(key):
+            # Wider gaps around the letter and before the region digits, like the plate itself
+            gap = 3 * self.gap if k in (2, 3, 6) else self.gap
+            parts.append(np.zeros((self.height, gap), dtype=np.float32))
+            parts.append(self.glyphs.get(class_id, self.glyphs[WILDCARD_ID]))
+        mask = np.concatenate(parts[1:], axis=1)
+
+        self.labels[key] = mask
+        if len(self.labels) > self.label_cache_size:
+            self.labels.popitem(last=False)
+        return mask
+
+
+def as_reading(output):
+    """
+    Args:
+        output (PlateReading or tuple): A reading, or the (detection_list, median_conf, detected_car) output of
+                                        detect_character and detect_character_batch.
+
+    Returns:
+        PlateReading: The reading. Legacy outputs have no plate box, their box stays zero, and outputs that can't
+                      be encoded are flagged ILLEGIBLE.
+    """
+
+    if isinstance(output, PlateReading):
+        return output
+    detection_list, median_conf, detected_car = output
+    if not detected_car:
+        return PlateReading.not_detected()
+    try:
+        ids = encode_plate("".join(str(part) for part in detection_list if part is not None))
+    except ValueError:
+        return PlateReading(flags=PLATE_DETECTED | ILLEGIBLE)
+    known = ids != WILDCARD_ID
+    confs = np.where(known, median_conf or 0, 0).astype(np.float32)
+    return PlateReading(ids, confs, flags=PLATE_DETECTED if known.all() else PLATE_DETECTED | HAS_WILDCARD)
+
+
+def draw_reading(frame, reading, glyphs, color=(0, 220, 0)):
+    """
+    Draws the plate box and a label with the plate text and its median confidence on frame, in place.
+
+    The label sits above the plate box, or in the top left corner for readings without a box, and is clipped to
+    the frame. Only the label area is blended, so the cost doesn't depend on the frame size. Illegible readings
+    get the box only.
+
+    Args:
+        frame (numpy.ndarray): Writable BGR image.
+        reading (PlateReading): The reading to draw. Undetected readings draw nothing.
+        glyphs (GlyphCache): Label glyphs.
+        color (tuple): BGR colour of the box and the text.
+    """
+
+    if not reading.detected:
+        return
+
+    x1, y1, x2, y2 = (int(v) for v in reading.box)
+    has_box = x2 > x1 and y2 > y1
+    if has_box:
+        cv2.rectangle(frame, (x1, y1), (x2, y2), color, 2)
+    if not reading.legible:
+        return
+
+    mask = glyphs.label(reading.ids)
+    pad = glyphs.gap * 2
+    conf = reading.median_conf
+    conf_text = "" if conf is None else f"{conf:.2f}"
+    (conf_w, _), _ = cv2.getTextSize(conf_text, cv2.FONT_HERSHEY_SIMPLEX, glyphs.height / 40, 1)
+    label_h = mask.shape[0] + 2 * pad
+    label_w = mask.shape[1] + 3 * pad + conf_w
+
+    lx = x1 if has_box else 0
+    ly = y1 - label_h if has_box and y1 >= label_h else (y2 if has_box else 0)
+    fx1, fy1 = max(lx, 0), max(ly, 0)
+    fx2, fy2 = min(lx + label_w, frame.shape[1]), min(ly + label_h, frame.shape[0])
+    if fx2 <= fx1 or fy2 <= fy1:
+        return
+
+    # Darkened background, then the text composited with its coverage as alpha
+    region = frame[fy1:fy2, fx1:fx2]
+    blended = region.astype(np.float32) * 0.35
+    mx, my = lx + pad - fx1, ly + pad - fy1
+    sx1, sy1 = max(mx, 0), max(my, 0)
+    sx2, sy2 = min(mx + mask.shape[1], blended.shape[1]), min(my + mask.shape[0], blended.shape[0])
+    if sx2 > sx1 and sy2 > sy1:
+        alpha = mask[sy1 - my:sy2 - my, sx1 - mx:sx2 - mx, None]
+        target = blended[sy1:sy2, sx1:sx2]
+        target *= 1 - alpha
+        target += alpha * np.asarray(color, dtype=np.float32)
+    region[:] = blended.astype(np.uint8)
+
+    if conf_text:
+        cv2.putText(frame, conf_text, (lx + mask.shape[1] + 2 * pad, ly + pad + mask.shape[0] * 3 // 4),
+                    cv2.FONT_HERSHEY_SIMPLEX, glyphs.height / 40, color, 1, cv2.LINE_AA)
+
+
+class AnnotationWriter:
+    def __init__(self, output_dir, glyphs, output_format="jpg", fps=25.0, jpeg_quality=90, max_queue=64,
+                 block=False):
+        """
+        Optional output stage that draws readings on frames and writes them on a background thread.
+
+        Args:
+            output_dir (str): Directory receiving the annotated frames or videos.
+            glyphs (GlyphCache): Label glyphs.
+            output_format (str): "jpg" writes output_dir/<stream>/<name>.jpg per frame, "video" writes
+                                 output_dir/<stream>.mp4 per stream (default is "jpg").
+            fps (float): Frame rate of the videos (default is 25).
+            jpeg_quality (int): JPEG quality of the frames (default is 90).
+            max_queue (int): Frames waiting for the writer (default is 64).
+            block (bool): Wait for room when the queue is full. By default the frame is dropped and counted
+                          instead, so a slow disk never stalls inference.
+
+        Submitted frames are drawn on a copy, so read-only frames (e.g. image pack views) are fine, but they must
+        not be modified by the caller afterwards. Use it as a context manager, or call close, to flush the queue
+        and finish the videos.
+        """
+
+        if output_format not in ("jpg", "video"):
+            raise ValueError(f"Unknown output format {output_format!r}, expected 'jpg' or 'video'")
+
+        self.output_dir = output_dir
+        self.glyphs = glyphs
+        self.output_format = output_format
+        self.fps = fps
+        self.jpeg_params = [cv2.IMWRITE_JPEG_QUALITY, jpeg_quality]
+        self.block = block
+        self.written = 0
+        self.dropped = 0
+        self.render_seconds = 0.0
+        self.encode_seconds = 0.0
+        self.videos = {}
+        self.frame_counts = {}
+        self._queue = queue.Queue(maxsize=max_queue)
+        os.makedirs(output_dir, exist_ok=True)
+        self._thread = threading.Thread(target=self._writer, name="annotation-writer", daemon=True)
+        self._thread.start()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+        return False
+
+    def submit(self, frame, readings, name=None, stream="annotated"):
+        """
+        Queues a frame for annotation, without waiting for the drawing or the encoding.
+
+        Args:
+            frame (numpy.ndarray): BGR frame.
+            readings (list): PlateReading objects or detect_character outputs to draw on the frame.
+            name (str): File name of the frame in jpg mode, the stream's frame counter by default.
+            stream (str): Stream the frame belongs to, e.g. the source name of a StreamScheduler.
+
+        Returns:
+            bool: False when the frame was dropped because the queue was full.
+        """
+
+        try:
+            self._queue.put((frame, readings, name, stream), block=self.block)
+            return True
+        except queue.Full:
+            self.dropped += 1
+            return False
+
+    def _writer(self):
+        while True:
+            item = self._queue.get()
+            if item is None:
+                break
+            try:
+                self.write(*item)
+            except Exception as e:
+                print(f"Error in AnnotationWriter: {str(e)}")
+
+    def write(self, frame, readings, name=None, stream="annotated"):
+        """
+        Draws and writes one frame on the calling thread, the work submit hands to the writer thread.
+        """
+
+        start_time = time.perf_counter()
+        frame = np.array(frame, dtype=np.uint8, copy=True)
+        for reading in readings:
+            draw_reading(frame, as_reading(reading), self.glyphs)
+        rendered = time.perf_counter()
+
+        index = self.frame_counts.get(stream, 0)
+        self.frame_counts[stream] = index + 1
+        if self.output_format == "video":
+            video = self.videos.get(stream)
+            if video is None:
+                path = os.path.join(self.output_dir, f"{stream}.mp4")
+                video = self.videos[stream] = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*"mp4v"), self.fps,
+                                                              (frame.shape[1], frame.shape[0]))
+            video.write(frame)
+        else:
+            folder = os.path.join(self.output_dir, stream)
+            if index == 0:
+                os.makedirs(folder, exist_ok=True)
+            base = f"{index:08d}" if name is None else os.path.splitext(os.path.basename(str(name)))[0]
+            cv2.imwrite(os.path.join(folder, base + ".jpg"), frame, self.jpeg_params)
+
+        self.render_seconds += rendered - start_time
+        self.encode_seconds += time.perf_counter() - rendered
+        self.written += 1
+
+    def close(self):
+        """
+        Waits until every queued frame is written, then finishes the videos.
+        """
+
+        if self._thread.is_alive():
+            self._queue.put(None)
+            self._thread.join()
+        for video in self.videos.values():
+            video.release()
+        self.videos = {}
+
+    def report(self):
+        """
+        Returns:
+            dict: Frames written and dropped, and the mean drawing and encoding time per written frame in
+                  milliseconds.
+        """
+
+        written = max(self.written, 1)
+        return {
+            "written": self.written,
+            "dropped": self.dropped,
+            "render_ms_per_frame": 1000 * self.render_seconds / written,
+            "encode_ms_per_frame": 1000 * self.encode_seconds / written,
+        }
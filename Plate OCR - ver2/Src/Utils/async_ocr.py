@@ -0,0 +1,223 @@
+import asyncio
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import cv2
+import numpy as np
+
+
+NOT_DETECTED = ([None, None, None, "-", None], None, False)
+
+
+def decode_image(image):
+    """
+    Args:
+        image (str, bytes or numpy.ndarray): File path, encoded image bytes or an already decoded BGR image.
+
+    Returns:
+        numpy.ndarray: The decoded BGR image.
+    """
+
+    if isinstance(image, np.ndarray):
+        return image
+    if isinstance(image, (str, os.PathLike)):
+        with open(image, "rb") as file:
+            image = file.read()
+    img = cv2.imdecode(np.frombuffer(image, dtype=np.uint8), cv2.IMREAD_COLOR)
+    if img is None:
+        raise ValueError("The provided data is not a decodable image.")
+    return img
+
+
+class AsyncOCRModel:
+    def __init__(self, ocr_model, max_batch=8, max_wait=0.005, inference_workers=1, decode_workers=2):
+        """
+        Asyncio front end of an OCRModel. Inference runs on a dedicated executor and never blocks the event loop.
+
+        Args:
+            ocr_model (OCRModel): Model used through its detect_character_batch and read_plates methods.
+            max_batch (int): Maximum number of requests coalesced into one inference call (default is 8).
+            max_wait (float): Seconds a batch waits for more requests once its first request arrived (default is
+                              0.005). Requests that arrive while every inference worker is busy join the next batch
+                              without waiting.
+            inference_workers (int): Threads running batches at the same time (default is 1). The model keeps one
+                                     inference context per thread, so more than one worker can overlap batches on
+                                     a GPU or on a CPU with spare cores.
+            decode_workers (int): Threads reading and decoding images passed as paths or bytes (default is 2).
+
+        The model's event loop tasks are created on the first request, on the running loop. Use it as an async
+        context manager, or call close, to stop them and the executors.
+        """
+
+        self.ocr_model = ocr_model
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+        self.inference_workers = inference_workers
+        self.inference_executor = ThreadPoolExecutor(max_workers=inference_workers, thread_name_prefix="ocr-inference")
+        self.decode_executor = ThreadPoolExecutor(max_workers=decode_workers, thread_name_prefix="ocr-decode")
+        self.batches = 0
+        self.requests = 0
+        self.expired = 0
+        self._queue = None
+        self._batcher = None
+        self._running = set()
+        self._slots = None
+        self._closed = False
+
+    async def __aenter__(self):
+        self._start()
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.close()
+        return False
+
+    def _start(self):
+        if self._batcher is None:
+            self._queue = asyncio.Queue()
+            self._slots = asyncio.Semaphore(self.inference_workers)
+            self._batcher = asyncio.get_running_loop().create_task(self._batch_loop())
+
+    async def close(self):
+        """
+        Stops the batcher, cancels the requests still queued or being collected into a batch and shuts the
+        executors down. Batches already running on the inference executor are finished first. Requests made after
+        close raise RuntimeError.
+        """
+
+        self._closed = True
+        if self._batcher is not None:
+            self._batcher.cancel()
+            try:
+                await self._batcher
+            except asyncio.CancelledError:
+                pass
+            if self._running:
+                await asyncio.gather(*self._running, return_exceptions=True)
+            while not self._queue.empty():
+                self._queue.get_nowait()[3].cancel()
+            self._batcher = None
+        self.inference_executor.shutdown(wait=True)
+        self.decode_executor.shutdown(wait=True)
+
+    async def load_image(self, image):
+        """
+        Reads and decodes an image on the decode executor.
+
+        Args:
+            image (str, bytes or numpy.ndarray): File path, encoded image bytes or a decoded BGR image.
+
+        Returns:
+            numpy.ndarray: The decoded BGR image.
+        """
+
+        if isinstance(image, np.ndarray):
+            return image
+        return await asyncio.get_running_loop().run_in_executor(self.decode_executor, decode_image, image)
+
+    async def detect_character(self, image, roi=None, timeout=None):
+        """
+        Asynchronous counterpart of OCRModel.detect_character.
+
+        Args:
+            image (str, bytes or numpy.ndarray): File path, encoded image bytes or a decoded BGR image.
+            roi (tuple): Optional (x1, y1, x2, y2) search area for plate detection.
+            timeout (float): Optional seconds to wait for the result, decoding included. asyncio.TimeoutError is
+                             raised when it expires.
+
+        Cancelling the awaiting task (or a timeout) withdraws a request that is still queued. A request already
+        in a running batch is computed, and its result dropped.
+
+        Returns:
+            tuple: (detection_list, median_conf, detected_car), as detect_character.
+        """
+
+        return await self._submit("detect_character", image, roi, timeout)
+
+    async def read_plate(self, image, roi=None, timeout=None):
+        """
+        Asynchronous counterpart of OCRModel.read_plate, same arguments as detect_character.
+
+        Returns:
+            PlateReading: The reading of the most confident plate in the image.
+        """
+
+        return await self._submit("read_plate", image, roi, timeout)
+
+    async def _submit(self, method, image, roi, timeout):
+        if self._closed:
+            raise RuntimeError("AsyncOCRModel is closed")
+        self._start()
+        return await asyncio.wait_for(self._request(method, image, roi), timeout)
+
+    async def _request(self, method, image, roi):
+        img = await self.load_image(image)
+        if self._closed:
+            # Closed while the image was decoded, the batcher is gone
+            raise RuntimeError("AsyncOCRModel is closed")
+        future = asyncio.get_running_loop().create_future()
+        self._queue.put_nowait((method, img, roi, future))
+        self.requests += 1
+        return await future
+
+    async def _batch_loop(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            # A batch is only collected when a worker can take it, so requests pile up while all workers are busy
+            await self._slots.acquire()
+            batch = []
+            try:
+                batch.append(await self._queue.get())
+                deadline = loop.time() + self.max_wait
+                while len(batch) < self.max_batch:
+                    if not self._queue.empty():
+                        batch.append(self._queue.get_nowait())
+                        continue
+                    remaining = deadline - loop.time()
+                    if remaining <= 0:
+                        break
+                    try:
+                        batch.append(await asyncio.wait_for(self._queue.get(), remaining))
+                    except asyncio.TimeoutError:
+                        break
+            except BaseException:
+                # Requests already taken off the queue are neither queued nor running, they would never resolve
+                for *_, future in batch:
+                    future.cancel()
+                self._slots.release()
+                raise
+
+            task = loop.create_task(self._run_batch(batch))
+            self._running.add(task)
+            task.add_done_callback(self._running.discard)
+
+    async def _run_batch(self, batch):
+        loop = asyncio.get_running_loop()
+        try:
+            # Cancelled or timed out requests never reach the model
+            live = [item for item in batch if not item[3].done()]
+            self.expired += len(batch) - len(live)
+            for method, call in (("detect_character", self._detect_batch), ("read_plate", self.ocr_model.read_plates)):
+                items = [item for item in live if item[0] == method]
+                if not items:
+                    continue
+                self.batches += 1
+                try:
+                    outputs = await loop.run_in_executor(self.inference_executor, call,
+                                                         [img for _, img, _, _ in items], [roi for _, _, roi, _ in items])
+                except Exception as e:
+                    for *_, future in items:
+                        if not future.done():
+                            future.set_exception(e)
+                    continue
+                for (*_, future), output in zip(items, outputs):
+                    if not future.done():
+                        future.set_result(output)
+        finally:
+            self._slots.release()
+
+    def _detect_batch(self, imgs, rois):
+        # detect_character_batch prints and returns None on an unexpected error, every request gets NOT_DETECTED
+        # like the plates the batch did not find
+        outputs = self.ocr_model.detect_character_batch(imgs, rois)
+        return outputs if outputs is not None else [NOT_DETECTED] * len(imgs)
@@ -0,0 +1,85 @@
+import time
+import threading
+import numpy as np
+
+
+def assign_buckets(sizes, buckets):
+    """
+    Assign every crop to the smallest resolution bucket that covers its native size.
+
+    Args:
+        sizes (array-like): Native size of each crop, i.e. its longest side in pixels.
+        buckets (tuple): Sorted square input sizes, e.g. (160, 224, 320).
+
+    Crops larger than the biggest bucket go to the biggest bucket.
+
+    Returns:
+        numpy.ndarray: Index into buckets for every crop.
+    """
+
+    buckets = np.asarray(buckets)
+    return np.minimum(np.searchsorted(buckets, np.asarray(sizes), side="left"), len(buckets) - 1)
+
+
+class BucketStats:
+    """
+    Distribution and latency of the character stage per resolution bucket.
+    """
+
+    def __init__(self, buckets):
+        self.buckets = tuple(buckets)
+        # Timers of concurrent callers book into the same arrays
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        self.plates = np.zeros(len(self.buckets), dtype=np.int64)
+        self.calls = np.zeros(len(self.buckets), dtype=np.int64)
+        self.seconds = np.zeros(len(self.buckets), dtype=np.float64)
+
+    def timer(self, bucket_index, num_plates):
+        """
+        Returns:
+            _BucketTimer: Context manager that books the elapsed time of one batched call on a bucket.
+        """
+
+        return _BucketTimer(self, bucket_index, num_plates)
+
+    def report(self):
+        """
+        Returns:
+            dict: For every bucket size the number and share of plates, number of batched calls,
+                  mean latency per call and per plate in milliseconds.
+        """
+
+        total = max(int(self.plates.sum()), 1)
+        report = {}
+        for i, size in enumerate(self.buckets):
+            plates, calls, seconds = int(self.plates[i]), int(self.calls[i]), float(self.seconds[i])
+            report[size] = {
+                "plates": plates,
+                "share": plates / total,
+                "calls": calls,
+                "ms_per_call": 1000 * seconds / calls if calls else 0.0,
+                "ms_per_plate": 1000 * seconds / plates if plates else 0.0,
+            }
+        return report
+
+
+class _BucketTimer:
+    def __init__(self, stats, bucket_index, num_plates):
+        self.stats = stats
+        self.bucket_index = bucket_index
+        self.num_plates = num_plates
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        elapsed = time.perf_counter() - self.start
+        with self.stats.lock:
+            self.stats.seconds[self.bucket_index] += elapsed
+            self.stats.calls[self.bucket_index] += 1
+            self.stats.plates[self.bucket_index] += self.num_plates
+        return False
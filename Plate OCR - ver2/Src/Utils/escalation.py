@@ -0,0 +1,89 @@
+import threading
+
+
+def has_wildcard(detection_list):
+    """
+    Returns:
+        bool: True when handle_missed_character filled a position of the detection_list with '*'.
+    """
+
+    return any("*" in str(part) for part in detection_list if part is not None)
+
+
+def needs_escalation(median_conf, wildcard, threshold):
+    """
+    Decides whether a first pass reading is read again at the escalation resolution.
+
+    Args:
+        median_conf (float or None): Median character confidence of the reading, None when nothing was read.
+        wildcard (bool): The reading has '*' positions.
+        threshold (float): Readings with a median confidence below this escalate.
+
+    Returns:
+        bool: True for unread, incomplete or low confidence readings.
+    """
+
+    return wildcard or median_conf is None or median_conf < threshold
+
+
+def prefer_second(first, second):
+    """
+    Compares the (median_conf, wildcard) of a first pass reading and of its escalated reading.
+
+    A complete reading beats one with '*' positions, otherwise the higher median confidence wins.
+
+    Returns:
+        bool: True when the escalated reading is kept.
+    """
+
+    (first_conf, first_wildcard), (second_conf, second_wildcard) = first, second
+    if first_wildcard != second_wildcard:
+        return first_wildcard
+    if second_conf is None:
+        return False
+    return first_conf is None or second_conf > first_conf
+
+
+class EscalationStats:
+    """
+    Escalation rate and latency of the adaptive character stage.
+    """
+
+    def __init__(self):
+        # Concurrent callers book into the same counters
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        self.plates = 0
+        self.escalated = 0
+        self.replaced = 0
+        self.first_seconds = 0.0
+        self.second_seconds = 0.0
+
+    def book(self, plates, escalated, replaced, first_seconds, second_seconds):
+        with self.lock:
+            self.plates += plates
+            self.escalated += escalated
+            self.replaced += replaced
+            self.first_seconds += first_seconds
+            self.second_seconds += second_seconds
+
+    def report(self):
+        """
+        Returns:
+            dict: Number of plates, escalation rate, share of escalated readings that were replaced by the second
+                  pass, first pass and second pass latency per plate read at that pass, and the blended latency per
+                  plate of the whole character stage, in milliseconds.
+        """
+
+        plates = max(self.plates, 1)
+        return {
+            "plates": self.plates,
+            "escalated": self.escalated,
+            "escalation_rate": self.escalated / plates,
+            "replaced_rate": self.replaced / self.escalated if self.escalated else 0.0,
+            "first_ms_per_plate": 1000 * self.first_seconds / plates,
+            "second_ms_per_plate": 1000 * self.second_seconds / self.escalated if self.escalated else 0.0,
+            "blended_ms_per_plate": 1000 * (self.first_seconds + self.second_seconds) / plates,
+        }
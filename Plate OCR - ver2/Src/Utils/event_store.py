@@ -0,0 +1,313 @@
+import time
+import numpy as np
+
+from ocrPlate.Src.Utils.plate_reading import NUM_CHARS, NUM_CLASSES, WILDCARD_ID, PLATE_DETECTED, HAS_WILDCARD, \
+    PlateReading, decode_ids, encode_plate
+
+
+_POSITIONS = np.arange(NUM_CHARS)
+
+
+class PlateEvent:
+    """
+    One vehicle pass: all readings of the same plate on one source, consolidated.
+
+    Attributes:
+        source (str): Name of the source the readings came from.
+        ids (numpy.ndarray): Consensus class ids, the confidence-weighted vote of every reading per position.
+        reading (PlateReading): The highest-confidence reading of the pass.
+        confidence (float): Median confidence of that reading.
+        frame (numpy.ndarray or None): The frame of that reading, when frames are given to the store.
+        first_seen (float): Timestamp of the first reading.
+        last_seen (float): Timestamp of the last reading.
+        count (int): Number of readings merged into the event.
+        evicted (bool): True when the event was closed early because the store was full.
+    """
+
+    __slots__ = ("source", "ids", "reading", "confidence", "frame", "first_seen", "last_seen", "count", "evicted",
+                 "_votes", "_aliases", "_bucket")
+
+    def __init__(self, source, reading, confidence, frame, timestamp):
+        self.source = source
+        self.reading = reading
+        self.confidence = confidence
+        self.frame = frame
+        self.first_seen = timestamp
+        self.last_seen = timestamp
+        self.count = 0
+        self.evicted = False
+        # The extra column stands for '*' and never receives votes, so any known character outvotes it
+        self._votes = np.zeros((NUM_CHARS, NUM_CLASSES + 1), dtype=np.float32)
+        self._aliases = set()
+        self._bucket = None
+        self.ids = np.full(NUM_CHARS, WILDCARD_ID, dtype=np.uint8)
+
+    def _vote(self, reading):
+        # Only the voted column can overtake the current consensus, so the argmax is updated incrementally
+        columns = np.minimum(reading.ids, NUM_CLASSES)
+        self._votes[_POSITIONS, columns] += np.where(columns < NUM_CLASSES, np.maximum(reading.confs, 1e-3), 0)
+        current = np.minimum(self.ids, NUM_CLASSES)
+        better = self._votes[_POSITIONS, columns] > self._votes[_POSITIONS, current]
+        self.count += 1
+        if not better.any():
+            return False
+        self.ids = np.where(better, reading.ids, self.ids)
+        return True
+
+    def text(self, persian=False):
+        return "".join(decode_ids(self.ids, persian))
+
+    def to_dict(self):
+        return {
+            "source": self.source,
+            "plate": self.text(),
+            "ids": self.ids.tolist(),
+            "confidence": self.confidence,
+            "first_seen": self.first_seen,
+            "last_seen": self.last_seen,
+            "count": self.count,
+            "evicted": self.evicted,
+            "reading": self.reading.to_dict(),
+        }
+
+    def __repr__(self):
+        return (f"PlateEvent({self.source!r}, {self.text()!r}, count={self.count}, "
+                f"confidence={self.confidence:.3f}, {self.first_seen:.2f}-{self.last_seen:.2f})")
+
+
+class _SourceState:
+    def __init__(self):
+        self.exact = {}
+        self.events = []
+        self.matrix = np.empty((0, NUM_CHARS), dtype=np.uint8)
+        self.dirty = False
+
+    def candidates(self):
+        if self.dirty:
+            self.matrix = (np.stack([event.ids for event in self.events]) if self.events
+                           else np.empty((0, NUM_CHARS), dtype=np.uint8))
+            self.dirty = False
+        return self.matrix
+
+
+class PlateEventStore:
+    def __init__(self, ttl: float = 3.0, bucket_seconds: float = 0.5, max_entries: int = 10000,
+                 min_conf: float = 0.0, copy_frames: bool = True):
+        """
+        In-process store that collapses the repeated readings of a plate into one event per vehicle pass.
+
+        Args:
+            ttl (float): A pass ends when its plate hasn't been read on the source for this many seconds (default is 3).
+            bucket_seconds (float): Granularity of the eviction buckets (default is 0.5).
+            max_entries (int): Maximum number of open passes over all sources. When exceeded, the passes seen
+                               longest ago are closed early (default is 10000).
+            min_conf (float): Readings with a lower median confidence are ignored (default is 0).
+            copy_frames (bool): Copy the best frame of a pass instead of keeping a reference to the caller's
+                                buffer (default is True).
+
+        Two readings of a source belong to the same pass when they are equal on every position that neither
+        of them reads as '*'. Open passes are kept in time buckets of bucket_seconds keyed on their last reading,
+        so expiring them only touches whole buckets and the memory is bounded by max_entries passes (and frames).
+        """
+
+        self.ttl = ttl
+        self.bucket_seconds = bucket_seconds
+        self.max_entries = max_entries
+        self.min_conf = min_conf
+        self.copy_frames = copy_frames
+
+        self.sources = {}
+        self.buckets = {}
+        self._cutoff = None
+        self.size = 0
+        self.readings = 0
+        self.ignored = 0
+        self.unencodable = 0
+        self.emitted = 0
+        self.evicted = 0
+
+    def _as_reading(self, reading, confidence):
+        """
+        Accept a PlateReading or the legacy (detection_list, median_conf) output of detect_character.
+
+        Detection lists that can't be encoded are counted as unencodable, apart from the ignored readings, and
+        the first one is printed.
+        """
+
+        if isinstance(reading, PlateReading):
+            return reading if reading.legible else None
+        if not reading or reading[0] is None:
+            return None
+        try:
+            ids = encode_plate("".join(str(part) for part in reading))
+        except ValueError as e:
+            self.unencodable += 1
+            if self.unencodable == 1:
+                print(f"Error in PlateEventStore: {str(e)}, further unencodable readings are only counted")
+            return None
+        known = ids != WILDCARD_ID
+        confs = np.where(known, 0.0 if confidence is None else confidence, 0.0)
+        return PlateReading(ids, confs, flags=PLATE_DETECTED if known.all() else PLATE_DETECTED | HAS_WILDCARD)
+
+    def _bucket_of(self, timestamp):
+        return int(timestamp // self.bucket_seconds)
+
+    def _move(self, event, timestamp):
+        bucket = self._bucket_of(timestamp)
+        if bucket == event._bucket:
+            return
+        if event._bucket is not None:
+            old = self.buckets[event._bucket]
+            del old[id(event)]
+            if not old:
+                del self.buckets[event._bucket]
+        self.buckets.setdefault(bucket, {})[id(event)] = event
+        event._bucket = bucket
+
+    def _match(self, state, ids):
+        event = state.exact.get(ids.tobytes())
+        if event is not None:
+            return event
+
+        matrix = state.candidates()
+        if len(matrix) == 0:
+            return None
+        agree = (matrix == ids) | (matrix == WILDCARD_ID) | (ids == WILDCARD_ID)
+        matches = np.flatnonzero(agree.all(axis=1))
+        if len(matches) == 0:
+            return None
+        # Prefer the pass that agrees on the most known positions, then the most recent one
+        known = ((matrix[matches] == ids) & (ids != WILDCARD_ID)).sum(axis=1)
+        best = max(range(len(matches)), key=lambda i: (known[i], state.events[matches[i]].last_seen))
+        return state.events[matches[best]]
+
+    def add(self, source, reading, timestamp=None, frame=None, confidence=None):
+        """
+        Method to add one reading.
+
+        Args:
+            source (str): Name of the source.
+            reading (PlateReading or list): A PlateReading or the detection_list of detect_character.
+            timestamp (float): Capture time in seconds (default is time.monotonic()). Expected to be roughly
+                               increasing, passes are closed relative to the latest timestamp seen.
+            frame (numpy.ndarray): Optional frame the reading came from, kept for the best reading of the pass.
+            confidence (float): Median confidence, only used with a detection_list.
+
+        Returns:
+            list: The PlateEvents closed by this call, usually empty.
+        """
+
+        timestamp = time.monotonic() if timestamp is None else timestamp
+        self.readings += 1
+        closed = self.expire(timestamp)
+
+        unencodable = self.unencodable
+        reading = self._as_reading(reading, confidence)
+        conf = None if reading is None else reading.median_conf
+        if reading is None or conf is None or conf < self.min_conf:
+            if self.unencodable == unencodable:
+                self.ignored += 1
+            return closed
+
+        state = self.sources.get(source)
+        if state is None:
+            state = self.sources[source] = _SourceState()
+
+        event = self._match(state, reading.ids)
+        if event is None:
+            if self.size >= self.max_entries:
+                closed.extend(self._evict_oldest())
+            event = PlateEvent(source, reading, conf, self._keep(frame), timestamp)
+            state.events.append(event)
+            state.dirty = True
+            self.size += 1
+        elif conf > event.confidence:
+            event.reading, event.confidence, event.frame = reading, conf, self._keep(frame)
+
+        key = reading.ids.tobytes()
+        if key not in event._aliases:
+            event._aliases.add(key)
+            state.exact[key] = event
+        if event._vote(reading):
+            state.dirty = True
+        event.last_seen = max(event.last_seen, timestamp)
+        self._move(event, event.last_seen)
+        return closed
+
+    def _keep(self, frame):
+        if frame is None or not self.copy_frames:
+            return frame
+        return frame.copy()
+
+    def _close(self, event):
+        state = self.sources[event.source]
+        state.events.remove(event)
+        state.dirty = True
+        for key in event._aliases:
+            if state.exact.get(key) is event:
+                del state.exact[key]
+        event._aliases = set()
+        self.size -= 1
+        self.emitted += 1
+        return event
+
+    def expire(self, now=None):
+        """
+        Method to close every pass whose last reading is older than ttl.
+
+        Returns:
+            list: The closed PlateEvents, oldest first.
+        """
+
+        now = time.monotonic() if now is None else now
+        # Every pass in a bucket below the cutoff was last read more than ttl ago
+        cutoff = self._bucket_of(now - self.ttl)
+        closed = []
+        if cutoff == self._cutoff:
+            return closed
+        self._cutoff = cutoff
+        for bucket in sorted(b for b in self.buckets if b < cutoff):
+            events = self.buckets.pop(bucket)
+            closed.extend(self._close(event) for event in sorted(events.values(), key=lambda e: e.first_seen))
+        return closed
+
+    def _evict_oldest(self):
+        bucket = min(self.buckets)
+        events = self.buckets.pop(bucket)
+        for event in events.values():
+            event.evicted = True
+        self.evicted += len(events)
+        return [self._close(event) for event in sorted(events.values(), key=lambda e: e.first_seen)]
+
+    def flush(self):
+        """
+        Method to close every open pass, e.g. when the streams end.
+
+        Returns:
+            list: The closed PlateEvents, oldest first.
+        """
+
+        closed = []
+        for bucket in sorted(self.buckets):
+            events = self.buckets.pop(bucket)
+            closed.extend(self._close(event) for event in sorted(events.values(), key=lambda e: e.first_seen))
+        return closed
+
+    def __len__(self):
+        return self.size
+
+    def stats(self):
+        """
+        Returns:
+            dict: Readings seen, ignored, unencodable, events emitted and evicted early, and currently open passes.
+        """
+
+        return {
+            "readings": self.readings,
+            "ignored": self.ignored,
+            "unencodable": self.unencodable,
+            "emitted": self.emitted,
+            "evicted": self.evicted,
+            "open": self.size,
+            "buckets": len(self.buckets),
+        }
@@ -0,0 +1,49 @@
+import numpy as np
+
+from ocrPlate.Src.Utils.plate_reading import ID_TO_PERSIAN_NAME, NUM_CLASSES
+
+
+# Text drawn for every class: Persian digits, and the letters of id_to_persian_name. The disabled veterans class is
+# drawn as its letter.
+GLYPH_TEXT = {key: chr(0x06F0 + key) if key < 10 else str(name) for key, name in ID_TO_PERSIAN_NAME.items()
+              if key < NUM_CLASSES}
+GLYPH_TEXT[28] = "ژ"
+
+
+def load_font(font_path, size):
+    """
+    Args:
+        font_path (str): TrueType font with Persian glyphs, e.g. Vazirmatn or B Traffic.
+        size (int): Font size in pixels.
+
+    Pillow is imported here, so that modules using the glyphs only load it when they draw text. Multi-letter
+    names ("الف") are shaped only when Pillow is built with libraqm.
+
+    Returns:
+        PIL.ImageFont.FreeTypeFont: The font.
+    """
+
+    from PIL import ImageFont
+
+    return ImageFont.truetype(font_path, size)
+
+
+def rasterise(text, font):
+    """
+    Returns:
+        numpy.ndarray: float32 ink coverage (0 to 1) of text, trimmed to its ink.
+
+    Raises:
+        ValueError: If the font draws no ink for the text.
+    """
+
+    from PIL import Image, ImageDraw
+
+    left, top, right, bottom = font.getbbox(text)
+    canvas = Image.new("L", (right - left + 8, bottom - top + 8), 0)
+    ImageDraw.Draw(canvas).text((4 - left, 4 - top), text, fill=255, font=font)
+    ink = np.asarray(canvas, dtype=np.float32) / 255
+    rows, cols = np.flatnonzero(ink.max(axis=1) > 0), np.flatnonzero(ink.max(axis=0) > 0)
+    if len(rows) == 0:
+        raise ValueError(f"The font has no glyph for {text!r}")
+    return ink[rows[0]:rows[-1] + 1, cols[0]:cols[-1] + 1]
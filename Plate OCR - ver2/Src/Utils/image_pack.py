@@ -0,0 +1,202 @@
+import os
+import sys
+import glob
+import json
+import struct
+import argparse
+import cv2
+import numpy as np
+
+
+MAGIC = b"IMGPACK1"
+HEADER = struct.Struct("<8sQQ")
+ALIGNMENT = 64
+PACK_EXTENSION = ".pack"
+IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png", ".bmp", ".tif", ".tiff", ".webp")
+
+
+def fit_max_side(img, max_side):
+    """
+    Returns:
+        numpy.ndarray: img shrunk (INTER_AREA) so that its longest side is at most max_side, or img itself.
+    """
+
+    h, w = img.shape[:2]
+    scale = max_side / max(h, w)
+    if scale >= 1:
+        return img
+    return cv2.resize(img, (max(1, round(w * scale)), max(1, round(h * scale))), interpolation=cv2.INTER_AREA)
+
+
+class PackWriter:
+    def __init__(self, pack_path, max_side=None):
+        """
+        Streams decoded images into a pack file, see pack_images for the layout.
+
+        Args:
+            pack_path (str): Output file, written as pack_path.tmp and renamed into place by close.
+            max_side (int): Optional longest side the images are shrunk to (default is None).
+        """
+
+        self.pack_path = pack_path
+        self.max_side = max_side
+        self.index = []
+        self.file = open(pack_path + ".tmp", "wb")
+        self.file.write(HEADER.pack(MAGIC, 0, 0))
+
+    def add(self, name, img):
+        """
+        Appends one uint8 image under name.
+        """
+
+        original_shape = img.shape
+        if self.max_side:
+            img = fit_max_side(img, self.max_side)
+
+        offset = self.file.tell()
+        padding = -offset % ALIGNMENT
+        self.file.write(b"\0" * padding)
+        offset += padding
+        self.file.write(np.ascontiguousarray(img).tobytes())
+        self.index.append({"name": name, "offset": offset, "shape": list(img.shape),
+                           "original_shape": list(original_shape)})
+
+    def close(self):
+        """
+        Writes the index and the header, and renames the pack into place.
+
+        Returns:
+            int: Number of packed images.
+        """
+
+        index_offset = self.file.tell()
+        index_bytes = json.dumps({"images": self.index, "max_side": self.max_side}, ensure_ascii=False).encode("utf-8")
+        self.file.write(index_bytes)
+        self.file.seek(0)
+        self.file.write(HEADER.pack(MAGIC, index_offset, len(index_bytes)))
+        self.file.close()
+        os.replace(self.pack_path + ".tmp", self.pack_path)
+        return len(self.index)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, *exc):
+        if exc_type is None:
+            self.close()
+        else:
+            self.file.close()
+        return False
+
+
+def pack_images(img_paths, pack_path, max_side=None, names=None):
+    """
+    Decodes images once into a single pack file.
+
+    Args:
+        img_paths (list): Image files to decode with cv2.imread. Unreadable files are skipped.
+        pack_path (str): Output file.
+        max_side (int): Optional longest side, e.g. max(plate_imgsz), the images are pre-resized to (default is None).
+        names (list): Optional key per image (default is the file name).
+
+    Layout: a 24 byte header (magic, index offset, index length), the raw uint8 pixels of every image aligned to
+    64 bytes, then a json index of {name, offset, shape, original_shape}.
+
+    Returns:
+        int: Number of packed images.
+    """
+
+    names = [os.path.basename(p) for p in img_paths] if names is None else list(names)
+    with PackWriter(pack_path, max_side) as writer:
+        for img_path, name in zip(img_paths, names):
+            img = cv2.imread(img_path, cv2.IMREAD_COLOR)
+            if img is None:
+                print(f"Skipping {img_path}: not a decodable image")
+                continue
+            writer.add(name, img)
+    return len(writer.index)
+
+
+class ImagePack:
+    def __init__(self, pack_path):
+        """
+        Read-only, memory-mapped view of a pack written by pack_images.
+
+        Args:
+            pack_path (str): Pack file.
+
+        Images are returned as read-only numpy views of the mapping: nothing is decoded or copied, and the pages
+        are shared by every process reading the same pack.
+        """
+
+        with open(pack_path, "rb") as file:
+            magic, index_offset, index_length = HEADER.unpack(file.read(HEADER.size))
+            if magic != MAGIC:
+                raise ValueError(f"{pack_path} is not an image pack.")
+            file.seek(index_offset)
+            index = json.loads(file.read(index_length).decode("utf-8"))
+
+        self.path = pack_path
+        self.max_side = index.get("max_side")
+        self.entries = index["images"]
+        self.names = [entry["name"] for entry in self.entries]
+        self.positions = {name: i for i, name in enumerate(self.names)}
+        self.data = np.memmap(pack_path, dtype=np.uint8, mode="r")
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __getitem__(self, key):
+        """
+        Args:
+            key (int or str): Position or name of the image.
+
+        Returns:
+            numpy.ndarray: Read-only uint8 view of the decoded image.
+        """
+
+        entry = self.entries[self.positions[key] if isinstance(key, str) else key]
+        shape = tuple(entry["shape"])
+        size = int(np.prod(shape))
+        return self.data[entry["offset"]:entry["offset"] + size].reshape(shape)
+
+    def __iter__(self):
+        for i, name in enumerate(self.names):
+            yield name, self[i]
+
+
+def is_pack(source):
+    return os.path.isfile(source) and source.lower().endswith(PACK_EXTENSION)
+
+
+def iter_images(source):
+    """
+    Args:
+        source (str): Image pack or directory of images.
+
+    Returns:
+        iterator: (name, image) pairs, read-only views of a pack or the paths of a directory's images, named by file
+                  name in both cases.
+    """
+
+    if is_pack(source):
+        return iter(ImagePack(source))
+    return ((os.path.basename(p), p) for p in sorted(glob.glob(os.path.join(source, "*.*")))
+            if p.lower().endswith(IMAGE_EXTENSIONS))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Pre-decode images into a memory-mapped image pack")
+    parser.add_argument("--input_dir", type=str, help="Directory of images", required=True)
+    parser.add_argument("--output", type=str, help="Pack file to write", required=True)
+    parser.add_argument("--max_side", type=int, default=None, help="Pre-resize so that the longest side is at most this, e.g. 640")
+
+    args = parser.parse_args()
+    img_paths = sorted(p for p in glob.glob(os.path.join(args.input_dir, "*.*")) if p.lower().endswith(IMAGE_EXTENSIONS))
+    count = pack_images(img_paths, args.output, args.max_side)
+    print(f"Packed {count} images into {args.output} ({os.path.getsize(args.output) / 2 ** 20:.1f} MB)")
+    return 0 if count else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
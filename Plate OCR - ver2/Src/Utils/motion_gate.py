@@ -0,0 +1,114 @@
+import cv2
+import numpy as np
+
+
+class MotionGate:
+    def __init__(self,
+                 width: int = 160,
+                 sensitivity: int = 25,
+                 min_area: float = 0.002,
+                 learning_rate: float = 0.05,
+                 blur: int = 5,
+                 padding: float = 0.15):
+        """
+        Cheap motion detector placed in front of plate detection.
+
+        Args:
+            width (int): Width the frame is downsampled to before differencing (default is 160).
+            sensitivity (int): Grey-level difference to the background that counts as motion (default is 25).
+                               Lower values are more sensitive.
+            min_area (float): Minimum moving area as a fraction of the frame for a region to count (default is 0.002).
+            learning_rate (float): Running-average background update rate (default is 0.05).
+            blur (int): Gaussian blur kernel size used to suppress sensor noise (default is 5).
+            padding (float): Relative padding added around motion regions so the whole car is kept (default is 0.15).
+
+        The background is a running average of downsampled grey frames. Frames whose difference to it has no
+        region larger than min_area are reported as static.
+        """
+
+        self.width = width
+        self.sensitivity = sensitivity
+        self.min_area = min_area
+        self.learning_rate = learning_rate
+        self.blur = blur | 1
+        self.padding = padding
+        self.kernel = cv2.getStructuringElement(cv2.MORPH_ELLIPSE, (5, 5))
+        self.reset()
+
+    def reset(self):
+        self.background = None
+        self._small = None
+        self._gray = None
+        self._diff = None
+
+    def _prepare(self, frame):
+        h, w = frame.shape[:2]
+        scale = self.width / float(w)
+        size = (self.width, max(1, int(round(h * scale))))
+
+        # Scratch buffers are reused as long as the stream resolution doesn't change
+        if self._small is None or self._small.shape[:2] != (size[1], size[0]):
+            self._small = np.empty((size[1], size[0]) + frame.shape[2:], dtype=frame.dtype)
+            self._gray = np.empty((size[1], size[0]), dtype=np.uint8)
+            self._diff = np.empty((size[1], size[0]), dtype=np.uint8)
+            self.background = None
+
+        cv2.resize(frame, size, dst=self._small, interpolation=cv2.INTER_AREA)
+        if self._small.ndim == 3:
+            cv2.cvtColor(self._small, cv2.COLOR_BGR2GRAY, dst=self._gray)
+        else:
+            self._gray[...] = self._small
+        cv2.GaussianBlur(self._gray, (self.blur, self.blur), 0, dst=self._gray)
+        return scale
+
+    def update(self, frame):
+        """
+        Method to feed the next frame of the stream.
+
+        Args:
+            frame (numpy.ndarray): Full resolution frame.
+
+        Returns:
+            tuple: (moved, rois) where moved is a boolean and rois is a list of (x1, y1, x2, y2) motion regions
+                   in full resolution coordinates. The first frame of a stream is always reported as moved.
+        """
+
+        h, w = frame.shape[:2]
+        scale = self._prepare(frame)
+
+        if self.background is None:
+            self.background = self._gray.astype(np.float32)
+            return True, [(0, 0, w, h)]
+
+        cv2.absdiff(self._gray, cv2.convertScaleAbs(self.background), dst=self._diff)
+        cv2.accumulateWeighted(self._gray, self.background, self.learning_rate)
+
+        _, mask = cv2.threshold(self._diff, self.sensitivity, 255, cv2.THRESH_BINARY)
+        mask = cv2.dilate(mask, self.kernel, iterations=2)
+        contours, _ = cv2.findContours(mask, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+
+        min_pixels = self.min_area * mask.shape[0] * mask.shape[1]
+        rois = []
+        for contour in contours:
+            if cv2.contourArea(contour) < min_pixels:
+                continue
+            x, y, bw, bh = cv2.boundingRect(contour)
+            pad_x, pad_y = bw * self.padding, bh * self.padding
+            rois.append((max(0, int((x - pad_x) / scale)),
+                         max(0, int((y - pad_y) / scale)),
+                         min(w, int((x + bw + pad_x) / scale)),
+                         min(h, int((y + bh + pad_y) / scale))))
+
+        return len(rois) > 0, rois
+
+    @staticmethod
+    def union(rois):
+        """
+        Returns:
+            tuple or None: The bounding box (x1, y1, x2, y2) of all regions, None for an empty list.
+        """
+
+        if not rois:
+            return None
+        boxes = np.array(rois)
+        return (int(boxes[:, 0].min()), int(boxes[:, 1].min()), int(boxes[:, 2].max()), int(boxes[:, 3].max()))
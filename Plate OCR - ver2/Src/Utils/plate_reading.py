@@ -0,0 +1,302 @@
+import json
+import numpy as np
+
+from ocrPlate.Src.Utils.postprocessing import handle_close_duplicated_char, handle_missed_character
+
+
+NUM_CHARS = 8
+WILDCARD_ID = 255
+PLATE_CLASS_ID = 36
+# Number of character classes, they occupy the ids below PLATE_CLASS_ID
+NUM_CLASSES = 36
+
+ID_TO_NAME = {
+    0: 0, 1: 1, 2: 2, 3: 3, 4: 4, 5: 5, 6: 6, 7: 7, 8: 8, 9: 9,
+    10: "b", 11: "j", 12: "dal", 13: "sin", 14: "sad", 15: "ta", 16: "gh", 17: "l",
+    18: "m", 19: "v", 20: "h", 21: "n", 22: "y", 23: "a", 24: "p", 25: "t", 26: "se",
+    27: "z", 28: "zh", 29: "sh", 30: "ein", 31: "f", 32: "k", 33: "g", 34: "D", 35: "S",
+    36: "plate_area"
+}
+
+ID_TO_PERSIAN_NAME = {
+    0: 0, 1: 1, 2: 2, 3: 3, 4: 4, 5: 5, 6: 6, 7: 7, 8: 8, 9: 9,
+    10: "ب", 11: "ج", 12: "د", 13: "س", 14: "ص", 15: "ط", 16: "ق", 17: "ل",
+    18: "م", 19: "و", 20: "ه", 21: "ن", 22: "ی", 23: "الف", 24: "پ", 25: "ت", 26: "ث",
+    27: "ز", 28: "ژ (معلولین و جانبازان)", 29: "ش", 30: "ع", 31: "ف", 32: "ک", 33: "گ", 34: "D", 35: "S",
+    36: "plate_area"
+}
+
+# Status flags of a PlateReading
+PLATE_DETECTED = 1
+HAS_WILDCARD = 2
+ILLEGIBLE = 4
+
+
+def _build_lut(id_to_name):
+    lut = np.full(256, "?", dtype=object)
+    for key, name in id_to_name.items():
+        lut[key] = str(name)
+    lut[WILDCARD_ID] = "*"
+    return lut
+
+
+# Lookup tables indexed by class id, so decoding a whole (N, 8) id matrix is a single fancy-indexing call
+ENGLISH_LUT = _build_lut(ID_TO_NAME)
+PERSIAN_LUT = _build_lut(ID_TO_PERSIAN_NAME)
+
+# handle_missed_character tells digits from letters by their Python type, so it is fed the raw id_to_name values
+_NAME_LUT = np.array([ID_TO_NAME.get(i, "?") for i in range(256)], dtype=object)
+_NAME_TO_ID = {name: key for key, name in ID_TO_NAME.items()}
+_NAME_TO_ID["*"] = WILDCARD_ID
+
+READING_DTYPE = np.dtype([("ids", "u1", (NUM_CHARS,)),
+                          ("confs", "<f4", (NUM_CHARS,)),
+                          ("box", "<i4", (4,)),
+                          ("flags", "u1")])
+
+
+def decode_ids(ids, persian=False):
+    """
+    Decode class ids into label strings through the precomputed lookup tables.
+
+    Args:
+        ids (numpy.ndarray): uint8 array of any shape, e.g. (8,) for one plate or (N, 8) for many.
+        persian (bool): Decode to Persian labels instead of the English transliteration.
+
+    Returns:
+        numpy.ndarray: object array of strings with the same shape as ids.
+    """
+
+    return (PERSIAN_LUT if persian else ENGLISH_LUT)[np.asarray(ids, dtype=np.uint8)]
+
+
+# Tokens accepted by encode_plate, longest first so that e.g. "sad" wins over "s..." and "الف" over single letters
+_TOKEN_TO_ID = {str(name): key for key, name in list(ID_TO_NAME.items()) + list(ID_TO_PERSIAN_NAME.items())
+                if key != PLATE_CLASS_ID}
+_TOKEN_TO_ID.update({chr(0x06F0 + d): d for d in range(10)})  # Persian digits
+_TOKEN_TO_ID["ژ"] = 28
+_TOKEN_TO_ID["*"] = WILDCARD_ID
+_TOKENS = sorted(_TOKEN_TO_ID, key=len, reverse=True)
+_SEPARATORS = " -|"
+
+
+def encode_plate(text):
+    """
+    Encode a plate string into class ids.
+
+    Args:
+        text (str): Plate written with English labels ("12sin34567"), Persian labels ("12س34567") or a mix,
+                    '*' for unknown positions. Spaces, '-' and '|' are ignored.
+
+    Returns:
+        numpy.ndarray: 8 uint8 class ids.
+
+    Raises:
+        ValueError: If the text contains an unknown token or doesn't encode exactly 8 characters.
+    """
+
+    # Tokens are matched before separators are skipped, so multi-word labels such as "ژ (معلولین و جانبازان)"
+    # keep their spaces
+    ids, i = [], 0
+    while i < len(text):
+        for token in _TOKENS:
+            if text.startswith(token, i):
+                ids.append(_TOKEN_TO_ID[token])
+                i += len(token)
+                break
+        else:
+            if text[i] not in _SEPARATORS:
+                raise ValueError(f"Unknown plate character {text[i]!r} in {text!r}")
+            i += 1
+
+    if len(ids) != NUM_CHARS:
+        raise ValueError(f"A plate has {NUM_CHARS} characters, got {len(ids)} in {text!r}")
+    return np.array(ids, dtype=np.uint8)
+
+
+class PlateReading:
+    """
+    Compact result of reading one plate.
+
+    Attributes:
+        ids (numpy.ndarray): 8 uint8 class ids in plate order, WILDCARD_ID for unknown positions.
+        confs (numpy.ndarray): 8 float32 confidences, 0 for unknown positions.
+        box (numpy.ndarray): int32 plate box (x1, y1, x2, y2) in image coordinates.
+        flags (int): Bitmask of PLATE_DETECTED, HAS_WILDCARD and ILLEGIBLE.
+    """
+
+    __slots__ = ("ids", "confs", "box", "flags")
+
+    def __init__(self, ids=None, confs=None, box=None, flags=0):
+        self.ids = np.full(NUM_CHARS, WILDCARD_ID, dtype=np.uint8) if ids is None else np.asarray(ids, dtype=np.uint8)
+        self.confs = np.zeros(NUM_CHARS, dtype=np.float32) if confs is None else np.asarray(confs, dtype=np.float32)
+        self.box = np.zeros(4, dtype=np.int32) if box is None else np.asarray(box, dtype=np.int32)
+        self.flags = int(flags)
+
+    @classmethod
+    def not_detected(cls):
+        return cls(flags=ILLEGIBLE)
+
+    @classmethod
+    def from_result(cls, result, box=None):
+        """
+        Build a reading from the YOLO character detection result of a single plate crop.
+
+        Args:
+            result (ultralytics.engine.results.Results): Character detection result.
+            box (tuple): Plate box (x1, y1, x2, y2) in the original image.
+
+        Applies the same ordering, duplicate removal and missing-character handling as working_with_results,
+        but keeps class ids and confidences as arrays instead of building strings.
+
+        Returns:
+            PlateReading: The reading, flagged ILLEGIBLE when the characters could not be arranged.
+        """
+
+        preds = result.boxes.cls.detach().cpu().numpy().astype(np.uint8)
+        confs = result.boxes.conf.detach().cpu().numpy().astype(np.float32)
+        xyxy = result.boxes.xyxy.detach().cpu().numpy().astype(int)
+        return cls.from_arrays(xyxy, preds, confs, box)
+
+    @classmethod
+    def from_arrays(cls, xyxy, preds, confs, box=None):
+        """
+        Build a reading from raw character boxes, class ids and confidences (see from_result).
+        """
+
+        flags = PLATE_DETECTED
+        x_coors_arr = xyxy[:, 0] + xyxy[:, 2]
+        x_center_arr = (x_coors_arr / 2).astype(int)
+
+        sorted_indices = np.argsort(x_center_arr)
+        x_center_arr, confs, preds = handle_close_duplicated_char(x_coors_arr[sorted_indices],
+                                                                  x_center_arr[sorted_indices],
+                                                                  confs[sorted_indices],
+                                                                  preds[sorted_indices])
+
+        if len(preds) == NUM_CHARS:
+            return cls(preds, confs, box, flags)
+
+        names = handle_missed_character(x_center_arr, _NAME_LUT[preds]) if len(preds) > 1 else None
+        if names is None or len(names) != NUM_CHARS:
+            return cls(box=box, flags=flags | HAS_WILDCARD | ILLEGIBLE)
+
+        ids = np.fromiter((_NAME_TO_ID[name] for name in names), dtype=np.uint8, count=len(names))
+        known = ids != WILDCARD_ID
+        full_confs = np.zeros(NUM_CHARS, dtype=np.float32)
+        if known.sum() == len(confs):
+            full_confs[known] = confs
+        else:
+            flags |= ILLEGIBLE
+
+        flags |= HAS_WILDCARD
+        return cls(ids, full_confs, box, flags)
+
+    @property
+    def detected(self):
+        return bool(self.flags & PLATE_DETECTED)
+
+    @property
+    def has_wildcard(self):
+        return bool(self.flags & HAS_WILDCARD)
+
+    @property
+    def legible(self):
+        return self.detected and not self.flags & ILLEGIBLE
+
+    @property
+    def median_conf(self):
+        """
+        Returns:
+            float or None: Median confidence of the known positions, None when nothing is known.
+        """
+
+        # Sorting the few known confidences directly is several times faster than np.median on 8 elements
+        known = np.sort(self.confs[self.ids != WILDCARD_ID])
+        n = len(known)
+        return float(known[(n - 1) // 2] + known[n // 2]) / 2 if n else None
+
+    def labels(self, persian=False):
+        return decode_ids(self.ids, persian)
+
+    def text(self, persian=False):
+        return "".join(self.labels(persian))
+
+    def to_detection_list(self, persian=True):
+        """
+        Returns:
+            list: The legacy five part representation, e.g. ['12', 'ب', '345', '-', '67'].
+        """
+
+        if not self.detected:
+            return [None, None, None, "-", None]
+        p = self.labels(persian)
+        return [p[0] + p[1], p[2], p[3] + p[4] + p[5], "-", p[6] + p[7]]
+
+    def to_bytes(self):
+        """
+        Returns:
+            bytes: A fixed size (READING_DTYPE.itemsize) little-endian record.
+        """
+
+        return (self.ids.tobytes() + self.confs.astype("<f4", copy=False).tobytes()
+                + self.box.astype("<i4", copy=False).tobytes() + bytes((self.flags,)))
+
+    @classmethod
+    def from_bytes(cls, buffer):
+        record = np.frombuffer(buffer, dtype=READING_DTYPE, count=1)[0]
+        return cls(record["ids"].copy(), record["confs"].copy(), record["box"].copy(), record["flags"])
+
+    def to_dict(self):
+        """
+        Returns:
+            dict: JSON-ready reading. Confidences are written with the shortest digits that parse back to the same
+                  float32, so from_dict(json.loads(reading.to_json())) == reading.
+        """
+
+        return {
+            "plate": self.text(),
+            "ids": self.ids.tolist(),
+            "confs": [float(str(conf)) for conf in self.confs],
+            "box": self.box.tolist(),
+            "flags": self.flags,
+        }
+
+    def to_json(self):
+        return json.dumps(self.to_dict(), separators=(",", ":"))
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(data["ids"], data["confs"], data["box"], data["flags"])
+
+    def __eq__(self, other):
+        if not isinstance(other, PlateReading):
+            return NotImplemented
+        return (self.flags == other.flags and np.array_equal(self.ids, other.ids)
+                and np.array_equal(self.box, other.box) and np.array_equal(self.confs, other.confs))
+
+    def __repr__(self):
+        return f"PlateReading({self.text()!r}, median_conf={self.median_conf}, flags={self.flags})"
+
+
+def pack_readings(readings):
+    """
+    Serialise many readings into one contiguous buffer of READING_DTYPE records.
+    """
+
+    records = np.zeros(len(readings), dtype=READING_DTYPE)
+    for record, reading in zip(records, readings):
+        record["ids"] = reading.ids
+        record["confs"] = reading.confs
+        record["box"] = reading.box
+        record["flags"] = reading.flags
+    return records.tobytes()
+
+
+def unpack_readings(buffer):
+    """
+    Inverse of pack_readings.
+    """
+
+    records = np.frombuffer(buffer, dtype=READING_DTYPE)
+    return [PlateReading(r["ids"].copy(), r["confs"].copy(), r["box"].copy(), r["flags"]) for r in records]
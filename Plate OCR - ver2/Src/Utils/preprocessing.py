@@ -0,0 +1,105 @@
+import cv2
+import numpy as np
+
+
+# Iranian plates are 520 x 110 mm, the canonical crop keeps that aspect ratio
+PLATE_ASPECT_RATIO = 520 / 110
+
+
+def order_corners(pts):
+    """
+    Order four points as top-left, top-right, bottom-right, bottom-left.
+
+    Args:
+        pts (numpy.ndarray): A (4, 2) array of corner coordinates.
+
+    Returns:
+        numpy.ndarray: The ordered (4, 2) float32 array.
+    """
+
+    pts = np.asarray(pts, dtype=np.float32).reshape(4, 2)
+    s = pts.sum(axis=1)
+    d = np.diff(pts, axis=1).ravel()
+    return np.array([pts[np.argmin(s)], pts[np.argmin(d)], pts[np.argmax(s)], pts[np.argmax(d)]], dtype=np.float32)
+
+
+def find_plate_corners(plate, min_area=0.3):
+    """
+    Find the quadrilateral of the plate inside a detector crop.
+
+    Args:
+        plate (numpy.ndarray): BGR plate crop.
+        min_area (float): Minimum area of the quadrilateral as a fraction of the crop (default is 0.3).
+
+    The bright plate background is separated with Otsu thresholding, the largest blob is approximated by a polygon
+    and, when that isn't a quadrilateral, by its minimum area rectangle.
+
+    Returns:
+        numpy.ndarray or None: The ordered (4, 2) corners, None when no plausible plate outline is found.
+    """
+
+    gray = cv2.cvtColor(plate, cv2.COLOR_BGR2GRAY) if plate.ndim == 3 else plate
+    gray = cv2.GaussianBlur(gray, (5, 5), 0)
+    _, mask = cv2.threshold(gray, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)
+    mask = cv2.morphologyEx(mask, cv2.MORPH_CLOSE, cv2.getStructuringElement(cv2.MORPH_RECT, (7, 3)))
+
+    contours, _ = cv2.findContours(mask, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+    if not contours:
+        return None
+
+    contour = max(contours, key=cv2.contourArea)
+    if cv2.contourArea(contour) < min_area * gray.shape[0] * gray.shape[1]:
+        return None
+
+    hull = cv2.convexHull(contour)
+    approx = cv2.approxPolyDP(hull, 0.04 * cv2.arcLength(hull, True), True)
+    corners = approx.reshape(-1, 2) if len(approx) == 4 else cv2.boxPoints(cv2.minAreaRect(hull))
+    return order_corners(corners)
+
+
+def rectify_plate(plate, width=256, aspect_ratio=PLATE_ASPECT_RATIO):
+    """
+    Warp a skewed plate crop to a fronto-parallel plate of canonical size.
+
+    Args:
+        plate (numpy.ndarray): BGR plate crop.
+        width (int): Width of the rectified plate (default is 256).
+        aspect_ratio (float): Width / height of the rectified plate (default is the Iranian plate ratio).
+
+    Falls back to a plain resize to the canonical size when no plate outline is found, so the output size
+    is the same for every crop.
+
+    Returns:
+        numpy.ndarray: The rectified plate.
+    """
+
+    height = max(1, int(round(width / aspect_ratio)))
+    corners = find_plate_corners(plate)
+    if corners is None:
+        return cv2.resize(plate, (width, height), interpolation=cv2.INTER_LINEAR)
+
+    target = np.array([[0, 0], [width - 1, 0], [width - 1, height - 1], [0, height - 1]], dtype=np.float32)
+    matrix = cv2.getPerspectiveTransform(corners, target)
+    return cv2.warpPerspective(plate, matrix, (width, height), flags=cv2.INTER_LINEAR, borderMode=cv2.BORDER_REPLICATE)
+
+
+def apply_clahe(plate, clip_limit=2.0, tile_grid_size=(4, 2)):
+    """
+    Contrast limited histogram equalisation on the lightness channel of a BGR plate.
+
+    Args:
+        plate (numpy.ndarray): BGR plate crop.
+        clip_limit (float): CLAHE clip limit (default is 2.0).
+        tile_grid_size (tuple): CLAHE tile grid, wide and flat like the plate (default is (4, 2)).
+
+    Returns:
+        numpy.ndarray: The equalised BGR plate.
+    """
+
+    clahe = cv2.createCLAHE(clipLimit=clip_limit, tileGridSize=tile_grid_size)
+    if plate.ndim == 2:
+        return clahe.apply(plate)
+
+    lab = cv2.cvtColor(plate, cv2.COLOR_BGR2LAB)
+    lab[:, :, 0] = clahe.apply(lab[:, :, 0])
+    return cv2.cvtColor(lab, cv2.COLOR_LAB2BGR)
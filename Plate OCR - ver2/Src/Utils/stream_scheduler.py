@@ -0,0 +1,296 @@
+import time
+import threading
+from collections import deque
+
+import cv2
+import numpy as np
+
+
+class SourceMetrics:
+    """
+    Counters kept per source by the StreamScheduler.
+
+    Attributes:
+        captured (int): Frames read from the source.
+        processed (int): Frames that went through inference.
+        dropped_overflow (int): Frames overwritten in the source buffer before the scheduler reached them.
+        dropped_stale (int): Frames discarded because they were older than the latency budget.
+        skipped_static (int): Frames without motion that never reached inference (only with a MotionGate).
+        lags (collections.deque): Recent capture-to-result latencies in seconds.
+    """
+
+    def __init__(self, window=256):
+        self.captured = 0
+        self.processed = 0
+        self.dropped_overflow = 0
+        self.dropped_stale = 0
+        self.skipped_static = 0
+        self.lags = deque(maxlen=window)
+
+    def as_dict(self):
+        """
+        Returns:
+            dict: A snapshot of the counters plus mean/p95/max lag over the recent window.
+        """
+
+        lags = np.array(self.lags) if len(self.lags) else np.zeros(1)
+        dropped = self.dropped_overflow + self.dropped_stale
+        return {
+            "captured": self.captured,
+            "processed": self.processed,
+            "dropped_overflow": self.dropped_overflow,
+            "dropped_stale": self.dropped_stale,
+            "skipped_static": self.skipped_static,
+            "drop_rate": dropped / self.captured if self.captured else 0.0,
+            "lag_mean": float(np.mean(lags)),
+            "lag_p95": float(np.percentile(lags, 95)),
+            "lag_max": float(np.max(lags)),
+        }
+
+
+class FrameSource:
+    def __init__(self, name, uri, buffer_size=2, latency_budget=0.5, realtime=None, loop=False, motion_gate=None):
+        """
+        A camera, RTSP stream or video file read on its own thread into a small bounded buffer.
+
+        Args:
+            name (str): Identifier of the source, used as key in results and metrics.
+            uri (str or int): Anything cv2.VideoCapture accepts (file path, rtsp:// url, camera index).
+            buffer_size (int): Number of frames kept for the scheduler. When the buffer is full the oldest
+                               frame is dropped, so a slow consumer never builds up an unbounded queue.
+            latency_budget (float): Maximum age in seconds of a frame handed to inference.
+            realtime (bool): Throttle reading to the stream FPS. Defaults to True for files, which makes
+                             a video file behave like a live camera (a local stand-in for RTSP). A file read with
+                             realtime=False is replayed: the reader waits for room in the buffer instead of
+                             overwriting frames, and frames are never dropped as stale, so every frame is processed.
+            loop (bool): Restart a video file when it ends.
+            motion_gate (MotionGate): Optional gate run on the reader thread. Frames without motion are not
+                                      buffered at all, and the motion region is handed on as search area.
+        """
+
+        self.name = name
+        self.uri = uri
+        self.latency_budget = latency_budget
+        self.realtime = isinstance(uri, str) and "://" not in uri if realtime is None else realtime
+        self.loop = loop
+        self.motion_gate = motion_gate
+        self.frames = deque(maxlen=buffer_size)
+        self.metrics = SourceMetrics()
+        self.lock = threading.Lock()
+        self.room = threading.Condition(self.lock)
+        self.finished = False
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._reader, name=f"FrameSource-{self.name}", daemon=True)
+        self._thread.start()
+        return self
+
+    @property
+    def replay(self):
+        # Live sources (urls, camera indices) pace themselves and must be drained, a file not throttled is replayed
+        return isinstance(self.uri, str) and "://" not in self.uri and not self.realtime
+
+    def stop(self):
+        self._stop.set()
+        with self.room:
+            self.room.notify_all()
+        if self._thread is not None:
+            self._thread.join(timeout=2.0)
+
+    def _reader(self):
+        cap = cv2.VideoCapture(self.uri)
+        if not cap.isOpened():
+            print(f"Error opening source {self.name}: {self.uri}")
+            self.finished = True
+            return
+
+        fps = cap.get(cv2.CAP_PROP_FPS) or 25.0
+        period = 1.0 / fps
+        next_time = time.monotonic()
+
+        try:
+            while not self._stop.is_set():
+                ok, frame = cap.read()
+                if not ok:
+                    if self.loop and self.realtime:
+                        cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
+                        continue
+                    break
+
+                captured_at = time.monotonic()
+                moved, roi = True, None
+                if self.motion_gate is not None:
+                    moved, rois = self.motion_gate.update(frame)
+                    roi = self.motion_gate.union(rois)
+
+                with self.room:
+                    self.metrics.captured += 1
+                    if not moved:
+                        self.metrics.skipped_static += 1
+                    else:
+                        if self.replay:
+                            # Back-pressure: the file waits for the scheduler instead of losing frames
+                            while len(self.frames) == self.frames.maxlen and not self._stop.is_set():
+                                self.room.wait(0.1)
+                            if self._stop.is_set():
+                                break
+                            captured_at = time.monotonic()
+                        if len(self.frames) == self.frames.maxlen:
+                            self.metrics.dropped_overflow += 1
+                        self.frames.append((captured_at, frame, roi))
+
+                if self.realtime:
+                    next_time += period
+                    delay = next_time - time.monotonic()
+                    if delay > 0:
+                        time.sleep(delay)
+                    else:
+                        next_time = time.monotonic()
+        finally:
+            cap.release()
+            self.finished = True
+
+    def pop_fresh(self, now=None):
+        """
+        Method to take the oldest frame that is still inside the latency budget.
+
+        Frames older than the budget are discarded and counted as stale, except for replayed files.
+
+        Returns:
+            tuple or None: (capture_time, frame, roi), or None when no fresh frame is available.
+        """
+
+        now = time.monotonic() if now is None else now
+        with self.room:
+            while self.frames:
+                item = self.frames.popleft()
+                self.room.notify()
+                if self.replay or now - item[0] <= self.latency_budget:
+                    return item
+                self.metrics.dropped_stale += 1
+        return None
+
+    @property
+    def exhausted(self):
+        return self.finished and not self.frames
+
+
+class StreamScheduler:
+    def __init__(self, ocr_model, sources, batch_size=8, per_source_quota=1, idle_wait=0.005):
+        """
+        Scheduler that interleaves frames of several sources into batched plate OCR.
+
+        Args:
+            ocr_model (OCRModel): Model used through its detect_character_batch method.
+            sources (list): FrameSource instances.
+            batch_size (int): Maximum number of frames per inference call.
+            per_source_quota (int): Maximum number of frames a single source may put in one batch,
+                                    so that a busy camera can't starve the others.
+            idle_wait (float): Sleep in seconds when no source has a fresh frame.
+        """
+
+        self.ocr_model = ocr_model
+        self.sources = list(sources)
+        self.batch_size = batch_size
+        self.per_source_quota = per_source_quota
+        self.idle_wait = idle_wait
+        self._next_source = 0
+        self._running = False
+
+    def next_batch(self):
+        """
+        Method to collect the next batch in round-robin order.
+
+        The starting source rotates on every call so that, when the batch is smaller than the number of
+        sources, every source gets served in turn.
+
+        Returns:
+            list: (source, capture_time, frame, roi) tuples.
+        """
+
+        batch = []
+        n = len(self.sources)
+        now = time.monotonic()
+        for quota_round in range(self.per_source_quota):
+            for k in range(n):
+                if len(batch) >= self.batch_size:
+                    break
+                source = self.sources[(self._next_source + k) % n]
+                item = source.pop_fresh(now)
+                if item is not None:
+                    batch.append((source,) + item)
+
+        self._next_source = (self._next_source + 1) % max(n, 1)
+        return batch
+
+    def step(self):
+        """
+        Method to run inference on one batch.
+
+        Returns:
+            list: (source_name, frame, (detection_list, median_conf, detected_car)) tuples.
+        """
+
+        batch = self.next_batch()
+        if not batch:
+            return []
+
+        outputs = self.ocr_model.detect_character_batch([frame for _, _, frame, _ in batch],
+                                                        rois=[roi for _, _, _, roi in batch])
+        if outputs is None:
+            outputs = [([None, None, None, "-", None], None, False)] * len(batch)
+
+        done = time.monotonic()
+        results = []
+        for (source, captured_at, frame, _), output in zip(batch, outputs):
+            source.metrics.processed += 1
+            source.metrics.lags.append(done - captured_at)
+            results.append((source.name, frame, output))
+        return results
+
+    def run(self, callback=None, duration=None):
+        """
+        Method to start every source and process frames until all sources end, duration elapses or stop is called.
+
+        Args:
+            callback (callable): Called as callback(source_name, frame, output) for every processed frame.
+            duration (float): Optional wall-clock limit in seconds.
+        """
+
+        for source in self.sources:
+            source.start()
+
+        self._running = True
+        deadline = None if duration is None else time.monotonic() + duration
+        try:
+            while self._running:
+                if deadline is not None and time.monotonic() >= deadline:
+                    break
+
+                results = self.step()
+                if not results:
+                    if all(source.exhausted for source in self.sources):
+                        break
+                    time.sleep(self.idle_wait)
+                    continue
+
+                if callback is not None:
+                    for name, frame, output in results:
+                        callback(name, frame, output)
+        finally:
+            for source in self.sources:
+                source.stop()
+            self._running = False
+
+    def stop(self):
+        self._running = False
+
+    def metrics(self):
+        """
+        Returns:
+            dict: Per-source metrics keyed by source name.
+        """
+
+        return {source.name: source.metrics.as_dict() for source in self.sources}
@@ -0,0 +1,357 @@
+import os
+import sys
+import csv
+import glob
+import json
+import argparse
+import cv2
+import numpy as np
+
+from ocrPlate.Src.Utils.plate_reading import NUM_CHARS, decode_ids
+from ocrPlate.Src.Utils.image_pack import PackWriter, IMAGE_EXTENSIONS
+from ocrPlate.Src.Utils.glyphs import GLYPH_TEXT, load_font, rasterise
+
+
+# Plates are drawn at 1 pixel per millimetre of the 520 x 110 mm Iranian plate
+PLATE_WIDTH, PLATE_HEIGHT = 520, 110
+
+DIGIT_IDS = np.arange(10)
+LETTER_IDS = np.arange(10, 36)
+
+# (x1, y1, x2, y2) of the 8 character slots in plate order: two digits, the letter and three digits in the main
+# field, then the two digits of the region box on the right
+CHAR_SLOTS = np.array([(56, 16, 100, 100), (100, 16, 144, 100), (148, 22, 236, 94),
+                       (240, 16, 284, 100), (284, 16, 328, 100), (328, 16, 372, 100),
+                       (432, 44, 470, 104), (470, 44, 508, 104)], dtype=np.float32)
+REGION_LABEL = (440, 6, 500, 36)
+BLUE_BAND = (0, 0, 44, PLATE_HEIGHT)
+
+
+def random_plate_ids(rng):
+    """
+    Returns:
+        numpy.ndarray: 8 uint8 class ids of a plausible plate, the first digit of each group not zero.
+    """
+
+    ids = rng.integers(0, 10, NUM_CHARS).astype(np.uint8)
+    ids[[0, 3, 6]] = rng.integers(1, 10, 3)
+    ids[2] = rng.choice(LETTER_IDS)
+    return ids
+
+
+class PlateRenderer:
+    def __init__(self, font_path):
+        """
+        Draws fronto-parallel plates of given class ids.
+
+        Args:
+            font_path (str): TrueType font with Persian glyphs, e.g. Vazirmatn or B Traffic.
+
+        Every glyph is rasterised once with Pillow, trimmed to its ink and cached per slot size, so a plate is
+        composed with numpy blending only.
+        """
+
+        self.font = load_font(font_path, 96)
+        self.small_font = load_font(font_path, 28)
+        self.glyphs = {}
+        self.masks = {}
+        self.region_label = rasterise("ایران", self.small_font)
+        self.template = self.draw_template()
+
+    def glyph(self, class_id, slot_w, slot_h):
+        """
+        Returns:
+            numpy.ndarray: Ink coverage of the class fitted inside a slot_w x slot_h slot, keeping its aspect ratio.
+        """
+
+        key = (int(class_id), slot_w, slot_h)
+        mask = self.masks.get(key)
+        if mask is None:
+            ink = self.glyphs.get(int(class_id))
+            if ink is None:
+                ink = self.glyphs[int(class_id)] = rasterise(GLYPH_TEXT[int(class_id)], self.font)
+            scale = min(slot_w / ink.shape[1], slot_h / ink.shape[0])
+            size = (max(1, int(ink.shape[1] * scale)), max(1, int(ink.shape[0] * scale)))
+            mask = self.masks[key] = cv2.resize(ink, size, interpolation=cv2.INTER_AREA)
+        return mask
+
+    def draw_template(self):
+        """
+        Returns:
+            numpy.ndarray: float32 BGR plate without characters: white field, blue band with the flag, black
+                           border and the separator of the region box.
+        """
+
+        plate = np.full((PLATE_HEIGHT, PLATE_WIDTH, 3), 245, dtype=np.uint8)
+        x1, y1, x2, y2 = BLUE_BAND
+        plate[y1:y2, x1:x2] = (160, 60, 20)
+        for k, color in enumerate([(60, 150, 30), (255, 255, 255), (40, 40, 210)]):
+            plate[14 + 8 * k:22 + 8 * k, 10:34] = color
+        cv2.putText(plate, "I.R.", (7, 76), cv2.FONT_HERSHEY_SIMPLEX, 0.45, (255, 255, 255), 1, cv2.LINE_AA)
+        cv2.putText(plate, "IRAN", (4, 96), cv2.FONT_HERSHEY_SIMPLEX, 0.45, (255, 255, 255), 1, cv2.LINE_AA)
+        cv2.line(plate, (420, 4), (420, PLATE_HEIGHT - 4), (20, 20, 20), 3)
+        cv2.rectangle(plate, (1, 1), (PLATE_WIDTH - 2, PLATE_HEIGHT - 2), (20, 20, 20), 3)
+        plate = plate.astype(np.float32)
+        self.blend(plate, self.region_label, REGION_LABEL)
+        return plate
+
+    @staticmethod
+    def blend(plate, mask, slot, ink=(15, 15, 15)):
+        """
+        Draws mask centred in slot with the ink colour, in place.
+
+        Returns:
+            tuple: (x1, y1, x2, y2) of the drawn glyph in plate coordinates.
+        """
+
+        h, w = mask.shape
+        x = int((slot[0] + slot[2] - w) / 2)
+        y = int((slot[1] + slot[3] - h) / 2)
+        region = plate[y:y + h, x:x + w]
+        alpha = mask[:, :, None]
+        region *= 1 - alpha
+        region += alpha * np.asarray(ink, dtype=np.float32)
+        return x, y, x + w, y + h
+
+    def render(self, ids):
+        """
+        Args:
+            ids (numpy.ndarray): 8 class ids in plate order.
+
+        Returns:
+            tuple: (float32 BGR plate, (8, 4) float32 character boxes in plate coordinates)
+        """
+
+        plate = self.template.copy()
+        boxes = np.zeros((NUM_CHARS, 4), dtype=np.float32)
+        for k, (class_id, slot) in enumerate(zip(ids, CHAR_SLOTS)):
+            boxes[k] = self.blend(plate, self.glyph(class_id, int(slot[2] - slot[0]), int(slot[3] - slot[1])), slot)
+        return plate, boxes
+
+
+class SyntheticPlates:
+    def __init__(self,
+                 font_path: str,
+                 backgrounds: str = None,
+                 image_size: tuple = (640, 480),
+                 plate_width: tuple = (90, 260),
+                 skew: float = 0.12,
+                 blur: tuple = (0.0, 1.5),
+                 noise: tuple = (0.0, 8.0),
+                 jpeg_quality: tuple = (40, 95),
+                 seed: int = 0):
+        """
+        Endless stream of synthetic car images with one Iranian plate and its ground truth.
+
+        Args:
+            font_path (str): TrueType font with Persian glyphs.
+            backgrounds (str): Optional directory of background images (street scenes, car fronts), cropped at
+                               random. Procedural backgrounds are used without it (default is None).
+            image_size (tuple): (width, height) of the images (default is (640, 480)).
+            plate_width (tuple): Range of the plate width in pixels (default is (90, 260)).
+            skew (float): Maximum displacement of every plate corner as a fraction of the plate height, giving
+                          random perspective and rotation (default is 0.12).
+            blur (tuple): Range of the Gaussian blur sigma (default is (0.0, 1.5)).
+            noise (tuple): Range of the Gaussian noise standard deviation in grey levels (default is (0.0, 8.0)).
+            jpeg_quality (tuple): Range of the JPEG quality the images go through, None to skip it (default is
+                                  (40, 95)).
+            seed (int): Random seed, the same seed gives the same stream (default is 0).
+        """
+
+        self.renderer = PlateRenderer(font_path)
+        self.image_size = tuple(image_size)
+        self.plate_width = plate_width
+        self.skew = skew
+        self.blur = blur
+        self.noise = noise
+        self.jpeg_quality = jpeg_quality
+        self.rng = np.random.default_rng(seed)
+        self.background_paths = [] if backgrounds is None else sorted(
+            p for p in glob.glob(os.path.join(backgrounds, "*.*")) if p.lower().endswith(IMAGE_EXTENSIONS))
+        self.noise_bank = None
+        self.count = 0
+
+    def background(self):
+        """
+        Returns:
+            numpy.ndarray: float32 BGR background of image_size.
+        """
+
+        width, height = self.image_size
+        rng = self.rng
+        if self.background_paths:
+            img = cv2.imread(self.background_paths[rng.integers(len(self.background_paths))])
+            if img is not None:
+                scale = max(width / img.shape[1], height / img.shape[0])
+                if scale > 1:
+                    img = cv2.resize(img, None, fx=scale, fy=scale)
+                y, x = rng.integers(0, img.shape[0] - height + 1), rng.integers(0, img.shape[1] - width + 1)
+                return img[y:y + height, x:x + width].astype(np.float32)
+
+        # A vertical gradient with random boxes, like a car front in a street
+        top, bottom = rng.uniform(30, 220, 3), rng.uniform(30, 220, 3)
+        ramp = np.linspace(0, 1, height, dtype=np.float32)[:, None, None]
+        img = np.broadcast_to(top * (1 - ramp) + bottom * ramp, (height, width, 3)).astype(np.float32)
+        for _ in range(rng.integers(3, 9)):
+            x1, y1 = rng.integers(0, width), rng.integers(0, height)
+            x2, y2 = x1 + rng.integers(20, width // 2), y1 + rng.integers(10, height // 3)
+            img[y1:y2, x1:x2] = rng.uniform(0, 255, 3)
+        return img
+
+    def sample(self):
+        """
+        Returns:
+            tuple: (uint8 BGR image, label) where label is a dict with the plate text (English labels, as
+                   PlateReading.text), its 8 class ids, the plate box (x1, y1, x2, y2), the 4 plate corners and
+                   the 8 character boxes, all in image coordinates.
+        """
+
+        rng = self.rng
+        width, height = self.image_size
+        ids = random_plate_ids(rng)
+        plate, char_boxes = self.renderer.render(ids)
+
+        # Random size, position and perspective of the plate
+        plate_w = rng.uniform(*self.plate_width)
+        plate_h = plate_w * PLATE_HEIGHT / PLATE_WIDTH
+        margin = self.skew * plate_h
+        x = rng.uniform(margin, width - plate_w - margin)
+        y = rng.uniform(margin, height - plate_h - margin)
+        corners = np.array([(x, y), (x + plate_w, y), (x + plate_w, y + plate_h), (x, y + plate_h)], dtype=np.float32)
+        corners += rng.uniform(-margin, margin, (4, 2)).astype(np.float32)
+        source = np.array([(0, 0), (PLATE_WIDTH, 0), (PLATE_WIDTH, PLATE_HEIGHT), (0, PLATE_HEIGHT)], dtype=np.float32)
+        matrix = cv2.getPerspectiveTransform(source, corners)
+
+        # The plate is warped into its bounding box only, the rest of the image is never touched twice
+        img = self.background()
+        x1, y1 = np.maximum(np.floor(corners.min(axis=0)).astype(int), 0)
+        x2, y2 = np.minimum(np.ceil(corners.max(axis=0)).astype(int), (width, height))
+        local = np.array([[1, 0, -x1], [0, 1, -y1], [0, 0, 1]], dtype=np.float64) @ matrix
+        warped = cv2.warpPerspective(plate, local, (x2 - x1, y2 - y1), flags=cv2.INTER_AREA)
+        alpha = cv2.warpPerspective(np.ones((PLATE_HEIGHT, PLATE_WIDTH), dtype=np.float32), local, (x2 - x1, y2 - y1))
+        region = img[y1:y2, x1:x2]
+        region += alpha[:, :, None] * (warped - region)
+
+        # Blur, lighting, sensor noise and compression, in place on float32
+        sigma = rng.uniform(*self.blur)
+        if sigma > 0.3:
+            img = cv2.GaussianBlur(img, (0, 0), sigma)
+        # Drawing fresh normal noise for every image costs more than everything else together, so a random
+        # window of a noise bank twice the image size is used instead
+        if self.noise_bank is None:
+            self.noise_bank = rng.standard_normal((2 * height, 2 * width, 3), dtype=np.float32)
+        ny, nx = rng.integers(0, height + 1), rng.integers(0, width + 1)
+        noise = self.noise_bank[ny:ny + height, nx:nx + width] * rng.uniform(*self.noise)
+        noise += rng.uniform(-30, 30)
+        img *= rng.uniform(0.6, 1.3)
+        img += noise
+        img = np.clip(img, 0, 255, out=img).astype(np.uint8)
+        if self.jpeg_quality is not None:
+            quality = int(rng.integers(self.jpeg_quality[0], self.jpeg_quality[1] + 1))
+            img = cv2.imdecode(cv2.imencode(".jpg", img, [cv2.IMWRITE_JPEG_QUALITY, quality])[1], cv2.IMREAD_COLOR)
+
+        glyph_corners = char_boxes[:, [0, 1, 2, 1, 2, 3, 0, 3]].reshape(-1, 1, 2)
+        glyph_corners = cv2.perspectiveTransform(glyph_corners, matrix).reshape(NUM_CHARS, 4, 2)
+        chars = np.concatenate([glyph_corners.min(axis=1), glyph_corners.max(axis=1)], axis=1)
+
+        self.count += 1
+        label = {
+            "plate": "".join(decode_ids(ids)),
+            "ids": ids.tolist(),
+            "box": [int(v) for v in np.concatenate([corners.min(axis=0), corners.max(axis=0)]).round()],
+            "corners": np.round(corners.astype(np.float64), 1).tolist(),
+            "chars": np.round(chars).astype(int).tolist(),
+        }
+        return img, label
+
+    def __iter__(self):
+        while True:
+            yield self.sample()
+
+    def stream(self, count, prefix="synthetic"):
+        """
+        Yields:
+            tuple: (name, image, label) for count samples, named {prefix}_{index:09d}.
+        """
+
+        for _ in range(count):
+            img, label = self.sample()
+            yield f"{prefix}_{self.count - 1:09d}", img, label
+
+
+def write_dataset(generator, count, output_dir, image_format="pack"):
+    """
+    Streams count samples to output_dir, never holding more than one image in memory.
+
+    Args:
+        generator (SyntheticPlates): Source of the samples.
+        count (int): Number of samples.
+        output_dir (str): Receives labels.jsonl (name plus label), labels.csv ('file_name,plate', as read by the
+                          accuracy tools) and either plates.pack (image_format='pack') or images/{name}.jpg.
+        image_format (str): 'pack' or 'jpg' (default is 'pack').
+
+    Returns:
+        int: Number of written samples.
+    """
+
+    os.makedirs(output_dir, exist_ok=True)
+    if image_format == "jpg":
+        os.makedirs(os.path.join(output_dir, "images"), exist_ok=True)
+        writer = None
+    else:
+        writer = PackWriter(os.path.join(output_dir, "plates.pack"))
+
+    written = 0
+    with open(os.path.join(output_dir, "labels.jsonl"), "w", encoding="utf-8") as jsonl_file, \
+            open(os.path.join(output_dir, "labels.csv"), "w", encoding="utf-8", newline="") as csv_file:
+        rows = csv.writer(csv_file)
+        for name, img, label in generator.stream(count):
+            if writer is None:
+                name += ".jpg"
+                cv2.imwrite(os.path.join(output_dir, "images", name), img, [cv2.IMWRITE_JPEG_QUALITY, 95])
+            else:
+                writer.add(name, img)
+            jsonl_file.write(json.dumps({"name": name, **label}, ensure_ascii=False) + "\n")
+            rows.writerow([name, label["plate"]])
+            written += 1
+            if written % 10000 == 0:
+                print(f"{written} / {count} samples")
+    if writer is not None:
+        writer.close()
+    return written
+
+
+def load_labels(labels_path):
+    """
+    Returns:
+        dict: label per sample name, read from a labels.jsonl written by write_dataset.
+    """
+
+    labels = {}
+    with open(labels_path, encoding="utf-8") as file:
+        for line in file:
+            if line.strip():
+                record = json.loads(line)
+                labels[record.pop("name")] = record
+    return labels
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Synthetic Iranian plate images with ground truth")
+    parser.add_argument("--font", type=str, required=True, help="TrueType font with Persian glyphs")
+    parser.add_argument("--count", type=int, default=10000, help="Number of samples")
+    parser.add_argument("--output_dir", type=str, required=True, help="Directory receiving the samples and labels")
+    parser.add_argument("--format", type=str, choices=["pack", "jpg"], default="pack", help="One image pack or one jpg per sample")
+    parser.add_argument("--backgrounds", type=str, default=None, help="Optional directory of background images")
+    parser.add_argument("--image_size", type=int, nargs=2, default=[640, 480], help="Width and height of the images")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed")
+
+    args = parser.parse_args()
+    generator = SyntheticPlates(args.font, args.backgrounds, tuple(args.image_size), seed=args.seed)
+    written = write_dataset(generator, args.count, args.output_dir, args.format)
+    print(f"Wrote {written} samples to {args.output_dir}")
+    return 0 if written else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,122 @@
+import numpy as np
+
+
+def tile_starts(length, tile, stride):
+    """
+    Returns:
+        list: Start offsets of the tiles covering [0, length), the last tile ending exactly at length.
+    """
+
+    if length <= tile:
+        return [0]
+    starts = list(range(0, length - tile, stride))
+    starts.append(length - tile)
+    return starts
+
+
+def tile_grid(width, height, tile_size=640, overlap=0.2, bounds=None):
+    """
+    Overlapping tiles at native scale.
+
+    Args:
+        width (int): Image width.
+        height (int): Image height.
+        tile_size (int or tuple): Tile side, or (width, height), in image pixels (default is 640). Use the plate
+                                  detector's imgsz, so tiles are not resized.
+        overlap (float): Overlap of neighbouring tiles as a fraction of the tile size (default is 0.2). A plate
+                         narrower than the overlap is always fully inside at least one tile.
+        bounds (tuple): Optional (x1, y1, x2, y2) area to tile instead of the whole image, e.g. a clipped ROI.
+
+    Returns:
+        numpy.ndarray: (N, 4) int array of (x1, y1, x2, y2) tiles, row by row.
+    """
+
+    tile_w, tile_h = (tile_size, tile_size) if np.isscalar(tile_size) else tile_size
+    x0, y0, x1, y1 = (0, 0, width, height) if bounds is None else bounds
+    tile_w, tile_h = min(tile_w, x1 - x0), min(tile_h, y1 - y0)
+    stride_w = max(1, int(round(tile_w * (1 - overlap))))
+    stride_h = max(1, int(round(tile_h * (1 - overlap))))
+
+    tiles = [(x0 + x, y0 + y, x0 + x + tile_w, y0 + y + tile_h)
+             for y in tile_starts(y1 - y0, tile_h, stride_h)
+             for x in tile_starts(x1 - x0, tile_w, stride_w)]
+    return np.array(tiles, dtype=np.int32)
+
+
+def nms(boxes, scores, threshold=0.5, cut=None):
+    """
+    Greedy non-maximum suppression for boxes merged from overlapping tiles.
+
+    Args:
+        boxes (numpy.ndarray): (N, 4) boxes as (x1, y1, x2, y2).
+        scores (numpy.ndarray): (N,) confidences.
+        threshold (float): A box is suppressed when its intersection with a kept box covers more than this fraction
+                           of the smaller of the two (default is 0.5). Unlike IoU, this also removes the partial box
+                           of a plate cut by a tile border, which the complete box in the neighbouring tile contains.
+        cut (numpy.ndarray): Optional (N,) flags of boxes touching a tile border inside the image. They are only
+                             kept when no complete box covers them, whatever their score.
+
+    Returns:
+        numpy.ndarray: Indices of the kept boxes, by decreasing score.
+    """
+
+    boxes = np.asarray(boxes, dtype=np.float32).reshape(-1, 4)
+    scores = np.asarray(scores, dtype=np.float32).reshape(-1)
+    cut = np.zeros(len(scores), dtype=bool) if cut is None else np.asarray(cut, dtype=bool)
+    order = np.lexsort((-scores, cut))
+    areas = np.maximum(boxes[:, 2] - boxes[:, 0], 0) * np.maximum(boxes[:, 3] - boxes[:, 1], 0)
+
+    keep = []
+    while order.size:
+        i, rest = order[0], order[1:]
+        keep.append(i)
+        w = np.maximum(np.minimum(boxes[i, 2], boxes[rest, 2]) - np.maximum(boxes[i, 0], boxes[rest, 0]), 0)
+        h = np.maximum(np.minimum(boxes[i, 3], boxes[rest, 3]) - np.maximum(boxes[i, 1], boxes[rest, 1]), 0)
+        overlap = w * h / np.maximum(np.minimum(areas[i], areas[rest]), 1e-6)
+        order = rest[overlap <= threshold]
+    keep = np.array(keep, dtype=np.int64)
+    return keep[np.argsort(-scores[keep], kind="stable")]
+
+
+def merge_tile_boxes(tiles, tile_boxes, tile_scores, threshold=0.5):
+    """
+    Shifts per-tile detections to image coordinates and merges them across tiles.
+
+    Args:
+        tiles (numpy.ndarray): (N, 4) tiles from tile_grid.
+        tile_boxes (list): (M_i, 4) boxes per tile, in tile coordinates.
+        tile_scores (list): (M_i,) confidences per tile.
+        threshold (float): Suppression threshold, see nms.
+
+    Boxes are clipped to the tiled area, and boxes that are empty in integer pixels (x2 <= x1 or y2 <= y1) are
+    dropped, like locate_plates does on untiled detections, so every returned box crops a non-empty plate.
+
+    Returns:
+        tuple: ((K, 4) int32 boxes, (K,) float32 scores) in image coordinates, by decreasing score.
+    """
+
+    tiles = np.asarray(tiles).reshape(-1, 4)
+    area = (tiles[:, 0].min(), tiles[:, 1].min(), tiles[:, 2].max(), tiles[:, 3].max()) if len(tiles) else None
+
+    boxes, scores, cut = [], [], []
+    for tile, b, s in zip(tiles, tile_boxes, tile_scores):
+        if len(b):
+            b = np.asarray(b, dtype=np.float32).reshape(-1, 4)
+            # Tile borders that are not borders of the tiled area cut plates in two
+            inner = (tile[0] > area[0], tile[1] > area[1], tile[2] < area[2], tile[3] < area[3])
+            local = (tile[2] - tile[0], tile[3] - tile[1])
+            cut.append((inner[0] & (b[:, 0] <= 1)) | (inner[1] & (b[:, 1] <= 1)) |
+                       (inner[2] & (b[:, 2] >= local[0] - 1)) | (inner[3] & (b[:, 3] >= local[1] - 1)))
+            boxes.append(b + np.tile(tile[:2], 2))
+            scores.append(np.asarray(s, dtype=np.float32).reshape(-1))
+    if not boxes:
+        return np.zeros((0, 4), dtype=np.int32), np.zeros(0, dtype=np.float32)
+
+    boxes, scores, cut = np.concatenate(boxes), np.concatenate(scores), np.concatenate(cut)
+    boxes = np.clip(boxes, np.tile(area[:2], 2), np.tile(area[2:], 2))
+    pixels = boxes.astype(np.int32)
+    valid = (pixels[:, 2] > pixels[:, 0]) & (pixels[:, 3] > pixels[:, 1])
+    boxes, scores, cut, pixels = boxes[valid], scores[valid], cut[valid], pixels[valid]
+
+    keep = nms(boxes, scores, threshold, cut)
+    return pixels[keep], scores[keep]
@@ -0,0 +1,433 @@
+from itertools import combinations
+
+import numpy as np
+
+from ocrPlate.Src.Utils.plate_reading import NUM_CHARS, NUM_CLASSES, WILDCARD_ID, PlateReading, decode_ids, encode_plate
+
+
+# Plate positions grouped in pairs. Every block index is keyed on two pairs, so a reading with w wildcards and
+# k substitutions (w + k <= 2) always has two untouched pairs of which at least one block matches exactly.
+POSITION_PAIRS = ((0, 1), (2, 3), (4, 5), (6, 7))
+BLOCKS = tuple(a + b for a, b in combinations(POSITION_PAIRS, 2))
+
+
+class _BlockIndex:
+    def __init__(self, codes, valid, positions):
+        """
+        Static CSR index from the key of four plate positions to the slots holding it.
+
+        Args:
+            codes (numpy.ndarray): (N, 8) class ids of the slots covered by the index.
+            valid (numpy.ndarray): Boolean mask of the slots to index.
+            positions (tuple): The four positions making up the key.
+        """
+
+        self.positions = list(positions)
+        block = codes[:, self.positions]
+        valid = valid & np.all(block < NUM_CLASSES, axis=1)
+        keys = self.keys(block[valid])
+        slots = np.flatnonzero(valid).astype(np.int32)
+
+        order = np.argsort(keys, kind="stable")
+        self.slots = slots[order]
+        counts = np.bincount(keys, minlength=NUM_CLASSES ** len(self.positions))
+        self.offsets = np.concatenate([[0], np.cumsum(counts)]).astype(np.int64)
+
+    @staticmethod
+    def keys(block):
+        keys = np.zeros(block.shape[:-1], dtype=np.int64)
+        for i in range(block.shape[-1]):
+            keys = keys * NUM_CLASSES + block[..., i]
+        return keys
+
+    def candidates(self, ids):
+        key = int(self.keys(ids[self.positions]))
+        return self.slots[self.offsets[key]:self.offsets[key + 1]]
+
+    @property
+    def nbytes(self):
+        return self.slots.nbytes + self.offsets.nbytes
+
+
+class PlateIndex:
+    # Number of bitsets AND-ed over their full length before switching to the sparse non-zero words
+    DENSE_STEPS = 3
+
+    # Plates added after the last freeze are verified by a linear scan until there are this many of them
+    MIN_DELTA = 1 << 16
+
+    def __init__(self, capacity: int = 1 << 16):
+        """
+        Watchlist index answering wildcard and substitution queries over millions of plates.
+
+        Args:
+            capacity (int): Initial number of slots, grown by doubling (default is 65536).
+
+        Two structures answer the queries:
+        1. Block indexes: six static CSR tables keyed on four positions (two of POSITION_PAIRS). A reading with w '*'
+           positions and k substitutions, w + k <= 2, is answered from a few short candidate lists verified against
+           the stored class ids. Plates added since the tables were frozen are scanned directly, and the tables are
+           rebuilt once that delta grows past MIN_DELTA or an eighth of the index.
+        2. Bitsets: every (position, class) pair owns a bitset over the slots, so any other reading is answered by
+           AND-ing the bitsets of its known positions.
+
+        Removed plates only clear their alive bit, their slot is reclaimed by the next rebuild.
+        """
+
+        self.capacity = 0
+        self.codes = np.empty((0, NUM_CHARS), dtype=np.uint8)
+        self.alive = np.empty(0, dtype=np.uint64)
+        self.bits = {}
+        self.blocks = []
+        self.frozen = 0
+        self.size = 0
+        self.count = 0
+        self._grow(max(64, capacity))
+
+    def _grow(self, capacity):
+        capacity = -(-capacity // 64) * 64
+        words = capacity // 64
+        codes = np.full((capacity, NUM_CHARS), WILDCARD_ID, dtype=np.uint8)
+        codes[:self.capacity] = self.codes
+        self.codes = codes
+        self.alive = np.concatenate([self.alive, np.zeros(words - len(self.alive), dtype=np.uint64)])
+        for key, bitset in self.bits.items():
+            self.bits[key] = np.concatenate([bitset, np.zeros(words - len(bitset), dtype=np.uint64)])
+        self.capacity = capacity
+
+    def _bitset(self, position, class_id):
+        key = (position, int(class_id))
+        bitset = self.bits.get(key)
+        if bitset is None:
+            bitset = np.zeros(len(self.alive), dtype=np.uint64)
+            self.bits[key] = bitset
+        return bitset
+
+    @staticmethod
+    def _as_ids(plate):
+        if isinstance(plate, PlateReading):
+            return plate.ids
+        if isinstance(plate, str):
+            return encode_plate(plate)
+        return np.asarray(plate, dtype=np.uint8)
+
+    @staticmethod
+    def _check_known(codes):
+        codes = codes.reshape(-1, NUM_CHARS)
+        rows = np.flatnonzero(np.any(codes == WILDCARD_ID, axis=1))
+        if len(rows):
+            plate = "".join(decode_ids(codes[rows[0]]))
+            raise ValueError(f"Watchlist plates can't have '*' positions, got {plate!r} at row {rows[0]}")
+
+    @classmethod
+    def from_file(cls, path):
+        """
+        Build an index from a local plate list.
+
+        Args:
+            path (str): Either a text file with one plate per line (any format accepted by encode_plate) or a
+                        .npy file holding an (N, 8) uint8 class id matrix, which loads much faster.
+
+        Returns:
+            PlateIndex: The index.
+
+        Raises:
+            ValueError: If a plate can't be encoded or has '*' positions.
+        """
+
+        if path.endswith(".npy"):
+            codes = np.load(path, mmap_mode="r")
+        else:
+            rows = []
+            with open(path, encoding="utf-8") as file:
+                for number, line in enumerate(file, 1):
+                    if line.strip():
+                        ids = encode_plate(line.strip())
+                        if np.any(ids == WILDCARD_ID):
+                            raise ValueError(f"Watchlist plates can't have '*' positions, got {line.strip()!r} on "
+                                             f"line {number} of {path}")
+                        rows.append(ids)
+            codes = np.array(rows, dtype=np.uint8).reshape(-1, NUM_CHARS)
+
+        index = cls(capacity=len(codes))
+        index.add_many(codes)
+        return index
+
+    def _alive_mask(self, slots):
+        slots = np.asarray(slots, dtype=np.int64)
+        return ((self.alive[slots >> 6] >> (slots & 63).astype(np.uint64)) & np.uint64(1)).astype(bool)
+
+    def freeze(self):
+        """
+        Rebuild the block indexes over all current plates, compacting away the slots of removed plates.
+        """
+
+        if self.count < self.size:
+            live = self.codes[:self.size][self._alive_mask(np.arange(self.size))]
+            capacity = self.capacity
+            self.__init__(capacity)
+            self._insert(live)
+
+        valid = self._alive_mask(np.arange(self.size))
+        self.blocks = [_BlockIndex(self.codes[:self.size], valid, positions) for positions in BLOCKS]
+        self.frozen = self.size
+
+    def _maybe_freeze(self):
+        if self.size - self.frozen > max(self.MIN_DELTA, self.frozen // 8):
+            self.freeze()
+
+    def add_many(self, codes):
+        """
+        Bulk insert of an (N, 8) class id matrix. Duplicates, also against plates already in the index, are skipped.
+
+        Returns:
+            int: The number of plates inserted.
+
+        Raises:
+            ValueError: If a plate has '*' positions. Nothing is inserted then.
+        """
+
+        codes = np.ascontiguousarray(codes, dtype=np.uint8).reshape(-1, NUM_CHARS)
+        self._check_known(codes)
+        keys = codes.view("<u8").ravel()
+        _, first = np.unique(keys, return_index=True)
+        first = np.sort(first)
+        codes, keys = codes[first], keys[first]
+        if self.count:
+            # One sorted membership test against the live plates, each plate being a single 64-bit key
+            live = self.codes[:self.size].view("<u8").ravel()[self._alive_mask(np.arange(self.size))]
+            codes = codes[~np.isin(keys, live)]
+
+        inserted = self._insert(codes)
+        self._maybe_freeze()
+        return inserted
+
+    def _insert(self, codes):
+        if len(codes) == 0:
+            return 0
+
+        start = self.size
+        end = start + len(codes)
+        if end > self.capacity:
+            self._grow(max(end, 2 * self.capacity))
+
+        self.codes[start:end] = codes
+        if start % 64 == 0:
+            self._or_range(self.alive, start, np.ones(len(codes), dtype=bool))
+            for position in range(NUM_CHARS):
+                column = codes[:, position]
+                for class_id in np.unique(column):
+                    if class_id != WILDCARD_ID:
+                        self._or_range(self._bitset(position, class_id), start, column == class_id)
+        else:
+            slots = np.arange(start, end)
+            self._set_bits(self.alive, slots)
+            for position in range(NUM_CHARS):
+                column = codes[:, position]
+                for class_id in np.unique(column):
+                    if class_id != WILDCARD_ID:
+                        self._set_bits(self._bitset(position, class_id), slots[column == class_id])
+
+        self.size = end
+        self.count += len(codes)
+        return len(codes)
+
+    @staticmethod
+    def _or_range(bitset, start, mask):
+        packed = np.packbits(mask, bitorder="little")
+        packed = np.pad(packed, (0, -len(packed) % 8))
+        words = packed.view("<u8").astype(np.uint64, copy=False)
+        bitset[start // 64:start // 64 + len(words)] |= words
+
+    @staticmethod
+    def _set_bits(bitset, slots):
+        slots = np.asarray(slots, dtype=np.uint64)
+        np.bitwise_or.at(bitset, (slots >> np.uint64(6)).astype(np.intp), np.uint64(1) << (slots & np.uint64(63)))
+
+    def add(self, plate):
+        """
+        Insert a single plate.
+
+        Args:
+            plate (str, PlateReading or array-like): The plate, without '*' positions.
+
+        Returns:
+            bool: False if the plate was already in the index.
+
+        Raises:
+            ValueError: If the plate has '*' positions.
+        """
+
+        ids = self._as_ids(plate)
+        self._check_known(ids)
+        if len(self.lookup(ids)):
+            return False
+
+        if self.size == self.capacity:
+            self._grow(2 * self.capacity)
+        slot = self.size
+        self.size += 1
+
+        self.codes[slot] = ids
+        word, bit = slot >> 6, np.uint64(1) << np.uint64(slot & 63)
+        self.alive[word] |= bit
+        for position, class_id in enumerate(ids):
+            if class_id != WILDCARD_ID:
+                self._bitset(position, class_id)[word] |= bit
+        self.count += 1
+        self._maybe_freeze()
+        return True
+
+    def remove(self, plate):
+        """
+        Remove a single plate.
+
+        Returns:
+            bool: False if the plate was not in the index.
+        """
+
+        slots = self.lookup(self._as_ids(plate))
+        if len(slots) == 0:
+            return False
+
+        slot = int(slots[0])
+        word, mask = slot >> 6, ~(np.uint64(1) << np.uint64(slot & 63))
+        self.alive[word] &= mask
+        for position, class_id in enumerate(self.codes[slot]):
+            if class_id != WILDCARD_ID:
+                self.bits[(position, int(class_id))][word] &= mask
+        self.count -= 1
+        return True
+
+    def lookup(self, plate):
+        """
+        Returns:
+            numpy.ndarray: The slot of an exact match (at most one element).
+        """
+
+        ids = self._as_ids(plate)
+        slots = self.query_slots(ids, max_substitutions=0)
+        return slots[np.all(self.codes[slots] == ids, axis=1)]
+
+    def _match_exact(self, ids, positions):
+        """
+        Slots whose plate equals ids on all given positions, from the bitsets.
+
+        The first DENSE_STEPS bitsets are AND-ed over their full length. After that only a few percent of the words
+        are still non-zero, so the remaining bitsets are only gathered at those words.
+        """
+
+        used = -(-self.size // 64)
+        bitsets = []
+        for position in positions:
+            bitset = self.bits.get((position, int(ids[position])))
+            if bitset is None:
+                return np.empty(0, dtype=np.int64)
+            bitsets.append(bitset)
+
+        dense = self.alive[:used].copy()
+        for bitset in bitsets[:self.DENSE_STEPS]:
+            np.bitwise_and(dense, bitset[:used], out=dense)
+
+        words = np.flatnonzero(dense)
+        values = dense[words]
+        for bitset in bitsets[self.DENSE_STEPS:]:
+            values &= bitset[words]
+            keep = values != 0
+            words, values = words[keep], values[keep]
+
+        return self._slots(words, values)
+
+    def _verify(self, candidates, ids, known, max_substitutions):
+        candidates = candidates[self._alive_mask(candidates)]
+        mismatches = (self.codes[candidates][:, known] != ids[known]).sum(axis=1)
+        return candidates[mismatches <= max_substitutions]
+
+    def _query_blocks(self, ids, known, max_substitutions):
+        untouched = [pair for pair in POSITION_PAIRS if ids[pair[0]] != WILDCARD_ID and ids[pair[1]] != WILDCARD_ID]
+        blocks = [self.blocks[BLOCKS.index(a + b)] for a, b in combinations(untouched, 2)]
+        if max_substitutions == 0:
+            lists = [min((block.candidates(ids) for block in blocks), key=len)]
+        else:
+            # Smallest set of blocks such that every choice of max_substitutions mismatching pairs leaves one intact
+            chosen = []
+            for bad in combinations(untouched, max_substitutions):
+                rest = [pair for pair in untouched if pair not in bad]
+                if not any(all(pair in rest for pair in block) for block in chosen):
+                    chosen.append(tuple(rest[:2]))
+            lists = [self.blocks[BLOCKS.index(a + b)].candidates(ids) for a, b in chosen]
+
+        lists.append(np.arange(self.frozen, self.size))
+        matches = self._verify(np.concatenate(lists).astype(np.int64), ids, known, max_substitutions)
+        return np.unique(matches)
+
+    def query_slots(self, plate, max_substitutions=0, max_wildcards=NUM_CHARS):
+        """
+        Method to find the slots of every plate compatible with a reading.
+
+        Args:
+            plate (str, PlateReading or array-like): The reading, '*' / WILDCARD_ID for unknown positions.
+            max_substitutions (int): Number of known positions allowed to differ (default is 0).
+            max_wildcards (int): Readings with more '*' positions are not matched at all (default is 8).
+
+        Readings with at most two wildcards plus substitutions go through the block indexes. Otherwise the bitsets
+        are used, with substitutions answered by pigeonhole: the known positions are split into 2k groups, a plate
+        within k substitutions matches at least k of them exactly, and the union of the exact matches on every
+        k-subset of groups is verified against the stored class ids.
+
+        Returns:
+            numpy.ndarray: Sorted slot numbers.
+        """
+
+        ids = self._as_ids(plate)
+        known = np.flatnonzero(ids != WILDCARD_ID)
+        wildcards = NUM_CHARS - len(known)
+        if wildcards > max_wildcards or len(known) <= max_substitutions:
+            return np.empty(0, dtype=np.int64)
+
+        if self.blocks and wildcards + max_substitutions <= 2:
+            return self._query_blocks(ids, known, max_substitutions)
+
+        if max_substitutions == 0:
+            return self._match_exact(ids, known)
+
+        n_groups = min(len(known), 2 * max_substitutions)
+        groups = np.array_split(known, n_groups)
+        candidates = np.unique(np.concatenate([self._match_exact(ids, np.concatenate(kept))
+                                               for kept in combinations(groups, n_groups - max_substitutions)]))
+        return self._verify(candidates, ids, known, max_substitutions)
+
+    @staticmethod
+    def _slots(words, values):
+        if len(words) == 0:
+            return np.empty(0, dtype=np.int64)
+        bits = np.unpackbits(values.astype("<u8").view(np.uint8).reshape(-1, 8), axis=1, bitorder="little")
+        rows, cols = np.nonzero(bits)
+        return words[rows].astype(np.int64) * 64 + cols
+
+    def query(self, plate, max_substitutions=0, max_wildcards=NUM_CHARS):
+        """
+        Same as query_slots, returning the matching plates.
+
+        Returns:
+            numpy.ndarray: (M, 8) uint8 class ids of the matching plates.
+        """
+
+        return self.codes[self.query_slots(plate, max_substitutions, max_wildcards)]
+
+    def query_text(self, plate, max_substitutions=0, max_wildcards=NUM_CHARS, persian=False):
+        """
+        Same as query, returning the matching plates as strings.
+        """
+
+        return ["".join(row) for row in decode_ids(self.query(plate, max_substitutions, max_wildcards), persian)]
+
+    def __len__(self):
+        return self.count
+
+    def __contains__(self, plate):
+        return len(self.lookup(plate)) > 0
+
+    def memory_bytes(self):
+        return (self.codes.nbytes + self.alive.nbytes + sum(bitset.nbytes for bitset in self.bits.values())
+                + sum(block.nbytes for block in self.blocks))
@@ -0,0 +1,62 @@
+import copy
+import threading
+
+
+class InferenceContext:
+    def __init__(self, model, setup_lock):
+        """
+        Per-thread inference state on top of a shared YOLO model.
+
+        Args:
+            model (ultralytics.YOLO): The shared model. The context keeps a shallow copy of it, so the network
+                                      weights are shared while the predictor (letterbox settings, source, batch
+                                      and results) belongs to this thread only.
+            setup_lock (threading.Lock): Lock shared by all contexts of a model, held while a context sets up its
+                                         predictor. The setup fuses and moves the shared network in place and must
+                                         not run in several threads at once.
+
+        Torch releases the GIL during the forward pass, so threads with their own context run the shared network
+        in parallel.
+        """
+
+        self.model = copy.copy(model)
+        self.model.predictor = None
+        self.setup_lock = setup_lock
+        self.thread_name = threading.current_thread().name
+        self.calls = 0
+
+    def predict(self, **kwargs):
+        """
+        Thread-local counterpart of YOLO.predict, same arguments and results.
+        """
+
+        self.calls += 1
+        if self.model.predictor is None:
+            with self.setup_lock:
+                return self.model.predict(**kwargs)
+        return self.model.predict(**kwargs)
+
+
+class ThreadLocalContexts:
+    def __init__(self, model):
+        """
+        Lazily creates one InferenceContext per calling thread for a shared YOLO model.
+
+        Args:
+            model (ultralytics.YOLO): The shared model.
+        """
+
+        self.model = model
+        self.setup_lock = threading.Lock()
+        self._local = threading.local()
+
+    def get(self):
+        """
+        Returns:
+            InferenceContext: The context of the calling thread.
+        """
+
+        context = getattr(self._local, 'context', None)
+        if context is None:
+            context = self._local.context = InferenceContext(self.model, self.setup_lock)
+        return context
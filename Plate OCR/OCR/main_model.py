@@ -3,12 +3,15 @@ from ultralytics import YOLO
 from torch import argmax as torch_argmax
 from singleton_decorator import singleton
 
-from post_proc import working_with_results 
+from OCR.post_proc import OCRPostProcessor
+from OCR.inference_context import ThreadLocalContexts
 
 
 @singleton
 class OCRModel:
     def __init__(self, model_path, plate_conf, char_conf, plate_iou, char_iou, plate_imgsz, char_imgsz, device, id_to_name, eng_to_persian):
+        # The instance keeps no per-call inference state and no shared counters: the singleton is shared by every
+        # thread, and each thread predicts through its own inference context on the same weights
         self.model_path = model_path
         self.plate_conf = plate_conf
         self.char_conf = char_conf
@@ -19,7 +22,11 @@ class OCRModel:
         self.device = device
         self.id_to_name = id_to_name
         self.eng_to_persian = eng_to_persian
+        self.char_classes = list(range(36))
+        self.plate_classes = [36]
+        self.post_processor = OCRPostProcessor(id_to_name)
         self.ocr_model = self.load_model()
+        self.contexts = ThreadLocalContexts(self.ocr_model)
 
     def load_model(self):
         try:
@@ -28,9 +35,13 @@ class OCRModel:
             print(f"Error loading the model: {e}")
             sys.exit(1)
 
+    def predict(self, **kwargs):
+        # YOLO.predict through the inference context of the calling thread
+        return self.contexts.get().predict(**kwargs)
+
     def detect_plate(self, img):
         try:
-            results = self.ocr_model.predict(source=img, conf=self.plate_conf, iou=self.plate_iou, imgsz=self.plate_imgsz, device=self.device, classes=self.plate_classes, verbose=False)
+            results = self.predict(source=img, conf=self.plate_conf, iou=self.plate_iou, imgsz=self.plate_imgsz, device=self.device, classes=self.plate_classes, verbose=False)
             return self.process_plate_results(results, img)
         except Exception as e:
             print(f"Error detecting plate: {e}")
@@ -43,15 +54,16 @@ class OCRModel:
             if len(confs) >= 1:
                 coordination = r.boxes.xyxy[torch_argmax(confs) if len(confs) > 1 else 0]
                 x1, y1, x2, y2 = map(int, coordination)
-                return img[y1:y2, x1:x2]
+                plate = img[y1:y2, x1:x2]
+                return plate if plate.size > 0 else None
         return None
 
     def detect_character(self, img):
         try:
             plate = self.detect_plate(img)
             if plate is not None:
-                results = self.ocr_model.predict(source=plate, conf=self.char_conf, iou=self.char_iou, imgsz=self.char_imgsz, device=self.device, classes=self.char_classes, verbose=False)
-                return working_with_results(results, self.id_to_name)
+                results = self.predict(source=plate, conf=self.char_conf, iou=self.char_iou, imgsz=self.char_imgsz, device=self.device, classes=self.char_classes, verbose=False)
+                return self.post_processor.working_with_results(results)
             else:
                 print("Plate is not detected!")
                 return [None, None, None, "-", None]
@@ -0,0 +1,172 @@
+import os
+import glob
+import json
+import time
+import hashlib
+
+
+def parse_shard(shard):
+    # 'i/N' -> (i, N), shards are numbered from 0 to N - 1
+    try:
+        index, count = (int(part) for part in shard.split('/'))
+    except ValueError:
+        raise ValueError(f"Invalid shard '{shard}', expected 'i/N', e.g. '0/4'.")
+    if count < 1 or not 0 <= index < count:
+        raise ValueError(f"Invalid shard '{shard}', expected 0 <= i < N.")
+    return index, count
+
+
+def shard_key(key):
+    # Stable across machines and Python versions, unlike hash()
+    return int.from_bytes(hashlib.blake2b(key.encode('utf-8'), digest_size=8).digest(), 'big')
+
+
+def iter_manifest(manifest):
+    # Yields (key, path) pairs. The key is the image as the manifest names it, the path is where it is opened, so nodes
+    # that mount the dataset or the manifest at different places still agree on the keys.
+    # A directory (its .jpg images, keyed by file name), a list of image keys (e.g. the names of an image pack, which
+    # are file names too) or a text file with one image path per line, relative paths being relative to the manifest.
+    # Empty lines and lines starting with '#' are skipped.
+    if isinstance(manifest, (list, tuple)):
+        for key in manifest:
+            yield key, key
+        return
+    if os.path.isdir(manifest):
+        for path in sorted(glob.glob(os.path.join(manifest, '*.jpg'))):
+            yield os.path.relpath(path, manifest), path
+        return
+
+    base = os.path.dirname(os.path.abspath(manifest))
+    with open(manifest, encoding='utf-8') as file:
+        for line in file:
+            key = line.strip()
+            if key and not key.startswith('#'):
+                yield key, key if os.path.isabs(key) else os.path.join(base, key)
+
+
+def shard_items(manifest, index, count):
+    # The (key, path) pairs of shard index out of count, ordered by the hash of the key. The manifest is streamed, so
+    # every node keeps only its own share of a manifest of tens of millions of images in memory.
+    hashed = []
+    for key, path in iter_manifest(manifest):
+        hashed_key = shard_key(key)
+        if hashed_key % count == index:
+            hashed.append((hashed_key, key, path))
+    hashed.sort()
+    return [(key, path) for _, key, path in hashed]
+
+
+def fingerprint(keys):
+    digest = hashlib.blake2b(digest_size=16)
+    for key in keys:
+        digest.update(key.encode('utf-8') + b'\n')
+    return digest.hexdigest()
+
+
+def write_json(path, data):
+    # Written to a temporary file and renamed, so a crash never leaves a partial file behind
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as file:
+        json.dump(data, file, ensure_ascii=False, indent=2)
+        file.flush()
+        os.fsync(file.fileno())
+    os.replace(tmp_path, path)
+
+
+class ShardRunner:
+    def __init__(self, process, output_dir, index, count, segment_size=1000):
+        # process: Callable taking an image path and returning a json serialisable result (e.g. the detection list).
+        # output_dir: Shared output directory, every shard writes to its own 'shard-i-of-N' sub directory.
+        # index, count: This shard and the number of shards, see parse_shard.
+        # segment_size: Images per output segment. A segment is the unit of checkpointing: it is renamed into place
+        #               once complete, so a restart redoes at most one segment.
+        self.process = process
+        self.index = index
+        self.count = count
+        self.segment_size = segment_size
+        self.shard_dir = os.path.join(output_dir, f"shard-{index:05d}-of-{count:05d}")
+
+    def segment_path(self, segment):
+        return os.path.join(self.shard_dir, f"segment-{segment:06d}.jsonl")
+
+    def check_progress(self, items):
+        # The segments are only valid for the image list they were written from
+        progress_path = os.path.join(self.shard_dir, 'progress.json')
+        expected = {'fingerprint': fingerprint(key for key, _ in items), 'images': len(items), 'segment_size': self.segment_size}
+        if os.path.isfile(progress_path):
+            with open(progress_path, encoding='utf-8') as file:
+                progress = json.load(file)
+            if any(progress.get(key) != value for key, value in expected.items()):
+                raise ValueError(f"{self.shard_dir} was written from another manifest or segment size, "
+                                 f"use a new output directory.")
+            return progress
+        return dict(expected, completed_segments=0, errors=0, seconds=0.0)
+
+    def run(self, manifest):
+        # Processes the images of this shard that are not in a completed segment yet. Returns the shard progress.
+        items = shard_items(manifest, self.index, self.count)
+        os.makedirs(self.shard_dir, exist_ok=True)
+        progress = self.check_progress(items)
+        progress_path = os.path.join(self.shard_dir, 'progress.json')
+
+        num_segments = (len(items) + self.segment_size - 1) // self.segment_size
+        pending = [segment for segment in range(num_segments) if not os.path.isfile(self.segment_path(segment))]
+        progress['completed_segments'] = num_segments - len(pending)
+        for segment in pending:
+            segment_path = self.segment_path(segment)
+
+            start_time = time.time()
+            tmp_path = segment_path + '.tmp'
+            with open(tmp_path, 'w', encoding='utf-8') as file:
+                for key, path in items[segment * self.segment_size:(segment + 1) * self.segment_size]:
+                    try:
+                        record = {'image': key, 'result': self.process(path)}
+                    except Exception as e:
+                        record = {'image': key, 'error': f"{type(e).__name__}: {e}"}
+                        progress['errors'] += 1
+                    file.write(json.dumps(record, ensure_ascii=False) + '\n')
+                file.flush()
+                os.fsync(file.fileno())
+            os.replace(tmp_path, segment_path)
+
+            progress['completed_segments'] += 1
+            progress['seconds'] += time.time() - start_time
+            write_json(progress_path, progress)
+            print(f"Shard {self.index}/{self.count}: {progress['completed_segments']}/{num_segments} segments done")
+
+        progress['done'] = True
+        write_json(progress_path, progress)
+        return progress
+
+
+def merge_segments(output_dir, merged_path):
+    # Combines the segments of every shard into one JSONL file, shard by shard and segment by segment.
+    # Returns the number of merged records and the shards that are missing or not complete yet.
+    shard_dirs = sorted(glob.glob(os.path.join(output_dir, 'shard-*-of-*')))
+    counts = {int(os.path.basename(shard_dir).split('-')[-1]) for shard_dir in shard_dirs}
+    if len(counts) > 1:
+        raise ValueError(f"{output_dir} mixes runs with different shard counts: {sorted(counts)}.")
+
+    incomplete = []
+    if counts:
+        count = counts.pop()
+        for index in range(count):
+            progress_path = os.path.join(output_dir, f"shard-{index:05d}-of-{count:05d}", 'progress.json')
+            if not os.path.isfile(progress_path):
+                incomplete.append(index)
+                continue
+            with open(progress_path, encoding='utf-8') as file:
+                if not json.load(file).get('done'):
+                    incomplete.append(index)
+
+    records = 0
+    tmp_path = merged_path + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as merged:
+        for shard_dir in shard_dirs:
+            for segment_path in sorted(glob.glob(os.path.join(shard_dir, 'segment-*.jsonl'))):
+                with open(segment_path, encoding='utf-8') as segment:
+                    for line in segment:
+                        merged.write(line)
+                        records += 1
+    os.replace(tmp_path, merged_path)
+    return records, incomplete
@@ -8,17 +8,26 @@ import numpy as np
 from torch.cuda import is_available as Cuda_Available
 
 from OCR.main_model import OCRModel
+from OCR.sharding import ShardRunner, parse_shard, merge_segments
+from OCR.image_pack import ImagePack
 
 
 class OCROperations:
-    def __init__(self, model_params, output_dir):
+    def __init__(self, model_params, output_dir, pack=None):
+        # pack: Optional ImagePack, its pre-decoded images replace the cv2.imread of every image on every run
         self.ocr_model = OCRModel(**model_params)
         self.output_dir = output_dir
+        self.pack = pack
+
+    def iter_images(self, img_paths):
+        # (path, image) pairs, zero-copy views when a pack is used
+        if self.pack is not None:
+            return iter(self.pack)
+        return ((img_path, cv2.imread(img_path)) for img_path in img_paths)
 
     def detect_and_print(self, img_paths):
         results = {}
-        for img_path in img_paths:
-            img = cv2.imread(img_path)
+        for img_path, img in self.iter_images(img_paths):
             detection_list = self.ocr_model.detect_character(img)
             results[img_path] = detection_list
             self.save_result(img_path, detection_list)
@@ -31,13 +40,12 @@ class OCROperations:
             file.write(f"{detection_list}\n")
 
     def time_evaluation(self, img_paths, runs_num):
-        img = cv2.imread(img_paths[0])
+        _, img = next(self.iter_images(img_paths))
         self.ocr_model.detect_character(img)
 
         times = []
         for _ in range(runs_num):
-            for img_path in img_paths:
-                img = cv2.imread(img_path)
+            for _, img in self.iter_images(img_paths):
                 start_time = time.time()
                 self.ocr_model.detect_character(img)
                 end_time = time.time()
@@ -45,10 +53,32 @@ class OCROperations:
 
         return np.mean(times)
 
+    def profile(self, img_paths, iterations, output_prefix):
+        # Imported here, so that normal runs do not load the profilers
+        from OCR.profiling import profile_calls, decode_image
+
+        if self.pack is not None:
+            call, inputs = self.ocr_model.detect_character, [img for _, img in self.pack]
+        else:
+            call, inputs = (lambda img_path: self.ocr_model.detect_character(decode_image(img_path))), img_paths
+        return profile_calls(call, inputs, iterations, output_prefix)
+
+    def run_shard(self, manifest, shard, segment_size):
+        # Reads the images of one shard of the manifest into checkpointed segments under output_dir
+        def process(img_path):
+            # Pack images are named by file name, whether the manifest lists pack names or image paths
+            img = self.pack[os.path.basename(img_path)] if self.pack is not None else cv2.imread(img_path)
+            if img is None:
+                raise FileNotFoundError(f"{img_path} is missing or not a decodable image.")
+            return self.ocr_model.detect_character(img)
+
+        index, count = parse_shard(shard)
+        return ShardRunner(process, self.output_dir, index, count, segment_size).run(manifest)
+
 def main():
     parser = argparse.ArgumentParser(description="OCR Module Evaluating")
-    parser.add_argument("--runs_num", type=int, help="Repeat the detection to obtain a valid runtime", required=True)
-    parser.add_argument("--input_dir", type=str, help="Path to the input directory containing test images", required=True)
+    parser.add_argument("--runs_num", type=int, help="Repeat the detection to obtain a valid runtime (not used with --shard)", required=False)
+    parser.add_argument("--input_dir", type=str, help="Path to the input directory containing test images", required=False)
     parser.add_argument("--output_dir", type=str, help="Path to the output directory to save results", required=True)
     parser.add_argument("--model_path", type=str, help="Path to the YOLO model", default="./Models/PGO_Weights.pt", required=False)
     parser.add_argument("--plate_conf", type=float, help="Confidence threshold for plate detection", default=0.83, required=False)
@@ -58,8 +88,37 @@ def main():
     parser.add_argument("--plate_imgsz", type=int, nargs=2, help="Image size for plate detection", default=(640, 640), required=False)
     parser.add_argument("--char_imgsz", type=int, nargs=2, help="Image size for character detection", default=(320, 320), required=False)
 
+    parser.add_argument("--manifest", type=str, help="Text file with one image path per line (or a directory) to read with --shard", required=False)
+    parser.add_argument("--shard", type=str, help="Read only shard i of N ('i/N', 0 <= i < N) of the manifest, skipping completed segments", required=False)
+    parser.add_argument("--segment_size", type=int, help="Images per checkpointed output segment of a shard", default=1000, required=False)
+    parser.add_argument("--pack", type=str, help="Image pack from OCR/image_pack.py to read instead of the images of input_dir (or of the manifest)", required=False)
+    parser.add_argument("--profile", action="store_true", help="Profile detect_character on the input images instead of the evaluation", required=False)
+    parser.add_argument("--profile_iters", type=int, help="Number of profiled detect_character calls", default=50, required=False)
+    parser.add_argument("--merge", action="store_true", help="Merge the shard segments of output_dir into output_dir/merged.jsonl and exit", required=False)
+
     args = parser.parse_args()
 
+    if args.merge:
+        try:
+            records, incomplete = merge_segments(args.output_dir, os.path.join(args.output_dir, 'merged.jsonl'))
+        except ValueError as e:
+            print(f"Error: {e}")
+            return
+        print(f"Merged {records} results into {os.path.join(args.output_dir, 'merged.jsonl')}")
+        if incomplete:
+            print(f"Warning: shards {incomplete} are missing or not complete")
+        return
+
+    if args.shard is None and ((args.runs_num is None and not args.profile) or (args.input_dir is None and args.pack is None)):
+        parser.error("--runs_num (or --profile) and --input_dir (or --pack) are required unless --shard or --merge is given")
+    if args.shard is not None:
+        try:
+            parse_shard(args.shard)
+        except ValueError as e:
+            parser.error(str(e))
+        if args.manifest is None and args.input_dir is None and args.pack is None:
+            parser.error("--shard requires --manifest, --input_dir or --pack")
+
     device = 'cuda' if Cuda_Available() else 'cpu'
 
     with open('./Models/character_id_mapping.pkl', 'rb') as file:
@@ -83,9 +142,31 @@ def main():
     if not os.path.exists(args.output_dir):
         os.makedirs(args.output_dir)
 
-    img_paths = glob.glob(os.path.join(args.input_dir, '*.jpg'))
+    try:
+        pack = ImagePack(args.pack) if args.pack else None
+    except (OSError, ValueError) as e:
+        print(f"Error: {e}")
+        return
+
+    ocr_operations = OCROperations(model_params, args.output_dir, pack)
+
+    if args.shard is not None:
+        try:
+            manifest = args.manifest or args.input_dir or pack.names
+            progress = ocr_operations.run_shard(manifest, args.shard, args.segment_size)
+        except (OSError, ValueError) as e:
+            print(f"Error: {e}")
+            return
+        print(f"Shard {args.shard} done: {progress['images']} images, {progress['errors']} errors, "
+              f"{progress['seconds']:.1f} s of processing")
+        return
+
+    img_paths = pack.names if pack is not None else glob.glob(os.path.join(args.input_dir, '*.jpg'))
+
+    if args.profile:
+        print(ocr_operations.profile(img_paths, args.profile_iters, os.path.join(args.output_dir, 'profile')))
+        return
 
-    ocr_operations = OCROperations(model_params, args.output_dir)
     elapsed_time = ocr_operations.time_evaluation(img_paths, args.runs_num)
     
     print(f"Using device: {device}")
@@ -0,0 +1,75 @@
+import os
+import sys
+import json
+import shutil
+import tempfile
+import argparse
+from OCR.sharding import ShardRunner, merge_segments
+
+
+def make_root(root, names, manifest_dir):
+    # A dataset with the manifest stored next to it, as every node would mount it
+    os.makedirs(os.path.join(root, 'images'))
+    os.makedirs(os.path.join(root, manifest_dir))
+    for name in names:
+        with open(os.path.join(root, 'images', name), 'wb') as file:
+            file.write(name.encode('utf-8'))
+    manifest = os.path.join(root, manifest_dir, 'images.txt')
+    with open(manifest, 'w', encoding='utf-8') as file:
+        file.write(''.join(f"../images/{name}\n" for name in names))
+    return manifest
+
+
+def run_shards(manifest, output_dir, count, segment_size):
+    # Reads every shard from the given root, the result being the content of the image file
+    def process(path):
+        with open(path, 'rb') as file:
+            return file.read().decode('utf-8')
+
+    progress = [ShardRunner(process, output_dir, index, count, segment_size).run(manifest) for index in range(count)]
+    merged_path = os.path.join(output_dir, 'merged.jsonl')
+    merge_segments(output_dir, merged_path)
+    with open(merged_path, encoding='utf-8') as file:
+        records = [json.loads(line) for line in file]
+    return progress, records
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Shards of one manifest read from two different mount points")
+    parser.add_argument("--images", type=int, help="Number of images in the manifest", default=1000, required=False)
+    parser.add_argument("--shards", type=int, help="Number of shards", default=4, required=False)
+    parser.add_argument("--segment_size", type=int, help="Images per segment", default=100, required=False)
+    args = parser.parse_args()
+
+    names = [f"img_{i:06d}.jpg" for i in range(args.images)]
+    work_dir = tempfile.mkdtemp()
+    try:
+        # The same dataset mounted at two paths, and one output directory per mount
+        manifest_a = make_root(os.path.join(work_dir, 'mnt', 'a'), names, 'lists')
+        manifest_b = make_root(os.path.join(work_dir, 'data', 'nfs', 'b'), names, 'lists')
+        progress_a, records_a = run_shards(manifest_a, os.path.join(work_dir, 'out_a'), args.shards, args.segment_size)
+        progress_b, records_b = run_shards(manifest_b, os.path.join(work_dir, 'out_b'), args.shards, args.segment_size)
+    finally:
+        shutil.rmtree(work_dir)
+
+    failures = 0
+    if [p['fingerprint'] for p in progress_a] != [p['fingerprint'] for p in progress_b]:
+        print("Shard fingerprints differ between the two roots")
+        failures += 1
+    if records_a != records_b:
+        print("Merged records differ between the two roots")
+        failures += 1
+    images = sorted(record['image'] for record in records_a)
+    if images != sorted(f"../images/{name}" for name in names):
+        print(f"{len(images)} merged images, {len(set(images))} distinct, {len(names)} expected")
+        failures += 1
+    if any(record.get('result') != os.path.basename(record['image']) for record in records_a):
+        print("Images were not read from their own root")
+        failures += 1
+
+    print(f"{args.images} images in {args.shards} shards from two roots: {failures} failures")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()